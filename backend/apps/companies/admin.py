@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Company, Location, CompanySettings, CompanyInvitation
+from .models import Company, Location, CompanySettings, CompanyInvitation, Portfolio
 
 
 @admin.register(Company)
@@ -180,4 +180,31 @@ class CompanyInvitationAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
             'company', 'invited_by', 'accepted_by'
-        )
\ No newline at end of file
+        )
+
+
+@admin.register(Portfolio)
+class PortfolioAdmin(admin.ModelAdmin):
+    """Portfolio admin interface"""
+    list_display = ['name', 'company_count', 'created_by', 'updated_at']
+    search_fields = ['name', 'companies__name']
+    ordering = ['name']
+    filter_horizontal = ['companies', 'members']
+    readonly_fields = ['id', 'membership_version', 'created_at', 'updated_at']
+    
+    fieldsets = (
+        ('Portfolio', {
+            'fields': ('name', 'description', 'created_by')
+        }),
+        ('Companies & Access', {
+            'fields': ('companies', 'members')
+        }),
+        ('Metadata', {
+            'fields': ('id', 'membership_version', 'created_at', 'updated_at'),
+            'classes': ('collapse',)
+        })
+    )
+    
+    def company_count(self, obj):
+        return obj.companies.count()
+    company_count.short_description = 'Companies'
@@ -0,0 +1,80 @@
+"""
+Django management command to onboard companies, locations and meters from a file
+Usage: python manage.py bulk_onboard companies.csv [--created-by=EMAIL] [--workers=N] [--dry-run] [--no-tasks]
+"""
+
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from apps.companies.onboarding import DEFAULT_WORKERS, bulk_onboard, parse_onboarding_file
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Bulk onboard companies with their locations, meters and initial ESG tasks from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', type=str, help='CSV or JSON file with the companies to onboard')
+        parser.add_argument(
+            '--created-by',
+            type=str,
+            help='Email of the user recorded as creator of the generated tasks (default: first superuser)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help='Companies provisioned in parallel (SQLite always uses one)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the file and report what would be created',
+        )
+        parser.add_argument(
+            '--no-tasks',
+            action='store_true',
+            help='Create companies and locations only',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['file'], 'rb') as f:
+                specs = parse_onboarding_file(options['file'], f.read())
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {options["file"]}: {e}')
+
+        if options.get('created_by'):
+            created_by = User.objects.filter(email=options['created_by']).first()
+            if not created_by:
+                raise CommandError(f'User with email "{options["created_by"]}" does not exist.')
+        else:
+            created_by = User.objects.filter(is_superuser=True).order_by('date_joined').first()
+            if not created_by and not (options.get('no_tasks') or options.get('dry_run')):
+                raise CommandError('No superuser found; pass --created-by.')
+
+        report = bulk_onboard(
+            specs,
+            created_by,
+            workers=options['workers'],
+            generate_tasks=not options.get('no_tasks'),
+            dry_run=options.get('dry_run'),
+        )
+
+        for error in report['errors']:
+            self.stdout.write(self.style.WARNING(f"{error.get('business_name')}: {json.dumps(error['errors'])}"))
+        if report['companies_skipped']:
+            self.stdout.write(f"Skipped (already exist): {', '.join(report['companies_skipped'])}")
+
+        prefix = 'Would create' if report.get('dry_run') else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {report['companies_created']} company(ies), {report['locations_created']} location(s), "
+            f"{report['meters_registered']} meter(s), {report['tasks_created']} task(s) "
+            f"in {report['elapsed_seconds']}s"
+        ))
+        if report.get('companies_per_second') is not None:
+            self.stdout.write(
+                f"Throughput: {report['companies_per_second']} companies/s, {report['tasks_per_second']} tasks/s "
+                f"({report['workers']} worker(s))"
+            )
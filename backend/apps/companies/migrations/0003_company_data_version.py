@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_company_description'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='data_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('companies', '0004_company_environmental_score_sum_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Portfolio',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('membership_version', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('companies', models.ManyToManyField(blank=True, related_name='portfolios', to='companies.company')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_portfolios', to=settings.AUTH_USER_MODEL)),
+                ('members', models.ManyToManyField(blank=True, help_text='Users who can view the portfolio aggregates', related_name='portfolios', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Portfolio',
+                'verbose_name_plural': 'Portfolios',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Count, Max, Sum
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
 from django.conf import settings
 import uuid
 
@@ -115,6 +118,20 @@ class Company(models.Model):
     total_evidence_files = models.IntegerField(default=0)
     uploaded_evidence_files = models.IntegerField(default=0)
     
+    # Score ledger: running sums of task score contributions per category,
+    # updated by delta (see apps.tasks.scoring)
+    environmental_score_sum = models.FloatField(default=0.0)
+    environmental_task_count = models.IntegerField(default=0)
+    social_score_sum = models.FloatField(default=0.0)
+    social_task_count = models.IntegerField(default=0)
+    governance_score_sum = models.FloatField(default=0.0)
+    governance_task_count = models.IntegerField(default=0)
+    meter_data_task_count = models.IntegerField(default=0)
+    
+    # Incremented whenever task data, evidence or extracted file data changes.
+    # Derived data (precomputed dashboard metrics, caches) is keyed on it.
+    data_version = models.PositiveIntegerField(default=0)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -137,102 +154,36 @@ class Company(models.Model):
         """Get total number of users"""
         return self.users.count()
     
+    def bump_data_version(self):
+        """Mark the company's ESG data as changed"""
+        Company.objects.filter(pk=self.pk).update(data_version=models.F('data_version') + 1)
+        self.refresh_from_db(fields=['data_version'])
+        return self.data_version
+    
     def update_esg_scores(self):
-        """Update ESG scores based on actual data entries and file uploads"""
-        from apps.tasks.models import Task, TaskAttachment
-        from django.db.models import Count
-        from apps.dashboard.views import _get_task_data_entries
-        
-        # Get all tasks for this company
-        all_tasks = Task.objects.filter(company=self)
-        
-        if not all_tasks.exists():
-            # No tasks yet, set to default scores
-            self.environmental_score = 0.0
-            self.social_score = 0.0
-            self.governance_score = 0.0
-            self.overall_esg_score = 0.0
-            self.save(update_fields=['environmental_score', 'social_score', 'governance_score', 'overall_esg_score'])
-            return
+        """
+        Update ESG scores from the task score ledger (see apps.tasks.scoring).
+        Each task's contribution is applied by delta when its data entries or
+        attachments change, so this is O(1) regardless of task count.
+        """
+        from apps.tasks.scoring import calculate_scores_from_ledger
         
-        # Get actual data entries and file uploads
-        task_data = _get_task_data_entries(self)
+        scores = calculate_scores_from_ledger(self)
         
-        # Calculate Environmental Score based on actual data
-        env_tasks = all_tasks.filter(category__icontains='environmental')
-        env_score = self._calculate_data_based_score(env_tasks, task_data, 'environmental')
-        
-        # Calculate Social Score based on actual data
-        social_tasks = all_tasks.filter(category__icontains='social')
-        social_score = self._calculate_data_based_score(social_tasks, task_data, 'social')
-        
-        # Calculate Governance Score based on actual data
-        gov_tasks = all_tasks.filter(category__icontains='governance') 
-        gov_score = self._calculate_data_based_score(gov_tasks, task_data, 'governance')
-        
-        # Calculate Overall Score (weighted average)
-        # Environmental: 40%, Social: 30%, Governance: 30%
-        overall_score = (env_score * 0.4) + (social_score * 0.3) + (gov_score * 0.3)
-        
-        # Update the scores
-        self.environmental_score = round(env_score, 1)
-        self.social_score = round(social_score, 1)
-        self.governance_score = round(gov_score, 1)
-        self.overall_esg_score = round(overall_score, 1)
+        self.environmental_score = round(scores['environmental'], 1)
+        self.social_score = round(scores['social'], 1)
+        self.governance_score = round(scores['governance'], 1)
+        self.overall_esg_score = round(scores['overall'], 1)
         
         # Save without triggering signals to avoid recursion
         self.save(update_fields=['environmental_score', 'social_score', 'governance_score', 'overall_esg_score'])
+    
+    def rebuild_esg_scores(self):
+        """Rebuild the score ledger from every task, then update scores"""
+        from apps.tasks.scoring import rebuild_company_score_ledger
         
-        print(f"🔄 Updated ESG scores for {self.name} based on data entries:")
-        print(f"   Environmental: {self.environmental_score}")
-        print(f"   Social: {self.social_score}")
-        print(f"   Governance: {self.governance_score}")
-        print(f"   Overall: {self.overall_esg_score}")
-    
-    def _calculate_data_based_score(self, tasks, task_data, category):
-        """Calculate ESG score based on actual data entries and file uploads"""
-        if not tasks.exists():
-            return 0.0  # No tasks = no score
-        
-        total_score = 0.0
-        total_tasks = tasks.count()
-        
-        # Score based on data entries per task
-        for task in tasks:
-            task_score = 0.0
-            
-            # Points for data entries (50% of task score)
-            data_entries = task.data_entries or {}
-            if data_entries:
-                # Each data entry field gives points
-                data_fields = len([v for v in data_entries.values() if v and str(v).strip()])
-                if data_fields > 0:
-                    task_score += min(50, data_fields * 10)  # Up to 50 points for data
-            
-            # Points for file uploads (50% of task score)
-            file_count = task.attachments.count()
-            if file_count > 0:
-                task_score += min(50, file_count * 15)  # Up to 50 points for files
-            
-            total_score += task_score
-        
-        # Average score per task, then scale to 0-100
-        if total_tasks > 0:
-            avg_score = total_score / total_tasks
-            final_score = min(100, avg_score)
-        else:
-            final_score = 0.0
-        
-        # Bonus for having actual meter data (environmental category only)
-        if category == 'environmental':
-            energy_data = task_data.get('energy_consumption_kwh', 0)
-            water_data = task_data.get('water_usage_m3', 0)
-            gas_data = task_data.get('gas_usage_m3', 0)
-            
-            if energy_data > 0 or water_data > 0 or gas_data > 0:
-                final_score = min(100, final_score + 15)  # 15 point bonus for real meter data
-        
-        return final_score
+        rebuild_company_score_ledger(self)
+        self.update_esg_scores()
     
     def _calculate_data_boost(self, task_data):
         """Calculate bonus points for having real meter data entries"""
@@ -263,7 +214,8 @@ class Company(models.Model):
         if self.total_evidence_files > 0:
             self.evidence_completion_percentage = (self.uploaded_evidence_files / self.total_evidence_files) * 100
         
-        self.save()
+        # Only the percentages: a full save would overwrite the score ledger sums
+        self.save(update_fields=['data_completion_percentage', 'evidence_completion_percentage', 'updated_at'])
 
 
 class Location(models.Model):
@@ -487,4 +439,78 @@ class CompanyInvitation(models.Model):
         unique_together = ['company', 'email']
     
     def __str__(self):
-        return f"Invitation to {self.email} for {self.company.name}"
\ No newline at end of file
+        return f"Invitation to {self.email} for {self.company.name}"
+
+
+class Portfolio(models.Model):
+    """
+    A group of companies (e.g. a holding's subsidiaries) reported on together
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    
+    companies = models.ManyToManyField(
+        Company,
+        related_name='portfolios',
+        blank=True
+    )
+    members = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        related_name='portfolios',
+        blank=True,
+        help_text='Users who can view the portfolio aggregates'
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='created_portfolios'
+    )
+    
+    # Incremented whenever companies are added or removed (see below)
+    membership_version = models.PositiveIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Portfolio'
+        verbose_name_plural = 'Portfolios'
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    def get_data_version(self):
+        """
+        Version of the data behind the portfolio's aggregates: the membership
+        version plus the sum of the companies' data versions. Company versions
+        only grow and removals bump the membership version, so any change to
+        the underlying data gives a new value. The latest company updated_at
+        covers profile edits (name, sector, ...) that do not bump data_version.
+        """
+        totals = self.companies.aggregate(
+            data_version=Sum('data_version'), companies=Count('id'), updated_at=Max('updated_at')
+        )
+        updated_at = totals['updated_at'].timestamp() if totals['updated_at'] else 0
+        return f"{self.membership_version}.{totals['companies']}.{totals['data_version'] or 0}.{updated_at}"
+
+
+@receiver(m2m_changed, sender=Portfolio.companies.through)
+def bump_portfolio_membership_version(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate cached aggregates when a portfolio's companies change"""
+    if reverse:
+        # company.portfolios.add(...): instance is the company. A clear is
+        # caught before it runs, while the portfolios are still linked.
+        if action in ('post_add', 'post_remove'):
+            portfolios = Portfolio.objects.filter(pk__in=pk_set)
+        elif action == 'pre_clear':
+            portfolios = Portfolio.objects.filter(pk__in=instance.portfolios.values('pk'))
+        else:
+            return
+        portfolios.update(membership_version=models.F('membership_version') + 1)
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        Portfolio.objects.filter(pk=instance.pk).update(membership_version=models.F('membership_version') + 1)
+        instance.refresh_from_db(fields=['membership_version'])
@@ -0,0 +1,299 @@
+"""
+Bulk onboarding of companies, locations and meters
+
+Ingests a CSV (one row per meter, location or company) or a JSON list of
+companies and provisions them the way the onboarding wizard would: business
+info, locations with their meters, and the initial ESG tasks for the sector.
+Rows are written with bulk_create; task generation, the score ledger and the
+company metrics are computed once per company, in parallel across companies
+where the database allows concurrent writers.
+"""
+
+import csv
+import io
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connection, connections, transaction
+
+from .models import Company, Location
+from .serializers import BusinessInfoSerializer
+
+logger = logging.getLogger(__name__)
+
+# CSV columns: company columns repeat on every row of the company; location
+# and meter columns are optional (a row without them only declares the company)
+CSV_COMPANY_COLUMNS = [
+    'business_name', 'industry', 'employee_count', 'emirate_location',
+    'license_type', 'main_location', 'description',
+]
+CSV_LOCATION_COLUMNS = {
+    'location_name': 'name',
+    'location_address': 'address',
+    'location_emirate': 'emirate',
+    'floor_area': 'floor_area',
+    'floors': 'floors',
+    'building_type': 'building_type',
+    'ownership_type': 'ownership_type',
+    'is_primary': 'is_primary',
+}
+CSV_METER_COLUMNS = {
+    'meter_type': 'type',
+    'meter_number': 'meterNumber',
+    'meter_provider': 'provider',
+    'meter_description': 'description',
+}
+
+LOCATION_CHOICE_FIELDS = {
+    'emirate': {value for value, _ in Company.EMIRATE_CHOICES},
+    'building_type': {value for value, _ in Location.BUILDING_TYPE_CHOICES},
+    'ownership_type': {value for value, _ in Location.OWNERSHIP_TYPE_CHOICES},
+}
+
+DEFAULT_WORKERS = 4
+
+
+def _truthy(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def _number(value, cast):
+    if value in (None, ''):
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_onboarding_csv(text):
+    """Group flat CSV rows into company specs with nested locations and meters"""
+    specs = {}
+    for row in csv.DictReader(io.StringIO(text)):
+        row = {key.strip(): (value or '').strip() for key, value in row.items() if key}
+        name = row.get('business_name', '')
+        if not name:
+            continue
+        spec = specs.setdefault(name, {
+            **{column: row.get(column, '') for column in CSV_COMPANY_COLUMNS},
+            'locations': [],
+        })
+
+        location_name = row.get('location_name')
+        if not location_name:
+            continue
+        location = next((loc for loc in spec['locations'] if loc['name'] == location_name), None)
+        if location is None:
+            location = {field: row.get(column, '') for column, field in CSV_LOCATION_COLUMNS.items()}
+            location['meters'] = []
+            spec['locations'].append(location)
+
+        if row.get('meter_type') or row.get('meter_number'):
+            location['meters'].append(
+                {field: row.get(column, '') for column, field in CSV_METER_COLUMNS.items()}
+            )
+    return list(specs.values())
+
+
+def parse_onboarding_file(name, content):
+    """Company specs from an uploaded .csv or .json file"""
+    text = content.decode('utf-8-sig') if isinstance(content, bytes) else content
+    if name.lower().endswith('.json'):
+        data = json.loads(text)
+        return data.get('companies', []) if isinstance(data, dict) else data
+    return parse_onboarding_csv(text)
+
+
+def _type_error(expected, value):
+    return [f'Invalid data. Expected {expected}, but got {type(value).__name__}.']
+
+
+def _build_company(spec):
+    """Validated, unsaved Company (and its Location rows) for one spec"""
+    if not isinstance(spec, dict):
+        return None, [], {'non_field_errors': _type_error('a dictionary', spec)}
+    serializer = BusinessInfoSerializer(data={
+        'business_name': spec.get('business_name'),
+        'industry': spec.get('industry'),
+        'employee_count': spec.get('employee_count'),
+        'emirate_location': spec.get('emirate_location') or '',
+        'license_type': spec.get('license_type') or '',
+    })
+    if not serializer.is_valid():
+        return None, [], serializer.errors
+
+    data = serializer.validated_data
+    company = Company(
+        name=data['business_name'],
+        description=spec.get('description') or None,
+        business_sector=data['industry'],
+        employee_size=data['employee_count'],
+        emirate=data.get('emirate_location') or None,
+        license_type=data.get('license_type') or None,
+        main_location=spec.get('main_location') or 'Dubai, UAE',
+        scoping_data=spec.get('scoping_data') or {},
+        esg_scoping_completed=bool(spec.get('scoping_data')),
+        setup_step=4,
+    )
+
+    location_specs = spec.get('locations') or [{'name': 'Main Location', 'address': company.main_location}]
+    if not isinstance(location_specs, list):
+        return None, [], {'locations': _type_error('a list', location_specs)}
+    for index, loc in enumerate(location_specs):
+        if not isinstance(loc, dict):
+            return None, [], {'locations': {f'Location {index + 1}': _type_error('a dictionary', loc)}}
+        meter_specs = loc.get('meters') or []
+        if not isinstance(meter_specs, list) or not all(isinstance(meter, dict) for meter in meter_specs):
+            return None, [], {'locations': {
+                loc.get('name') or f'Location {index + 1}': {'meters': ['Expected a list of dictionaries.']}
+            }}
+
+    has_primary = any(_truthy(loc.get('is_primary', '')) for loc in location_specs)
+    locations = []
+    for index, loc in enumerate(location_specs):
+        choice_errors = {
+            field: [f'"{loc.get(field)}" is not a valid choice.']
+            for field, choices in LOCATION_CHOICE_FIELDS.items()
+            if loc.get(field) and loc.get(field) not in choices
+        }
+        if choice_errors:
+            return None, [], {'locations': {loc.get('name') or f'Location {index + 1}': choice_errors}}
+        meters = [meter for meter in (loc.get('meters') or []) if any(meter.values())]
+        locations.append(Location(
+            company=company,
+            name=loc.get('name') or f'Location {index + 1}',
+            address=loc.get('address') or company.main_location,
+            emirate=loc.get('emirate') or company.emirate or 'dubai',
+            total_floor_area=_number(loc.get('floor_area'), float),
+            number_of_floors=_number(loc.get('floors'), int),
+            building_type=loc.get('building_type') or None,
+            ownership_type=loc.get('ownership_type') or None,
+            has_separate_meters=bool(meters),
+            meters_info=meters,
+            # First location is primary unless the file marks one
+            is_primary=_truthy(loc.get('is_primary', '')) if has_primary else index == 0,
+        ))
+    return company, locations, None
+
+
+def _provision_tasks(company, locations, created_by):
+    """Generate, score and summarize the initial tasks of one new company"""
+    from apps.tasks.models import Task
+    from apps.tasks.markdown_parser import parse_sector_questions
+    from apps.tasks.scoring import rebuild_company_score_ledger
+    from apps.tasks.utils import (
+        _collect_meter_information, build_initial_tasks, refresh_company_task_metrics
+    )
+
+    questions = parse_sector_questions(company.business_sector)
+    tasks = build_initial_tasks(company, created_by, questions, _collect_meter_information(locations))
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks, batch_size=500)
+        rebuild_company_score_ledger(company)
+        company.onboarding_completed = True
+        company.save(update_fields=['onboarding_completed', 'updated_at'])
+    refresh_company_task_metrics(company)
+    return len(tasks)
+
+
+def bulk_onboard(specs, created_by, workers=DEFAULT_WORKERS, generate_tasks=True, dry_run=False):
+    """
+    Provision companies from a list of specs. Companies whose name already
+    exists are skipped. Returns a report with counts, per-company errors and
+    throughput.
+    """
+    started = time.monotonic()
+    report = {
+        'companies_received': len(specs),
+        'companies_created': 0,
+        'companies_skipped': [],
+        'locations_created': 0,
+        'meters_registered': 0,
+        'tasks_created': 0,
+        'errors': [],
+    }
+
+    names = [
+        spec.get('business_name') for spec in specs
+        if isinstance(spec, dict) and isinstance(spec.get('business_name'), str)
+    ]
+    existing = set(Company.objects.filter(name__in=names).values_list('name', flat=True))
+
+    companies = []
+    locations = []
+    locations_by_company = {}
+    seen = set()
+    for index, spec in enumerate(specs):
+        # Non-dict rows and non-string names are reported by _build_company
+        name = spec.get('business_name') if isinstance(spec, dict) else None
+        if not isinstance(name, str):
+            name = None
+        if name in existing or name in seen:
+            report['companies_skipped'].append(name)
+            continue
+        company, company_locations, errors = _build_company(spec)
+        if errors:
+            report['errors'].append({'row': index + 1, 'business_name': name, 'errors': errors})
+            continue
+        seen.add(company.name)
+        companies.append(company)
+        locations.extend(company_locations)
+        locations_by_company[company.pk] = company_locations
+
+    report['meters_registered'] = sum(len(location.meters_info) for location in locations)
+    if dry_run:
+        report['companies_created'] = len(companies)
+        report['locations_created'] = len(locations)
+        report['elapsed_seconds'] = round(time.monotonic() - started, 3)
+        report['dry_run'] = True
+        return report
+
+    with transaction.atomic():
+        Company.objects.bulk_create(companies, batch_size=500)
+        Location.objects.bulk_create(locations, batch_size=500)
+    report['companies_created'] = len(companies)
+    report['locations_created'] = len(locations)
+
+    if generate_tasks and companies:
+        # SQLite allows a single writer; other backends provision in parallel
+        if connections['default'].vendor == 'sqlite':
+            workers = 1
+        workers = max(1, min(workers, len(companies)))
+
+        def provision(company):
+            try:
+                return company, _provision_tasks(company, locations_by_company[company.pk], created_by), None
+            except Exception as e:
+                logger.error(f"Bulk onboarding: task generation failed for {company.name}: {e}")
+                return company, 0, str(e)
+
+        def provision_in_worker(company):
+            try:
+                return provision(company)
+            finally:
+                # Pool threads open their own connection; the request thread keeps its own
+                connection.close()
+
+        if workers == 1:
+            results = map(provision, companies)
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+            results = executor.map(provision_in_worker, companies)
+        for company, task_count, error in results:
+            report['tasks_created'] += task_count
+            if error:
+                report['errors'].append({'business_name': company.name, 'errors': {'tasks': [error]}})
+        if workers > 1:
+            executor.shutdown()
+
+    elapsed = time.monotonic() - started
+    report['workers'] = workers if generate_tasks else 0
+    report['elapsed_seconds'] = round(elapsed, 3)
+    report['companies_per_second'] = round(len(companies) / elapsed, 1) if elapsed > 0 else None
+    report['tasks_per_second'] = round(report['tasks_created'] / elapsed, 1) if elapsed > 0 else None
+    logger.info(
+        f"Bulk onboarding: {len(companies)} companies, {len(locations)} locations, "
+        f"{report['tasks_created']} tasks in {elapsed:.2f}s"
+    )
+    return report
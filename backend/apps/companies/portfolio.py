@@ -0,0 +1,251 @@
+"""
+Portfolio aggregates
+
+Roll-ups of scores, consumption and compliance across the companies of a
+portfolio. Every section is computed with a handful of set-based queries
+(one GROUP BY company per data source plus group-wide aggregates), so the
+cost does not grow with a Python loop over companies. Results are cached
+per portfolio and keyed on ``Portfolio.get_data_version()``, which changes
+whenever a member company's data or profile or the membership itself
+changes. Compliance is also keyed on the day its overdue counts refer to.
+"""
+
+import logging
+from datetime import datetime, time, timedelta
+from django.core.cache import cache
+from django.db.models import Avg, Case, CharField, Count, Max, Min, Q, Sum, Value, When
+from django.utils import timezone
+
+from apps.dashboard.trends import EXTRACTED_TREND_FIELDS
+from apps.files.models import ExtractedFileData
+from apps.tasks.models import Task
+from .models import Company
+
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_CACHE_TIMEOUT = 60 * 60 * 6
+
+SCORE_PILLARS = {
+    'overall': 'overall_esg_score',
+    'environmental': 'environmental_score',
+    'social': 'social_score',
+    'governance': 'governance_score',
+}
+
+# Overall score bands for the distribution: (label, lower bound inclusive)
+SCORE_BANDS = [
+    ('0-20', 0),
+    ('20-40', 20),
+    ('40-60', 40),
+    ('60-80', 60),
+    ('80-100', 80),
+]
+
+ESG_CATEGORIES = ['environmental', 'social', 'governance']
+
+
+def _round(value, digits=1):
+    return round(value, digits) if value is not None else None
+
+
+def _score_band():
+    """SQL expression labelling a company's overall score with its band"""
+    whens = [
+        When(overall_esg_score__lt=upper, then=Value(label))
+        for (label, _), (_, upper) in zip(SCORE_BANDS, SCORE_BANDS[1:])
+    ]
+    return Case(*whens, default=Value(SCORE_BANDS[-1][0]), output_field=CharField())
+
+
+def compute_portfolio_scores(portfolio):
+    """Per-company scores, group statistics, score band and sector distributions"""
+    companies = Company.objects.filter(portfolios=portfolio)
+
+    group = companies.aggregate(
+        companies=Count('id'),
+        **{f'{pillar}_avg': Avg(field) for pillar, field in SCORE_PILLARS.items()},
+        **{f'{pillar}_min': Min(field) for pillar, field in SCORE_PILLARS.items()},
+        **{f'{pillar}_max': Max(field) for pillar, field in SCORE_PILLARS.items()},
+    )
+    bands = dict(
+        companies.annotate(band=_score_band()).values('band').annotate(
+            count=Count('id')
+        ).values_list('band', 'count')
+    )
+    sectors = companies.values('business_sector').annotate(
+        companies=Count('id'), overall=Avg('overall_esg_score')
+    ).order_by('business_sector')
+
+    return {
+        'companies': group['companies'],
+        'group': {
+            pillar: {
+                'average': _round(group[f'{pillar}_avg']),
+                'min': _round(group[f'{pillar}_min']),
+                'max': _round(group[f'{pillar}_max']),
+            }
+            for pillar in SCORE_PILLARS
+        },
+        'distribution': [{'band': label, 'companies': bands.get(label, 0)} for label, _ in SCORE_BANDS],
+        'sectors': [
+            {
+                'sector': row['business_sector'],
+                'companies': row['companies'],
+                'overall_average': _round(row['overall']),
+            }
+            for row in sectors
+        ],
+        'by_company': [
+            {
+                'company_id': str(row['id']),
+                'name': row['name'],
+                'sector': row['business_sector'],
+                **{pillar: row[field] for pillar, field in SCORE_PILLARS.items()},
+            }
+            for row in companies.values('id', 'name', 'business_sector', *SCORE_PILLARS.values()).order_by('name')
+        ],
+    }
+
+
+def compute_portfolio_consumption(portfolio, period_start, period_end):
+    """Extracted file metrics in the period, summed (or averaged) per company and for the group"""
+    window = (
+        timezone.make_aware(datetime.combine(period_start, time.min)),
+        timezone.make_aware(datetime.combine(period_end + timedelta(days=1), time.min)),
+    )
+    rows = ExtractedFileData.objects.filter(
+        task_attachment__task__company__portfolios=portfolio,
+        processing_status='completed',
+        extraction_date__gte=window[0],
+        extraction_date__lt=window[1],
+    )
+    aggregates = {field: agg(field) for field, agg in EXTRACTED_TREND_FIELDS.items()}
+
+    group = rows.aggregate(files=Count('id'), **aggregates)
+    per_company = {
+        row.pop('task_attachment__task__company'): row
+        for row in rows.values('task_attachment__task__company').annotate(
+            files=Count('id'), **aggregates
+        ).order_by()
+    }
+
+    # Companies without files in the period still get a (zero) row
+    by_company = []
+    for company_id, name in Company.objects.filter(portfolios=portfolio).order_by('name').values_list('id', 'name'):
+        totals = per_company.get(company_id, {})
+        by_company.append({
+            'company_id': str(company_id),
+            'name': name,
+            'files': totals.get('files', 0),
+            **{
+                field: _round(totals.get(field), 2) if agg is not Sum else _round(totals.get(field) or 0.0, 2)
+                for field, agg in EXTRACTED_TREND_FIELDS.items()
+            },
+        })
+
+    return {
+        'period_start': period_start.isoformat(),
+        'period_end': period_end.isoformat(),
+        'group': {
+            'files': group['files'],
+            **{
+                field: _round(group[field], 2) if agg is not Sum else _round(group[field] or 0.0, 2)
+                for field, agg in EXTRACTED_TREND_FIELDS.items()
+            },
+        },
+        'by_company': by_company,
+    }
+
+
+def compute_portfolio_compliance(portfolio, as_of):
+    """
+    Task completion and data/evidence completeness per company and for the
+    group. Open tasks due before the day ``as_of`` count as overdue.
+    """
+    overdue_before = timezone.make_aware(datetime.combine(as_of, time.min))
+    task_counts = {
+        'tasks': Count('id'),
+        'completed': Count('id', filter=Q(status='completed')),
+        'overdue': Count('id', filter=Q(due_date__lt=overdue_before) & ~Q(status='completed')),
+        **{
+            f'{category}_tasks': Count('id', filter=Q(category=category))
+            for category in ESG_CATEGORIES
+        },
+        **{
+            f'{category}_completed': Count('id', filter=Q(category=category, status='completed'))
+            for category in ESG_CATEGORIES
+        },
+    }
+    tasks = Task.objects.filter(company__portfolios=portfolio)
+    per_company = {
+        row.pop('company'): row
+        for row in tasks.values('company').annotate(**task_counts).order_by()
+    }
+    group = tasks.aggregate(**task_counts)
+
+    companies = Company.objects.filter(portfolios=portfolio)
+    completeness = companies.aggregate(
+        data_completion=Avg('data_completion_percentage'),
+        evidence_completion=Avg('evidence_completion_percentage'),
+    )
+
+    def summary(counts):
+        total = counts.get('tasks') or 0
+        return {
+            'tasks': total,
+            'completed': counts.get('completed') or 0,
+            'overdue': counts.get('overdue') or 0,
+            'completion_percentage': round((counts.get('completed') or 0) / total * 100, 1) if total else 0.0,
+            'categories': {
+                category: {
+                    'tasks': counts.get(f'{category}_tasks') or 0,
+                    'completed': counts.get(f'{category}_completed') or 0,
+                }
+                for category in ESG_CATEGORIES
+            },
+        }
+
+    return {
+        'group': {
+            **summary(group),
+            'data_completion_average': _round(completeness['data_completion']),
+            'evidence_completion_average': _round(completeness['evidence_completion']),
+        },
+        'by_company': [
+            {
+                'company_id': str(row['id']),
+                'name': row['name'],
+                **summary(per_company.get(row['id'], {})),
+                'data_completion_percentage': row['data_completion_percentage'],
+                'evidence_completion_percentage': row['evidence_completion_percentage'],
+            }
+            for row in companies.values(
+                'id', 'name', 'data_completion_percentage', 'evidence_completion_percentage'
+            ).order_by('name')
+        ],
+    }
+
+
+PORTFOLIO_SECTIONS = {
+    'scores': compute_portfolio_scores,
+    'consumption': compute_portfolio_consumption,
+    'compliance': compute_portfolio_compliance,
+}
+
+
+def get_portfolio_aggregates(portfolio, section, *args):
+    """
+    Cached portfolio section. ``args`` (the consumption period, the
+    compliance date) are part of the key together with the portfolio data
+    version.
+    """
+    data_version = portfolio.get_data_version()
+    params = '_'.join(str(arg) for arg in args)
+    cache_key = f"portfolio_{portfolio.id}_{section}_{params}_{data_version}"
+    result = cache.get(cache_key)
+    if result is None:
+        result = PORTFOLIO_SECTIONS[section](portfolio, *args)
+        result['data_version'] = data_version
+        cache.set(cache_key, result, PORTFOLIO_CACHE_TIMEOUT)
+        logger.info(f"📊 Computed portfolio {section} for {portfolio.name} (data version {data_version})")
+    return result
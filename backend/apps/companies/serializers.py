@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Company, Location, CompanySettings, CompanyInvitation
+from .models import Company, Location, CompanySettings, CompanyInvitation, Portfolio
 
 
 class LocationSerializer(serializers.ModelSerializer):
@@ -43,6 +43,13 @@ class CompanySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'total_users']
     
+    def update(self, instance, validated_data):
+        """Save only the submitted fields; the score ledger and data_version are updated concurrently"""
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+    
     def get_admin_users_count(self, obj):
         """Get count of admin users"""
         return obj.users.filter(role='admin').count()
@@ -150,7 +157,9 @@ class BusinessInfoSerializer(serializers.Serializer):
         company.emirate = self.validated_data.get('emirate_location')
         company.license_type = self.validated_data.get('license_type')
         company.setup_step = max(company.setup_step, 2)  # Move to step 2
-        company.save()
+        company.save(update_fields=[
+            'name', 'business_sector', 'employee_size', 'emirate', 'license_type', 'setup_step', 'updated_at'
+        ])
         return company
 
 
@@ -197,7 +206,7 @@ class LocationDataSerializer(serializers.Serializer):
         
         # Update company step
         company.setup_step = max(company.setup_step, 3)
-        company.save()
+        company.save(update_fields=['setup_step', 'updated_at'])
         
         return [main_location] + additional_locations
 
@@ -276,4 +285,17 @@ class ProgressTrackerSerializer(serializers.Serializer):
     category_details = serializers.DictField()
     
     # Next steps
-    next_actions = serializers.ListField()
\ No newline at end of file
+    next_actions = serializers.ListField()
+    
+    # Per-task rows (only with ?details=true)
+    task_details = serializers.ListField(required=False)
+
+
+class PortfolioSerializer(serializers.ModelSerializer):
+    """Serializer for portfolios (groups of companies)"""
+    company_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Portfolio
+        fields = ['id', 'name', 'description', 'company_count', 'created_at', 'updated_at']
+        read_only_fields = fields
@@ -8,6 +8,14 @@ router = DefaultRouter()
 router.register('', views.CompanyViewSet, basename='company')
 
 urlpatterns = [
+    # Portfolios (groups of companies); listed before the router, whose
+    # detail route would otherwise match "portfolios/"
+    path('portfolios/', views.portfolio_list, name='portfolio_list'),
+    path('portfolios/<uuid:portfolio_id>/', views.portfolio_detail, name='portfolio_detail'),
+    path('portfolios/<uuid:portfolio_id>/scores/', views.portfolio_aggregates, {'section': 'scores'}, name='portfolio_scores'),
+    path('portfolios/<uuid:portfolio_id>/consumption/', views.portfolio_aggregates, {'section': 'consumption'}, name='portfolio_consumption'),
+    path('portfolios/<uuid:portfolio_id>/compliance/', views.portfolio_aggregates, {'section': 'compliance'}, name='portfolio_compliance'),
+    
     # Company viewset routes (includes /me, /update_business_info, etc.)
     path('', include(router.urls)),
     
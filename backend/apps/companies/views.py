@@ -3,14 +3,21 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
 import logging
 
-from .models import Company, Location, CompanySettings, CompanyInvitation
+from .models import Company, Location, CompanySettings, CompanyInvitation, Portfolio
 from .serializers import (
     CompanySerializer, LocationSerializer, CompanyUpdateSerializer,
     BusinessInfoSerializer, LocationDataSerializer, CompanySettingsSerializer,
-    CompanyInvitationSerializer, DashboardStatsSerializer, ProgressTrackerSerializer
+    CompanyInvitationSerializer, DashboardStatsSerializer, ProgressTrackerSerializer,
+    PortfolioSerializer
 )
+from .portfolio import get_portfolio_aggregates
+from . import onboarding
 
 logger = logging.getLogger(__name__)
 
@@ -152,16 +159,22 @@ class CompanyViewSet(viewsets.ModelViewSet):
             company.scoping_data.update(scoping_data)
         else:
             company.scoping_data = scoping_data
+        # Only the fields changed here: task generation below updates the
+        # score ledger and data_version concurrently
+        update_fields = ['scoping_data', 'updated_at']
         
         # Update completion status if provided
         if request.data.get('esg_scoping_completed') is not None:
             company.esg_scoping_completed = request.data.get('esg_scoping_completed')
+            update_fields.append('esg_scoping_completed')
         
         if request.data.get('setup_step') is not None:
             company.setup_step = request.data.get('setup_step')
+            update_fields.append('setup_step')
             
         if request.data.get('onboarding_completed') is not None:
             company.onboarding_completed = request.data.get('onboarding_completed')
+            update_fields.append('onboarding_completed')
             logger.info(f"🎯 Onboarding completion status set to: {company.onboarding_completed}")
             
             # Generate initial tasks when onboarding is completed
@@ -179,7 +192,7 @@ class CompanyViewSet(viewsets.ModelViewSet):
                 generated_tasks = generate_initial_tasks_for_company(company, created_by=request.user)
                 logger.info(f"✅ Generated {len(generated_tasks)} initial tasks for {company.name}")
         
-        company.save()
+        company.save(update_fields=update_fields)
         
         logger.info(f"ESG scoping data updated for company: {company.name}")
         
@@ -231,6 +244,44 @@ class CompanyViewSet(viewsets.ModelViewSet):
             )
             logger.info(f"   Created location: {location.name} with {len(loc_data.get('meters', []))} meters")
     
+    @action(detail=False, methods=['post'], url_path='bulk-onboard')
+    def bulk_onboard(self, request):
+        """
+        Onboard many companies at once from an uploaded CSV/JSON file or a
+        JSON body {"companies": [...]} (staff only)
+        """
+        if not request.user.is_staff:
+            return Response({
+                'error': 'Only staff users can bulk onboard companies'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            upload = request.FILES.get('file')
+            if upload:
+                specs = onboarding.parse_onboarding_file(upload.name, upload.read())
+            elif isinstance(request.data, dict):
+                specs = request.data.get('companies')
+            else:
+                specs = None
+        except ValueError as e:
+            return Response({'error': f'Could not parse file: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(specs, list) or not specs:
+            return Response({
+                'error': 'Provide a CSV/JSON file or a non-empty "companies" list'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        report = onboarding.bulk_onboard(
+            specs,
+            request.user,
+            generate_tasks=str(request.data.get('generate_tasks', 'true')).lower() != 'false',
+            dry_run=str(request.data.get('dry_run', 'false')).lower() == 'true',
+        )
+        logger.info(f"Bulk onboarding by {request.user.email}: {report['companies_created']} companies")
+
+        response_status = status.HTTP_201_CREATED if report['companies_created'] and not report.get('dry_run') else status.HTTP_200_OK
+        return Response(report, status=response_status)
+
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
         """
@@ -285,78 +336,46 @@ class CompanyViewSet(viewsets.ModelViewSet):
         
         company = request.user.company
         
-        # Get all tasks for the company
         from apps.tasks.models import Task, TaskAttachment
+        from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+        from django.db.models.functions import Coalesce
         
         all_tasks = Task.objects.filter(company=company)
         
-        # Calculate file-based progress
-        total_tasks = all_tasks.count()
-        
-        # Helper function to determine expected files for a task
-        def get_expected_files(task):
-            title_lower = task.title.lower()
-            action_lower = (task.action_required or '').lower()
-            combined = f"{title_lower} {action_lower}"
-            
-            # Check for meter reading tasks (need 3 monthly bills)
-            if 'meter:' in title_lower and 'monthly consumption' in action_lower:
-                return 3  # 3 months of ADDC bills
-            # Check for monthly tracking tasks
-            elif ('track' in combined and 'monthly' in combined) or 'monthly consumption' in action_lower:
-                return 3  # 3 months of data
-            # Check for utility bills/tracking tasks
-            elif 'bill' in combined or 'invoice' in combined or 'utility' in combined:
-                return 3  # 3 months of bills
-            # Check for emissions monitoring (reports + permits)
-            elif 'emissions' in combined or 'air quality' in combined:
-                return 2  # Monitoring data + permits
-            # Check for waste management (tracking + disposal)
-            elif 'waste' in combined and ('disposal' in combined or 'track' in combined):
-                return 2  # Waste tracking + disposal records
-            # Check for recycling programs
-            elif 'recycling' in combined or 'reuse' in combined:
-                return 2  # Process diagrams + records
-            # Check for wastewater treatment
-            elif 'wastewater' in combined:
-                return 2  # Treatment reports + compliance
-            # Default to 1 file for certificates, assessments, etc.
-            else:
-                return 1
+        # Attachment count per task as a correlated subquery, so it can be
+        # summed per category without the join multiplying expected_files
+        attachment_counts = TaskAttachment.objects.filter(
+            task=OuterRef('pk')
+        ).order_by().values('task').annotate(total=Count('id')).values('total')
+        annotated_tasks = all_tasks.annotate(
+            uploaded=Coalesce(Subquery(attachment_counts, output_field=IntegerField()), 0)
+        )
         
-        # Calculate detailed progress
-        total_expected_files = 0
-        total_uploaded_files = 0
+        # One grouped query for all category totals
+        category_rows = annotated_tasks.order_by().values('category').annotate(
+            task_count=Count('id'),
+            expected=Sum('expected_files'),
+            uploaded_files=Sum('uploaded'),
+        )
         
-        # Category-specific counters
+        # Category-specific counters (unknown categories count as environmental)
         category_progress = {
-            'environmental': {'expected': 0, 'uploaded': 0, 'tasks': []},
-            'social': {'expected': 0, 'uploaded': 0, 'tasks': []},
-            'governance': {'expected': 0, 'uploaded': 0, 'tasks': []},
+            'environmental': {'expected': 0, 'uploaded': 0, 'tasks': 0},
+            'social': {'expected': 0, 'uploaded': 0, 'tasks': 0},
+            'governance': {'expected': 0, 'uploaded': 0, 'tasks': 0},
         }
+        for row in category_rows:
+            category = row['category'] if row['category'] in category_progress else 'environmental'
+            category_progress[category]['expected'] += row['expected'] or 0
+            category_progress[category]['uploaded'] += row['uploaded_files'] or 0
+            category_progress[category]['tasks'] += row['task_count']
         
-        # Process each task
-        for task in all_tasks:
-            expected = get_expected_files(task)
-            uploaded = task.attachments.count()  # Count actual attachments
-            
-            total_expected_files += expected
-            total_uploaded_files += uploaded
-            
-            # Track by category
-            category = task.category if task.category in category_progress else 'environmental'
-            category_progress[category]['expected'] += expected
-            category_progress[category]['uploaded'] += uploaded
-            
-            # Store task details for frontend
-            task_detail = {
-                'id': str(task.id),
-                'title': task.title[:50] + '...' if len(task.title) > 50 else task.title,
-                'expected': expected,
-                'uploaded': uploaded,
-                'status': 'complete' if uploaded >= expected else 'in_progress' if uploaded > 0 else 'pending'
-            }
-            category_progress[category]['tasks'].append(task_detail)
+        total_tasks = sum(data['tasks'] for data in category_progress.values())
+        total_expected_files = sum(data['expected'] for data in category_progress.values())
+        total_uploaded_files = sum(data['uploaded'] for data in category_progress.values())
+        
+        def task_status(uploaded, expected):
+            return 'complete' if uploaded >= expected else 'in_progress' if uploaded > 0 else 'pending'
         
         # Calculate percentages
         def calc_percentage(uploaded, expected):
@@ -380,23 +399,28 @@ class CompanyViewSet(viewsets.ModelViewSet):
             category_progress['governance']['expected']
         )
         
-        # Generate category details for frontend display
+        # Generate category details for frontend display (first 4 tasks per category)
+        category_filters = {
+            'environmental': ~Q(category__in=['social', 'governance']),
+            'social': Q(category='social'),
+            'governance': Q(category='governance'),
+        }
         category_details = {}
-        
-        for category, data in category_progress.items():
+        for category, category_filter in category_filters.items():
             category_details[category] = {}
-            for task in data['tasks'][:4]:  # Show first 4 tasks
+            for task in annotated_tasks.filter(category_filter).values('title', 'expected_files', 'uploaded')[:4]:
+                title = task['title'][:50] + '...' if len(task['title']) > 50 else task['title']
                 # Create simple key from task title
-                key = task['title'].lower().replace(' ', '_')[:20]
-                category_details[category][key] = task['status']
+                key = title.lower().replace(' ', '_')[:20]
+                category_details[category][key] = task_status(task['uploaded'], task['expected_files'])
         
         # Generate next actions based on incomplete tasks
         next_actions = []
         
         # Find tasks that need evidence
-        tasks_needing_evidence = all_tasks.filter(
-            attachments__isnull=True
-        ).distinct()[:3]
+        tasks_needing_evidence = annotated_tasks.filter(
+            uploaded=0
+        ).only('title', 'action_required')[:3]
         
         for task in tasks_needing_evidence:
             next_actions.append({
@@ -429,9 +453,23 @@ class CompanyViewSet(viewsets.ModelViewSet):
             'next_actions': next_actions
         }
         
+        # Per-task rows only when the tracker list asks for them
+        if request.query_params.get('details', '').lower() in ('1', 'true', 'yes'):
+            progress_data['task_details'] = [
+                {
+                    'id': str(task['id']),
+                    'title': task['title'],
+                    'category': task['category'],
+                    'expected': task['expected_files'],
+                    'uploaded': task['uploaded'],
+                    'status': task_status(task['uploaded'], task['expected_files'])
+                }
+                for task in annotated_tasks.values(
+                    'id', 'title', 'category', 'expected_files', 'uploaded'
+                ).iterator(chunk_size=500)
+            ]
+        
         # Log the calculation for debugging
-        import logging
-        logger = logging.getLogger(__name__)
         logger.info(f"Progress Tracker Calculation for {company.name}:")
         logger.info(f"  Total tasks: {total_tasks}")
         logger.info(f"  Total expected files: {total_expected_files}")
@@ -580,4 +618,80 @@ def company_overview(request):
         ]
     }
     
-    return Response(overview_data)
\ No newline at end of file
+    return Response(overview_data)
+
+
+def _user_portfolios(user):
+    """Portfolios the user created or was made a member of (staff see all)"""
+    portfolios = Portfolio.objects.all()
+    if not user.is_staff:
+        portfolios = portfolios.filter(Q(members=user) | Q(created_by=user)).distinct()
+    return portfolios
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def portfolio_list(request):
+    """List the portfolios (groups of companies) visible to the user"""
+    portfolios = _user_portfolios(request.user).annotate(company_count=Count('companies', distinct=True))
+    serializer = PortfolioSerializer(portfolios, many=True)
+    
+    return Response({
+        'portfolios': serializer.data,
+        'total_portfolios': len(serializer.data)
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def portfolio_detail(request, portfolio_id):
+    """Get a portfolio and its member companies"""
+    portfolio = get_object_or_404(
+        _user_portfolios(request.user).annotate(company_count=Count('companies', distinct=True)),
+        id=portfolio_id
+    )
+    companies = portfolio.companies.order_by('name').values('id', 'name', 'business_sector', 'emirate')
+    
+    return Response({
+        'portfolio': PortfolioSerializer(portfolio).data,
+        'companies': list(companies),
+        'data_version': portfolio.get_data_version()
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def portfolio_aggregates(request, portfolio_id, section):
+    """
+    Group roll-up of a portfolio section: scores, consumption or compliance.
+    Consumption takes period_start/period_end (YYYY-MM-DD, default the last
+    12 months); compliance counts tasks overdue as of today.
+    """
+    portfolio = get_object_or_404(_user_portfolios(request.user), id=portfolio_id)
+    
+    args = ()
+    if section == 'consumption':
+        raw_start = request.query_params.get('period_start')
+        raw_end = request.query_params.get('period_end')
+        try:
+            period_end = parse_date(raw_end) if raw_end else timezone.now().date()
+            period_start = parse_date(raw_start) if raw_start else period_end and period_end - timedelta(days=365)
+        except ValueError:
+            period_start = period_end = None
+        if period_start is None or period_end is None:
+            return Response({
+                'error': 'period_start and period_end must be valid YYYY-MM-DD dates'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if period_start > period_end:
+            return Response({
+                'error': 'period_start must be on or before period_end'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        args = (period_start, period_end)
+    elif section == 'compliance':
+        # Overdue counts change with the day, not only with the data
+        args = (timezone.localdate(),)
+    
+    return Response({
+        'portfolio': {'id': str(portfolio.id), 'name': portfolio.name},
+        section: get_portfolio_aggregates(portfolio, section, *args)
+    })
\ No newline at end of file
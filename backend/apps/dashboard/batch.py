@@ -0,0 +1,179 @@
+"""
+Batched dashboard data loading
+
+The dashboard page renders a dozen widgets that each used to be fetched with
+a separate request. ``build_batch_payload`` computes any subset of them in
+one pass, sharing a ``DashboardDataContext`` so overlapping queries (the
+company's completed extraction records, task aggregates, DashboardMetric
+rows, ...) run once.
+"""
+
+import logging
+from django.utils.functional import cached_property
+
+from .models import DashboardMetric, DashboardWidget
+from .serializers import (
+    DashboardMetricSerializer, AlertSummarySerializer, ESGTrendsSerializer,
+    DashboardInsightSerializer, QuickStatsSerializer, KPISerializer
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardDataContext:
+    """
+    Per-request cache of the company data shared between widgets
+    """
+
+    def __init__(self, company):
+        self.company = company
+
+    @cached_property
+    def extracted_records(self):
+        """All completed extraction records, newest first, loaded once"""
+        from .enhanced_views import load_extracted_records
+        return load_extracted_records(self.company)
+
+    @cached_property
+    def task_stats(self):
+        """Task counts by status (and completed today), one aggregate query"""
+        from .enhanced_views import get_task_statistics
+        return get_task_statistics(self.company)
+
+    def extracted_records_for(self, category):
+        """Records whose task category contains ``category`` (icontains semantics)"""
+        category = category.lower()
+        return [
+            record for record in self.extracted_records
+            if category in (record.task_attachment.task.category or '').lower()
+        ]
+
+    @cached_property
+    def current_metrics(self):
+        metrics = list(
+            DashboardMetric.objects.filter(
+                company=self.company,
+                is_current=True
+            ).order_by('-calculated_at')
+        )
+        if not metrics:
+            from .metrics import refresh_company_metrics
+            metrics = refresh_company_metrics(self.company, force=True)
+        return metrics
+
+
+def _overview(context):
+    from .enhanced_views import build_dashboard_overview
+    return build_dashboard_overview(
+        context.company, extracted_records=context.extracted_records, task_stats=context.task_stats
+    )
+
+
+def _metrics(context):
+    return DashboardMetricSerializer(context.current_metrics, many=True).data
+
+
+def _alert_summary(context):
+    from .views import _build_alert_summary
+    return AlertSummarySerializer(_build_alert_summary(context.company)).data
+
+
+def _quick_stats(context):
+    from .views import _build_quick_stats
+    return QuickStatsSerializer(_build_quick_stats(context.company, task_stats=context.task_stats)).data
+
+
+def _kpis(context):
+    from .views import _get_company_kpis
+    return KPISerializer(_get_company_kpis(context.company), many=True).data
+
+
+def _trends(context):
+    from .views import _get_esg_trends
+    return ESGTrendsSerializer(_get_esg_trends(context.company)).data
+
+
+def _insights(context):
+    from .views import _build_dashboard_insights
+    return DashboardInsightSerializer(_build_dashboard_insights(context.company)).data
+
+
+def _file_data(category):
+    def builder(context):
+        from .views import _build_file_data_payload
+        return _build_file_data_payload(category, context.extracted_records_for(category))
+    return builder
+
+
+# Widget key -> payload builder. Keys mirror the standalone endpoints.
+WIDGET_BUILDERS = {
+    'overview': _overview,
+    'metrics': _metrics,
+    'alert_summary': _alert_summary,
+    'quick_stats': _quick_stats,
+    'kpis': _kpis,
+    'trends': _trends,
+    'insights': _insights,
+    'social_file_data': _file_data('social'),
+    'environmental_file_data': _file_data('environmental'),
+    'governance_file_data': _file_data('governance'),
+}
+
+# Configured DashboardWidget types -> batch widget keys
+WIDGET_TYPE_KEYS = {
+    'esg_scores': ['overview'],
+    'recent_activity': ['overview'],
+    'recommendations': ['insights'],
+    'compliance_alerts': ['alert_summary'],
+    'trend_chart': ['trends'],
+    'quick_stats': ['quick_stats', 'kpis'],
+}
+
+DEFAULT_WIDGET_KEYS = ['overview', 'metrics', 'alert_summary', 'quick_stats', 'kpis', 'trends']
+
+
+def get_configured_widget_keys(company, user=None):
+    """
+    Widget keys derived from the company's visible DashboardWidget rows,
+    falling back to the default dashboard layout when none are configured
+    """
+    widgets = DashboardWidget.objects.filter(
+        company=company,
+        is_visible=True
+    ).order_by('position_y', 'position_x')
+
+    role = getattr(user, 'role', None)
+    keys = []
+    for widget in widgets:
+        if widget.visible_to_roles and role and role not in widget.visible_to_roles:
+            continue
+        for key in WIDGET_TYPE_KEYS.get(widget.widget_type, []):
+            if key not in keys:
+                keys.append(key)
+
+    return keys or list(DEFAULT_WIDGET_KEYS)
+
+
+def build_batch_payload(company, widget_keys):
+    """
+    Compute the payloads for ``widget_keys`` with a shared data context.
+    A failing widget is reported under ``errors`` without failing the batch.
+    """
+    context = DashboardDataContext(company)
+    widgets = {}
+    errors = {}
+
+    for key in widget_keys:
+        if key in widgets or key in errors:
+            continue
+        builder = WIDGET_BUILDERS.get(key)
+        if builder is None:
+            errors[key] = 'Unknown widget'
+            continue
+        try:
+            widgets[key] = builder(context)
+        except Exception as e:
+            logger.error(f"Dashboard batch widget '{key}' failed for company {company.id}: {e}")
+            errors[key] = 'Failed to load widget'
+
+    return {'widgets': widgets, 'errors': errors}
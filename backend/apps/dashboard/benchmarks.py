@@ -0,0 +1,219 @@
+"""
+Benchmark engine
+
+Computes sector benchmarks from the scores of every onboarded company,
+nationally (region ``UAE``) and per emirate, plus a cross-sector ``all``
+benchmark used when a sector is too small to compare against. Averages and
+sample sizes are aggregated in SQL (GROUP BY sector / emirate). Scores are
+read once, ordered, to derive the quartiles; the sorted arrays are cached
+per benchmark row so a company's percentile is a binary search instead of
+an estimate from the stored quartiles.
+
+Each refresh writes new BenchmarkData rows and retires every previous live
+row, so a group that drops below the minimum sample size no longer has a
+current live benchmark. Static rows (entered in the admin) are retired only
+when the refresh covers their sector and region.
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from apps.companies.models import Company
+from .models import BenchmarkData
+
+logger = logging.getLogger(__name__)
+
+LIVE_DATA_SOURCE = 'ESG Compass company scores'
+NATIONAL_REGION = 'UAE'
+ALL_SECTORS = 'all'
+
+BENCHMARK_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Retired live rows are kept this long for history, then deleted
+RETIRED_BENCHMARK_DAYS = 90
+
+PILLARS = {
+    'environmental': 'environmental_score',
+    'social': 'social_score',
+    'governance': 'governance_score',
+    'overall': 'overall_esg_score',
+}
+
+
+def _min_sample_size():
+    return getattr(settings, 'BENCHMARK_MIN_SAMPLE_SIZE', 5)
+
+
+def benchmark_population():
+    """Companies whose scores count towards benchmarks"""
+    return Company.objects.filter(onboarding_completed=True)
+
+
+def quantile(sorted_values, q):
+    """Linear-interpolated quantile of an ascending list (numpy's default method)"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def percentile_rank(sorted_values, value):
+    """Share of the population scoring below ``value`` (ties count half), 0-100"""
+    if not sorted_values:
+        return None
+    below = bisect_left(sorted_values, value)
+    equal = bisect_right(sorted_values, value) - below
+    return round((below + equal / 2) / len(sorted_values) * 100, 1)
+
+
+def _group_stats(companies):
+    """{(sector, region): {pillar averages, sample_size}} aggregated in SQL"""
+    averages = {pillar: Avg(field) for pillar, field in PILLARS.items()}
+    stats = {}
+    for row in companies.values('business_sector').annotate(sample_size=Count('id'), **averages).order_by():
+        stats[(row.pop('business_sector'), NATIONAL_REGION)] = row
+    for row in companies.exclude(emirate__isnull=True).exclude(emirate='').values(
+        'business_sector', 'emirate'
+    ).annotate(sample_size=Count('id'), **averages).order_by():
+        stats[(row.pop('business_sector'), row.pop('emirate'))] = row
+    stats[(ALL_SECTORS, NATIONAL_REGION)] = companies.aggregate(sample_size=Count('id'), **averages)
+    return stats
+
+
+def _group_distributions(companies):
+    """{(sector, region): {pillar: ascending scores}} from a single ordered read"""
+    distributions = {}
+    rows = companies.order_by('business_sector', 'overall_esg_score').values_list(
+        'business_sector', 'emirate', *PILLARS.values()
+    ).iterator(chunk_size=2000)
+    for sector, emirate, *scores in rows:
+        groups = [(sector, NATIONAL_REGION), (ALL_SECTORS, NATIONAL_REGION)]
+        if emirate:
+            groups.append((sector, emirate))
+        for group in groups:
+            distribution = distributions.setdefault(group, {pillar: [] for pillar in PILLARS})
+            for pillar, score in zip(PILLARS, scores):
+                distribution[pillar].append(score or 0.0)
+
+    # Overall scores arrive sorted within each sector, so those lists sort in
+    # linear time; the other pillars and the cross-sector group need a full sort
+    for distribution in distributions.values():
+        for values in distribution.values():
+            values.sort()
+    return distributions
+
+
+def _distribution_cache_key(benchmark_id):
+    return f"benchmark_distribution_{benchmark_id}"
+
+
+def refresh_benchmarks(now=None):
+    """
+    Recompute live benchmarks and rotate them in. Returns the new rows.
+    Groups with fewer than ``BENCHMARK_MIN_SAMPLE_SIZE`` companies are skipped
+    and lose their previous live row.
+    """
+    now = now or timezone.now()
+    companies = benchmark_population()
+    stats = _group_stats(companies)
+    distributions = _group_distributions(companies)
+    min_sample_size = _min_sample_size()
+
+    new_rows = []
+    for (sector, region), row in sorted(stats.items()):
+        if (row['sample_size'] or 0) < min_sample_size:
+            continue
+        overall = distributions[(sector, region)]['overall']
+        new_rows.append(BenchmarkData(
+            sector=sector,
+            region=region,
+            benchmark_name=f"Live ESG scores {now:%Y-%m-%d %H:%M:%S}",
+            environmental_average=round(row['environmental'], 2),
+            social_average=round(row['social'], 2),
+            governance_average=round(row['governance'], 2),
+            overall_average=round(row['overall'], 2),
+            sample_size=row['sample_size'],
+            percentile_25=round(quantile(overall, 0.25), 2),
+            percentile_50=round(quantile(overall, 0.5), 2),
+            percentile_75=round(quantile(overall, 0.75), 2),
+            data_source=LIVE_DATA_SOURCE,
+            data_period=now.date().isoformat(),
+            is_current=True,
+        ))
+
+    # Every previous live row goes, including groups that fell below the
+    # minimum sample size or emptied, plus static rows the refresh replaces
+    retired = Q(data_source=LIVE_DATA_SOURCE)
+    for benchmark in new_rows:
+        retired |= Q(sector=benchmark.sector, region=benchmark.region)
+
+    with transaction.atomic():
+        BenchmarkData.objects.filter(retired, is_current=True).update(is_current=False, updated_at=now)
+        BenchmarkData.objects.bulk_create(new_rows)
+        BenchmarkData.objects.filter(
+            data_source=LIVE_DATA_SOURCE,
+            is_current=False,
+            updated_at__lt=now - timedelta(days=RETIRED_BENCHMARK_DAYS)
+        ).delete()
+
+    cache.set_many({
+        _distribution_cache_key(benchmark.id): distributions[(benchmark.sector, benchmark.region)]
+        for benchmark in new_rows
+    }, BENCHMARK_CACHE_TIMEOUT)
+
+    logger.info(
+        f"📊 Refreshed {len(new_rows)} benchmarks from {stats[(ALL_SECTORS, NATIONAL_REGION)]['sample_size']} companies "
+        f"({len(stats) - len(new_rows)} group(s) below {min_sample_size} companies)"
+    )
+    return new_rows
+
+
+def get_benchmark_distribution(benchmark):
+    """
+    Sorted pillar scores behind a live benchmark, or None for static rows.
+    A cache miss re-reads the group's current scores.
+    """
+    if benchmark.data_source != LIVE_DATA_SOURCE:
+        return None
+    key = _distribution_cache_key(benchmark.id)
+    distribution = cache.get(key)
+    if distribution is None:
+        companies = benchmark_population()
+        if benchmark.sector != ALL_SECTORS:
+            companies = companies.filter(business_sector=benchmark.sector)
+        if benchmark.region != NATIONAL_REGION:
+            companies = companies.filter(emirate=benchmark.region)
+        distribution = {
+            pillar: sorted(score or 0.0 for score in companies.values_list(field, flat=True))
+            for pillar, field in PILLARS.items()
+        }
+        cache.set(key, distribution, BENCHMARK_CACHE_TIMEOUT)
+    return distribution
+
+
+def find_benchmark(company):
+    """
+    Current benchmark for the company: its sector in its emirate, then its
+    sector nationally, then the cross-sector benchmark
+    """
+    candidates = [(company.business_sector, company.emirate), (company.business_sector, NATIONAL_REGION),
+                  (ALL_SECTORS, NATIONAL_REGION)]
+    current = {
+        (row.sector, row.region): row
+        for row in BenchmarkData.objects.filter(
+            is_current=True,
+            sector__in=[company.business_sector, ALL_SECTORS],
+            region__in=[company.emirate or NATIONAL_REGION, NATIONAL_REGION]
+        ).order_by('updated_at')
+    }
+    for candidate in candidates:
+        if candidate in current:
+            return current[candidate]
+    return None
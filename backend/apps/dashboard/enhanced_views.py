@@ -36,37 +36,50 @@ def enhanced_dashboard_overview(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    return Response(build_dashboard_overview(company))
+
+
+def build_dashboard_overview(company, extracted_records=None, task_stats=None):
+    """
+    Build the dashboard overview payload for a company.
+
+    The helpers below work on the company's completed extraction records
+    loaded once, newest first, instead of querying per metric.
+    ``extracted_records`` and ``task_stats`` let callers that already hold
+    them (the batch endpoint) share them instead of reloading.
+    """
     # Get or update cached metrics
     cache_key = f"company_metrics_{company.id}"
     cached_metrics = cache.get(cache_key)
-    
+
     if not cached_metrics:
         cached_metrics = update_company_metrics_cache(company)
-    
+
     # Get extracted data
-    extracted_data = ExtractedFileData.objects.filter(
-        task_attachment__task__company=company,
-        processing_status='completed'
-    )
-    
+    if extracted_records is None:
+        extracted_records = load_extracted_records(company)
+
+    # Get task progress
+    if task_stats is None:
+        task_stats = get_task_statistics(company)
+
     # Calculate ESG scores based on actual data
-    scores = calculate_esg_scores_from_extracted_data(company, extracted_data)
-    
+    scores = calculate_esg_scores_from_extracted_data(
+        company, extracted_records, total_tasks=task_stats['total']
+    )
+
     # Get latest environmental metrics
-    env_metrics = get_latest_environmental_metrics(extracted_data)
-    
+    env_metrics = get_latest_environmental_metrics(extracted_records)
+
     # Get latest social metrics
-    social_metrics = get_latest_social_metrics(extracted_data)
-    
+    social_metrics = get_latest_social_metrics(extracted_records)
+
     # Get latest governance metrics
-    gov_metrics = get_latest_governance_metrics(extracted_data)
-    
+    gov_metrics = get_latest_governance_metrics(extracted_records)
+
     # Calculate trends from historical data
-    trends = calculate_trends_from_extracted_data(company, extracted_data)
-    
-    # Get task progress
-    task_stats = get_task_statistics(company)
-    
+    trends = calculate_trends_from_extracted_data(company, extracted_records)
+
     # Build dashboard response
     dashboard_data = {
         # ESG Scores
@@ -105,7 +118,7 @@ def enhanced_dashboard_overview(request):
         'emissions_breakdown': calculate_emissions_breakdown(env_metrics),
         
         # Recent activity
-        'recent_activity': get_recent_file_activity(company),
+        'recent_activity': get_recent_file_activity(company, extracted_records),
         
         # Data quality indicators
         'data_quality': {
@@ -116,19 +129,48 @@ def enhanced_dashboard_overview(request):
         
         # Recommendations based on data gaps
         'priority_recommendations': generate_data_driven_recommendations(
-            company, extracted_data, env_metrics, social_metrics, gov_metrics
+            company, extracted_records, env_metrics, social_metrics, gov_metrics
         ),
         
         # Target progress (calculated from actual data)
         'targets_progress': calculate_target_progress(env_metrics, social_metrics, gov_metrics),
     }
     
-    return Response(dashboard_data)
+    return dashboard_data
+
+
+def load_extracted_records(company):
+    """The company's completed extraction records, newest first"""
+    return list(
+        ExtractedFileData.objects.filter(
+            task_attachment__task__company=company,
+            processing_status='completed'
+        ).select_related('task_attachment__task').order_by('-extraction_date')
+    )
+
+
+def _records_with(extracted_records, field):
+    """Records (newest first) that have a value for ``field``"""
+    return [record for record in extracted_records if getattr(record, field) is not None]
+
 
+def _latest_with(extracted_records, field):
+    """Newest record that has a value for ``field``"""
+    for record in extracted_records:
+        if getattr(record, field) is not None:
+            return record
+    return None
 
-def calculate_esg_scores_from_extracted_data(company, extracted_data):
+
+def _average(values):
+    values = list(values)
+    return sum(values) / len(values) if values else None
+
+
+def calculate_esg_scores_from_extracted_data(company, extracted_records, total_tasks=None):
     """
     Calculate ESG scores based on extracted file data
+    (completed extraction records, newest first)
     """
     scores = {
         'overall': 50.0,
@@ -143,54 +185,17 @@ def calculate_esg_scores_from_extracted_data(company, extracted_data):
     env_data_points = 0
     env_score_boost = 0
     
-    # Check for energy data
-    if extracted_data.exclude(energy_consumption_kwh__isnull=True).exists():
-        env_data_points += 1
-        # Check for improvement (compare latest vs oldest)
-        energy_trend = extracted_data.exclude(
-            energy_consumption_kwh__isnull=True
-        ).order_by('extraction_date')
-        if energy_trend.count() > 1:
-            first = energy_trend.first().energy_consumption_kwh
-            last = energy_trend.last().energy_consumption_kwh
-            if last < first:  # Reduction is good
-                env_score_boost += 10
-    
-    # Check for water data
-    if extracted_data.exclude(water_usage_liters__isnull=True).exists():
-        env_data_points += 1
-        water_trend = extracted_data.exclude(
-            water_usage_liters__isnull=True
-        ).order_by('extraction_date')
-        if water_trend.count() > 1:
-            first = water_trend.first().water_usage_liters
-            last = water_trend.last().water_usage_liters
-            if last < first:
-                env_score_boost += 10
-    
-    # Check for waste data
-    if extracted_data.exclude(waste_generated_kg__isnull=True).exists():
-        env_data_points += 1
-        waste_trend = extracted_data.exclude(
-            waste_generated_kg__isnull=True
-        ).order_by('extraction_date')
-        if waste_trend.count() > 1:
-            first = waste_trend.first().waste_generated_kg
-            last = waste_trend.last().waste_generated_kg
-            if last < first:
-                env_score_boost += 10
-    
-    # Check for carbon data
-    if extracted_data.exclude(carbon_emissions_tco2__isnull=True).exists():
-        env_data_points += 1
-        carbon_trend = extracted_data.exclude(
-            carbon_emissions_tco2__isnull=True
-        ).order_by('extraction_date')
-        if carbon_trend.count() > 1:
-            first = carbon_trend.first().carbon_emissions_tco2
-            last = carbon_trend.last().carbon_emissions_tco2
-            if last < first:
-                env_score_boost += 10
+    # Energy, water, waste and carbon data
+    for field in ['energy_consumption_kwh', 'water_usage_liters', 'waste_generated_kg', 'carbon_emissions_tco2']:
+        trend = _records_with(extracted_records, field)
+        if trend:
+            env_data_points += 1
+            # Check for improvement (compare latest vs oldest)
+            if len(trend) > 1:
+                first = getattr(trend[-1], field)
+                last = getattr(trend[0], field)
+                if last < first:  # Reduction is good
+                    env_score_boost += 10
     
     # Calculate environmental score
     if env_data_points > 0:
@@ -200,33 +205,28 @@ def calculate_esg_scores_from_extracted_data(company, extracted_data):
     social_data_points = 0
     social_score_boost = 0
     
-    if extracted_data.exclude(total_employees__isnull=True).exists():
+    if _latest_with(extracted_records, 'total_employees'):
         social_data_points += 1
     
-    if extracted_data.exclude(training_hours__isnull=True).exists():
+    training_records = _records_with(extracted_records, 'training_hours')
+    if training_records:
         social_data_points += 1
         # Higher training hours is better
-        avg_training = extracted_data.exclude(
-            training_hours__isnull=True
-        ).aggregate(avg=Avg('training_hours'))['avg']
+        avg_training = _average(record.training_hours for record in training_records)
         if avg_training and avg_training > 20:
             social_score_boost += 10
     
-    if extracted_data.exclude(safety_incidents__isnull=True).exists():
+    latest_incidents = _latest_with(extracted_records, 'safety_incidents')
+    if latest_incidents:
         social_data_points += 1
         # Lower incidents is better
-        latest_incidents = extracted_data.exclude(
-            safety_incidents__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_incidents and latest_incidents.safety_incidents == 0:
+        if latest_incidents.safety_incidents == 0:
             social_score_boost += 15
     
-    if extracted_data.exclude(employee_satisfaction_score__isnull=True).exists():
+    latest_satisfaction = _latest_with(extracted_records, 'employee_satisfaction_score')
+    if latest_satisfaction:
         social_data_points += 1
-        latest_satisfaction = extracted_data.exclude(
-            employee_satisfaction_score__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_satisfaction and latest_satisfaction.employee_satisfaction_score > 80:
+        if latest_satisfaction.employee_satisfaction_score > 80:
             social_score_boost += 10
     
     if social_data_points > 0:
@@ -236,20 +236,16 @@ def calculate_esg_scores_from_extracted_data(company, extracted_data):
     gov_data_points = 0
     gov_score_boost = 0
     
-    if extracted_data.exclude(compliance_score__isnull=True).exists():
+    latest_compliance = _latest_with(extracted_records, 'compliance_score')
+    if latest_compliance:
         gov_data_points += 1
-        latest_compliance = extracted_data.exclude(
-            compliance_score__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_compliance and latest_compliance.compliance_score > 85:
+        if latest_compliance.compliance_score > 85:
             gov_score_boost += 20
     
-    if extracted_data.exclude(board_meetings__isnull=True).exists():
+    latest_meetings = _latest_with(extracted_records, 'board_meetings')
+    if latest_meetings:
         gov_data_points += 1
-        latest_meetings = extracted_data.exclude(
-            board_meetings__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_meetings and latest_meetings.board_meetings >= 12:
+        if latest_meetings.board_meetings >= 12:
             gov_score_boost += 10
     
     if gov_data_points > 0:
@@ -259,32 +255,32 @@ def calculate_esg_scores_from_extracted_data(company, extracted_data):
     scores['overall'] = (scores['environmental'] + scores['social'] + scores['governance']) / 3
     
     # Data completion based on files processed
-    total_tasks = Task.objects.filter(company=company).count()
-    files_with_data = extracted_data.count()
+    if total_tasks is None:
+        total_tasks = Task.objects.filter(company=company).count()
+    files_with_data = len(extracted_records)
     
     if total_tasks > 0:
         scores['evidence_completion'] = min((files_with_data / total_tasks) * 100, 100)
     
     # Data completion based on confidence
     if files_with_data > 0:
-        avg_confidence = extracted_data.aggregate(avg=Avg('confidence_score'))['avg'] or 0
+        avg_confidence = _average(record.confidence_score for record in extracted_records) or 0
         scores['data_completion'] = avg_confidence
     
     return scores
 
 
-def get_latest_environmental_metrics(extracted_data):
+def get_latest_environmental_metrics(extracted_records):
     """
     Get the latest environmental metrics from extracted data
     """
     metrics = {}
     
     # Energy consumption
-    energy_record = extracted_data.exclude(
-        energy_consumption_kwh__isnull=True
-    ).order_by('-extraction_date').first()
+    energy_records = _records_with(extracted_records, 'energy_consumption_kwh')
     
-    if energy_record:
+    if energy_records:
+        energy_record = energy_records[0]
         metrics['energy_consumption'] = {
             'current_kwh': energy_record.energy_consumption_kwh,
             'source_file': energy_record.task_attachment.original_filename,
@@ -295,14 +291,9 @@ def get_latest_environmental_metrics(extracted_data):
             'reduction_percentage': 0,
         }
         
-        # Get previous record for comparison
-        previous = extracted_data.exclude(
-            energy_consumption_kwh__isnull=True
-        ).exclude(
-            id=energy_record.id
-        ).order_by('-extraction_date').first()
-        
-        if previous:
+        # Previous record for comparison
+        if len(energy_records) > 1:
+            previous = energy_records[1]
             metrics['energy_consumption']['previous_kwh'] = previous.energy_consumption_kwh
             if previous.energy_consumption_kwh > 0:
                 reduction = ((previous.energy_consumption_kwh - energy_record.energy_consumption_kwh) 
@@ -310,9 +301,7 @@ def get_latest_environmental_metrics(extracted_data):
                 metrics['energy_consumption']['reduction_percentage'] = round(reduction, 1)
     
     # Water usage
-    water_record = extracted_data.exclude(
-        water_usage_liters__isnull=True
-    ).order_by('-extraction_date').first()
+    water_record = _latest_with(extracted_records, 'water_usage_liters')
     
     if water_record:
         metrics['water_usage'] = {
@@ -323,9 +312,7 @@ def get_latest_environmental_metrics(extracted_data):
         }
     
     # Waste management
-    waste_record = extracted_data.exclude(
-        waste_generated_kg__isnull=True
-    ).order_by('-extraction_date').first()
+    waste_record = _latest_with(extracted_records, 'waste_generated_kg')
     
     if waste_record:
         metrics['waste_management'] = {
@@ -336,9 +323,7 @@ def get_latest_environmental_metrics(extracted_data):
         }
     
     # Carbon emissions
-    carbon_record = extracted_data.exclude(
-        carbon_emissions_tco2__isnull=True
-    ).order_by('-extraction_date').first()
+    carbon_record = _latest_with(extracted_records, 'carbon_emissions_tco2')
     
     if carbon_record:
         metrics['carbon_emissions'] = {
@@ -349,9 +334,7 @@ def get_latest_environmental_metrics(extracted_data):
         }
     
     # Renewable energy
-    renewable_record = extracted_data.exclude(
-        renewable_energy_percentage__isnull=True
-    ).order_by('-extraction_date').first()
+    renewable_record = _latest_with(extracted_records, 'renewable_energy_percentage')
     
     if renewable_record:
         metrics['renewable_energy'] = {
@@ -363,16 +346,14 @@ def get_latest_environmental_metrics(extracted_data):
     return metrics
 
 
-def get_latest_social_metrics(extracted_data):
+def get_latest_social_metrics(extracted_records):
     """
     Get the latest social metrics from extracted data
     """
     metrics = {}
     
     # Employee metrics
-    employee_record = extracted_data.exclude(
-        total_employees__isnull=True
-    ).order_by('-extraction_date').first()
+    employee_record = _latest_with(extracted_records, 'total_employees')
     
     if employee_record:
         metrics['employee_metrics'] = {
@@ -383,25 +364,21 @@ def get_latest_social_metrics(extracted_data):
         }
     
     # Training hours
-    training_records = extracted_data.exclude(
-        training_hours__isnull=True
-    )
+    training_records = _records_with(extracted_records, 'training_hours')
     
-    if training_records.exists():
-        avg_training = training_records.aggregate(avg=Avg('training_hours'))['avg']
-        latest_training = training_records.order_by('-extraction_date').first()
+    if training_records:
+        avg_training = _average(record.training_hours for record in training_records)
+        latest_training = training_records[0]
         
         metrics['training'] = {
             'average_hours': round(avg_training, 1) if avg_training else 0,
             'latest_hours': latest_training.training_hours,
             'source_file': latest_training.task_attachment.original_filename,
-            'records_count': training_records.count(),
+            'records_count': len(training_records),
         }
     
     # Safety incidents
-    safety_record = extracted_data.exclude(
-        safety_incidents__isnull=True
-    ).order_by('-extraction_date').first()
+    safety_record = _latest_with(extracted_records, 'safety_incidents')
     
     if safety_record:
         metrics['health_safety'] = {
@@ -412,9 +389,7 @@ def get_latest_social_metrics(extracted_data):
         }
     
     # Employee satisfaction
-    satisfaction_record = extracted_data.exclude(
-        employee_satisfaction_score__isnull=True
-    ).order_by('-extraction_date').first()
+    satisfaction_record = _latest_with(extracted_records, 'employee_satisfaction_score')
     
     if satisfaction_record:
         metrics['employee_satisfaction'] = {
@@ -426,16 +401,14 @@ def get_latest_social_metrics(extracted_data):
     return metrics
 
 
-def get_latest_governance_metrics(extracted_data):
+def get_latest_governance_metrics(extracted_records):
     """
     Get the latest governance metrics from extracted data
     """
     metrics = {}
     
     # Compliance score
-    compliance_record = extracted_data.exclude(
-        compliance_score__isnull=True
-    ).order_by('-extraction_date').first()
+    compliance_record = _latest_with(extracted_records, 'compliance_score')
     
     if compliance_record:
         metrics['compliance'] = {
@@ -446,9 +419,7 @@ def get_latest_governance_metrics(extracted_data):
         }
     
     # Board meetings
-    board_record = extracted_data.exclude(
-        board_meetings__isnull=True
-    ).order_by('-extraction_date').first()
+    board_record = _latest_with(extracted_records, 'board_meetings')
     
     if board_record:
         metrics['board_structure'] = {
@@ -461,7 +432,7 @@ def get_latest_governance_metrics(extracted_data):
     return metrics
 
 
-def calculate_trends_from_extracted_data(company, extracted_data):
+def calculate_trends_from_extracted_data(company, extracted_records):
     """
     Calculate trends from historical extracted data
     """
@@ -481,27 +452,23 @@ def calculate_trends_from_extracted_data(company, extracted_data):
     # Get data from last 12 months
     twelve_months_ago = timezone.now() - timedelta(days=365)
     
-    # Group by month
-    from django.db.models.functions import TruncMonth
-    
-    monthly_data = extracted_data.filter(
-        extraction_date__gte=twelve_months_ago
-    ).annotate(
-        month=TruncMonth('extraction_date')
-    ).values('month').annotate(
-        avg_confidence=Avg('confidence_score'),
-        count=Count('id')
-    ).order_by('month')
+    # Group by month (in the current time zone, as TruncMonth does)
+    monthly_confidences = {}
+    for record in extracted_records:
+        if record.extraction_date >= twelve_months_ago:
+            month = timezone.localtime(record.extraction_date).date().replace(day=1)
+            monthly_confidences.setdefault(month, []).append(record.confidence_score)
     
     # Build monthly trend data
-    for month_data in monthly_data:
-        month_str = month_data['month'].strftime('%b')
+    for month in sorted(monthly_confidences):
+        confidences = monthly_confidences[month]
+        month_str = month.strftime('%b')
         trends['monthly_trends']['months'].append(month_str)
         
         # Calculate scores for this month (simplified)
         base_score = 50
-        score_boost = min(month_data['count'] * 5, 30)  # More files = better
-        confidence_boost = (month_data['avg_confidence'] / 100) * 20
+        score_boost = min(len(confidences) * 5, 30)  # More files = better
+        confidence_boost = (_average(confidences) / 100) * 20
         
         month_score = base_score + score_boost + confidence_boost
         
@@ -536,14 +503,13 @@ def get_task_statistics(company):
     """
     Get task completion statistics
     """
-    tasks = Task.objects.filter(company=company)
-    
-    return {
-        'total': tasks.count(),
-        'completed': tasks.filter(status='completed').count(),
-        'in_progress': tasks.filter(status='in_progress').count(),
-        'todo': tasks.filter(status='todo').count(),
-    }
+    return Task.objects.filter(company=company).aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+        in_progress=Count('id', filter=Q(status='in_progress')),
+        todo=Count('id', filter=Q(status='todo')),
+        completed_today=Count('id', filter=Q(status='completed', updated_at__date=timezone.now().date())),
+    )
 
 
 def calculate_emissions_breakdown(env_metrics):
@@ -579,17 +545,20 @@ def calculate_emissions_breakdown(env_metrics):
     return breakdown
 
 
-def get_recent_file_activity(company):
+def get_recent_file_activity(company, extracted_records=None):
     """
     Get recent file upload and processing activity
     """
     activities = []
     
     # Get recent file uploads
-    recent_files = ExtractedFileData.objects.filter(
-        task_attachment__task__company=company,
-        processing_status='completed'
-    ).order_by('-extraction_date')[:10]
+    if extracted_records is None:
+        recent_files = ExtractedFileData.objects.filter(
+            task_attachment__task__company=company,
+            processing_status='completed'
+        ).select_related('task_attachment__task').order_by('-extraction_date')[:10]
+    else:
+        recent_files = extracted_records[:10]
     
     for file_record in recent_files:
         # Determine activity type based on extracted metrics
@@ -625,7 +594,7 @@ def get_recent_file_activity(company):
     return activities
 
 
-def generate_data_driven_recommendations(company, extracted_data, env_metrics, social_metrics, gov_metrics):
+def generate_data_driven_recommendations(company, extracted_records, env_metrics, social_metrics, gov_metrics):
     """
     Generate recommendations based on actual data gaps and trends
     """
@@ -706,7 +675,7 @@ def generate_data_driven_recommendations(company, extracted_data, env_metrics, s
         })
     
     # Check data quality
-    avg_confidence = extracted_data.aggregate(avg=Avg('confidence_score'))['avg'] or 0
+    avg_confidence = _average(record.confidence_score for record in extracted_records) or 0
     if avg_confidence < 70:
         recommendations.append({
             'title': 'Improve Data Quality',
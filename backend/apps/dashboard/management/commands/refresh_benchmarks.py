@@ -0,0 +1,37 @@
+"""
+Django management command to recompute sector benchmarks from company scores
+Usage: python manage.py refresh_benchmarks [--loop=SECONDS]
+"""
+
+import time
+from django.core.management.base import BaseCommand
+from apps.dashboard.benchmarks import refresh_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Compute sector and region benchmarks from live company scores and rotate them in'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            help='Keep running, recomputing every N seconds',
+        )
+
+    def handle(self, *args, **options):
+        interval = options.get('loop') or 0
+        while True:
+            started = time.monotonic()
+            benchmarks = refresh_benchmarks()
+            for benchmark in benchmarks:
+                self.stdout.write(
+                    f"{benchmark.sector} / {benchmark.region}: {benchmark.sample_size} companies, "
+                    f"overall average {benchmark.overall_average}, median {benchmark.percentile_50}"
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"Refreshed {len(benchmarks)} benchmarks ({time.monotonic() - started:.2f}s)"
+            ))
+            if not interval:
+                break
+            time.sleep(interval)
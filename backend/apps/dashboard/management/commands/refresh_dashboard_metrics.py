@@ -0,0 +1,50 @@
+"""
+Django management command to precompute dashboard metrics
+Usage: python manage.py refresh_dashboard_metrics [--company-id=ID] [--force] [--loop=SECONDS]
+"""
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.companies.models import Company
+from apps.dashboard.metrics import refresh_all_company_metrics
+
+
+class Command(BaseCommand):
+    help = 'Recompute DashboardMetric rows for companies whose data changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company-id',
+            type=str,
+            help='Only refresh this company',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute even if the company data has not changed',
+        )
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            help='Keep running, checking for changed companies every N seconds',
+        )
+
+    def handle(self, *args, **options):
+        companies = Company.objects.all()
+        if options.get('company_id'):
+            companies = companies.filter(id=options['company_id'])
+            if not companies.exists():
+                raise CommandError(f'Company with ID "{options["company_id"]}" does not exist.')
+
+        interval = options.get('loop') or 0
+        while True:
+            started = time.monotonic()
+            refreshed, skipped = refresh_all_company_metrics(companies, force=options.get('force', False))
+            self.stdout.write(self.style.SUCCESS(
+                f"Refreshed metrics for {refreshed} companies, {skipped} not due "
+                f"({time.monotonic() - started:.2f}s)"
+            ))
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,173 @@
+"""
+Precomputed dashboard metrics
+
+Per-company metrics are computed into DashboardMetric rows so dashboards read
+stored values instead of aggregating on every request. A company is only
+recomputed when its ``data_version`` moved past the version the current rows
+were built from and its widget refresh interval has elapsed.
+"""
+
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, F, Q, Max, Min
+from django.utils import timezone
+
+from apps.companies.models import Company
+from apps.tasks.models import Task, TaskAttachment
+from apps.files.models import ExtractedFileData
+from .models import DashboardMetric, DashboardWidget
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_INTERVAL_MINUTES = 30
+
+
+def compute_company_metrics(company):
+    """
+    Compute the dashboard metric values for a company.
+    Returns a list of (metric_type, metric_name, metric_value) tuples.
+    """
+    task_counts = Task.objects.filter(company=company).aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+        in_progress=Count('id', filter=Q(status='in_progress')),
+        todo=Count('id', filter=Q(status='todo')),
+        blocked=Count('id', filter=Q(status='blocked')),
+        overdue=Count('id', filter=Q(due_date__lt=timezone.now()) & ~Q(status='completed')),
+    )
+    total_tasks = task_counts['total']
+
+    extracted = ExtractedFileData.objects.filter(
+        task_attachment__task__company=company
+    ).aggregate(
+        completed=Count('id', filter=Q(processing_status='completed')),
+        failed=Count('id', filter=Q(processing_status='failed')),
+    )
+
+    return [
+        ('esg_score', 'ESG Scores', {
+            'overall': company.overall_esg_score,
+            'environmental': company.environmental_score,
+            'social': company.social_score,
+            'governance': company.governance_score,
+        }),
+        ('data_completion', 'Data Completion', {
+            'data_completion_percentage': company.data_completion_percentage,
+            'evidence_completion_percentage': company.evidence_completion_percentage,
+            'total_fields': company.total_fields,
+            'completed_fields': company.completed_fields,
+            'total_evidence_files': company.total_evidence_files,
+            'uploaded_evidence_files': TaskAttachment.objects.filter(task__company=company).count(),
+            'files_processed': extracted['completed'],
+            'files_failed': extracted['failed'],
+        }),
+        ('task_progress', 'Task Progress', {
+            **task_counts,
+            'completion_percentage': round(task_counts['completed'] / total_tasks * 100, 1) if total_tasks else 0.0,
+        }),
+    ]
+
+
+def get_refresh_interval(company):
+    """Shortest refresh interval among the company's visible widgets"""
+    interval = DashboardWidget.objects.filter(
+        company=company,
+        is_visible=True
+    ).aggregate(interval=Min('refresh_interval_minutes'))['interval']
+    return timedelta(minutes=interval or DEFAULT_REFRESH_INTERVAL_MINUTES)
+
+
+def needs_refresh(company, now=None):
+    """True when the company's data changed and its refresh interval elapsed"""
+    now = now or timezone.now()
+    current = DashboardMetric.objects.filter(
+        company=company,
+        is_current=True
+    ).aggregate(data_version=Min('data_version'), calculated_at=Max('calculated_at'))
+
+    if current['calculated_at'] is None:
+        return True
+    if current['data_version'] == company.data_version:
+        return False
+    return current['calculated_at'] + get_refresh_interval(company) <= now
+
+
+def refresh_company_metrics(company, force=False, calculated_by=None):
+    """
+    Recompute a company's metrics into new DashboardMetric rows, retiring the
+    previous current rows and bumping their version. Returns the new rows, or
+    an empty list when nothing needed recomputing.
+    """
+    now = timezone.now()
+    if not force and not needs_refresh(company, now):
+        return []
+
+    values = compute_company_metrics(company)
+    period_start = now.date().replace(day=1)
+
+    with transaction.atomic():
+        previous_versions = dict(
+            DashboardMetric.objects.select_for_update().filter(
+                company=company,
+                is_current=True
+            ).values_list('metric_type', 'version')
+        )
+        DashboardMetric.objects.filter(company=company, is_current=True).update(is_current=False)
+
+        metrics = DashboardMetric.objects.bulk_create([
+            DashboardMetric(
+                company=company,
+                metric_type=metric_type,
+                metric_name=metric_name,
+                metric_value=metric_value,
+                period_start=period_start,
+                period_end=now.date(),
+                calculated_at=now,
+                calculated_by=calculated_by,
+                is_current=True,
+                version=previous_versions.get(metric_type, 0) + 1,
+                data_version=company.data_version,
+            )
+            for metric_type, metric_name, metric_value in values
+        ])
+
+        DashboardWidget.objects.filter(company=company).update(last_refreshed=now)
+
+    logger.info(f"Refreshed {len(metrics)} dashboard metrics for {company.name} (data version {company.data_version})")
+    return metrics
+
+
+def companies_with_changed_data(companies=None):
+    """Companies whose data_version moved past their current metric rows"""
+    companies = companies if companies is not None else Company.objects.all()
+    return companies.annotate(
+        metrics_data_version=Min(
+            'dashboard_metrics__data_version',
+            filter=Q(dashboard_metrics__is_current=True)
+        )
+    ).filter(
+        Q(metrics_data_version__isnull=True) | Q(data_version__gt=F('metrics_data_version'))
+    )
+
+
+def refresh_all_company_metrics(companies=None, force=False):
+    """
+    Refresh metrics for every company whose data changed.
+    Returns (refreshed, skipped) counts.
+    """
+    candidates = companies if companies is not None else Company.objects.all()
+    if not force:
+        candidates = companies_with_changed_data(candidates)
+
+    refreshed = skipped = 0
+    for company in candidates.iterator():
+        try:
+            if refresh_company_metrics(company, force=force):
+                refreshed += 1
+            else:
+                skipped += 1
+        except Exception as e:
+            logger.error(f"Dashboard metric refresh failed for company {company.id}: {e}")
+
+    return refreshed, skipped
@@ -45,6 +45,10 @@ class DashboardMetric(models.Model):
     # Metric properties
     is_current = models.BooleanField(default=True)
     version = models.IntegerField(default=1)
+    data_version = models.PositiveIntegerField(
+        default=0,
+        help_text='Company data version the metric was computed from'
+    )
     
     class Meta:
         verbose_name = 'Dashboard Metric'
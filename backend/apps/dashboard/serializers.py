@@ -11,7 +11,8 @@ class DashboardMetricSerializer(serializers.ModelSerializer):
         model = DashboardMetric
         fields = [
             'id', 'metric_type', 'metric_name', 'metric_value',
-            'period_start', 'period_end', 'calculated_at', 'is_current', 'version'
+            'period_start', 'period_end', 'calculated_at', 'is_current', 'version',
+            'data_version'
         ]
         read_only_fields = ['calculated_at']
 
@@ -105,6 +106,12 @@ class ESGTrendsSerializer(serializers.Serializer):
     social = serializers.ListField(child=serializers.FloatField())
     governance = serializers.ListField(child=serializers.FloatField())
     months = serializers.ListField(child=serializers.CharField())
+    overall = serializers.ListField(child=serializers.FloatField(), required=False)
+    granularity = serializers.CharField(required=False)
+    periods = serializers.ListField(child=serializers.CharField(), required=False)
+    score_deltas = serializers.DictField(required=False)
+    metrics = serializers.DictField(required=False)
+    metric_deltas = serializers.DictField(required=False)
 
 
 class EmissionsBreakdownSerializer(serializers.Serializer):
@@ -152,6 +159,7 @@ class CompanyComparisonSerializer(serializers.Serializer):
     industry_averages = serializers.DictField()
     percentile_ranking = serializers.DictField()
     comparison_analysis = serializers.CharField()
+    benchmark = serializers.DictField(required=False)
 
 
 class AnalyticsEventSerializer(serializers.ModelSerializer):
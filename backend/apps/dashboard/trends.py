@@ -0,0 +1,321 @@
+"""
+ESG trend engine
+
+Buckets extracted file metrics, meter readings and recorded ESG scores by
+week, month or quarter in SQL, fills empty periods and computes
+period-over-period deltas. Results are cached per company and invalidated
+through ``Company.data_version`` whenever new data lands.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from django.core.cache import cache
+from django.db.models import Avg, Count, Sum
+from django.db.models.functions import TruncMonth, TruncQuarter, TruncWeek
+from django.utils import timezone
+
+from apps.files.models import ExtractedFileData
+from apps.tasks.models import Task
+from .models import DashboardMetric
+
+logger = logging.getLogger(__name__)
+
+TREND_CACHE_TIMEOUT = 60 * 60 * 6
+
+GRANULARITIES = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+}
+
+# ExtractedFileData quick-access fields and how they roll up within a period.
+# Summed metrics are zero-filled for empty periods, averaged ones stay None.
+EXTRACTED_TREND_FIELDS = {
+    'energy_consumption_kwh': Sum,
+    'water_usage_liters': Sum,
+    'waste_generated_kg': Sum,
+    'carbon_emissions_tco2': Sum,
+    'renewable_energy_percentage': Avg,
+    'training_hours': Sum,
+    'safety_incidents': Sum,
+    'employee_satisfaction_score': Avg,
+    'compliance_score': Avg,
+    'board_meetings': Sum,
+}
+
+METER_TREND_FIELDS = {
+    'electricity': 'meter_electricity_kwh',
+    'water': 'meter_water_m3',
+    'gas': 'meter_gas_m3',
+}
+
+# Metrics where a decrease is an improvement (used for trend drivers)
+LOWER_IS_BETTER = {
+    'energy_consumption_kwh', 'water_usage_liters', 'waste_generated_kg',
+    'carbon_emissions_tco2', 'safety_incidents', 'meter_electricity_kwh',
+    'meter_water_m3', 'meter_gas_m3',
+}
+
+PERIODS_PER_QUARTER = {'week': 13, 'month': 3, 'quarter': 1}
+
+
+def _bucket_start(day, granularity):
+    """Start date of the bucket containing ``day``, matching the SQL Trunc functions"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'quarter':
+        return date(day.year, ((day.month - 1) // 3) * 3 + 1, 1)
+    return date(day.year, day.month, 1)
+
+
+def _previous_bucket(start, granularity):
+    if granularity == 'week':
+        return start - timedelta(days=7)
+    months_back = 3 if granularity == 'quarter' else 1
+    month = start.month - months_back
+    year = start.year
+    if month < 1:
+        month += 12
+        year -= 1
+    return date(year, month, 1)
+
+
+def get_bucket_starts(granularity='month', periods=12, end=None):
+    """Oldest-first list of the ``periods`` bucket start dates ending at ``end``"""
+    end = end or timezone.localdate()
+    if hasattr(end, 'hour'):
+        end = timezone.localtime(end).date() if timezone.is_aware(end) else end.date()
+    start = _bucket_start(end, granularity)
+    buckets = [start]
+    for _ in range(periods - 1):
+        start = _previous_bucket(start, granularity)
+        buckets.append(start)
+    return list(reversed(buckets))
+
+
+def _bucket_label(start, granularity):
+    if granularity == 'week':
+        return start.isoformat()
+    if granularity == 'quarter':
+        return f"Q{(start.month - 1) // 3 + 1} {start.year}"
+    return start.strftime('%b')
+
+
+def _as_date(value):
+    if hasattr(value, 'hour'):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+def _window(buckets, granularity):
+    """Aware datetime range [start, end) covering the buckets"""
+    start = buckets[0]
+    last = buckets[-1]
+    if granularity == 'week':
+        end = last + timedelta(days=7)
+    else:
+        months = 3 if granularity == 'quarter' else 1
+        month = last.month + months
+        end = date(last.year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+    return (
+        timezone.make_aware(datetime.combine(start, time.min)),
+        timezone.make_aware(datetime.combine(end, time.min)),
+    )
+
+
+def _extracted_metric_buckets(company, trunc, window):
+    """{bucket: {field: value, 'files': n}} for extracted file metrics, aggregated in SQL"""
+    aggregates = {field: agg(field) for field, agg in EXTRACTED_TREND_FIELDS.items()}
+    rows = ExtractedFileData.objects.filter(
+        task_attachment__task__company=company,
+        processing_status='completed',
+        extraction_date__gte=window[0],
+        extraction_date__lt=window[1],
+    ).annotate(
+        period=trunc('extraction_date')
+    ).values('period').annotate(
+        files=Count('id'), **aggregates
+    ).order_by('period')
+
+    return {_as_date(row.pop('period')): row for row in rows}
+
+
+def _meter_reading_buckets(company, trunc, window):
+    """
+    {bucket: {meter field: total}} for task meter readings. Readings carry no
+    date of their own, so they are bucketed (in SQL) by when the task was last
+    updated; meter type detection then runs once per entry.
+    """
+    from .views import _get_meter_type_for_field
+
+    tasks = Task.objects.filter(
+        company=company,
+        data_entries__isnull=False,
+        updated_at__gte=window[0],
+        updated_at__lt=window[1],
+    ).exclude(data_entries={}).annotate(
+        period=trunc('updated_at')
+    ).only('title', 'description', 'action_required', 'data_entries', 'updated_at')
+
+    buckets = {}
+    for task in tasks:
+        totals = buckets.setdefault(_as_date(task.period), {field: 0.0 for field in METER_TREND_FIELDS.values()})
+        for key, value in task.data_entries.items():
+            if not value or 'cost' in key.lower():
+                continue
+            try:
+                numeric_value = float(str(value).replace(',', ''))
+            except (ValueError, TypeError):
+                continue
+            meter_type = _get_meter_type_for_field(task, key)
+            if meter_type in METER_TREND_FIELDS:
+                totals[METER_TREND_FIELDS[meter_type]] += numeric_value
+    return buckets
+
+
+def _score_buckets(company, trunc, window):
+    """{bucket: {pillar: score}} from the latest esg_score metric recorded in each period"""
+    rows = DashboardMetric.objects.filter(
+        company=company,
+        metric_type='esg_score',
+        calculated_at__gte=window[0],
+        calculated_at__lt=window[1],
+    ).annotate(
+        period=trunc('calculated_at')
+    ).values('period', 'metric_value').order_by('period', 'calculated_at')
+
+    # Ordered by calculation time, so the last row of each period wins
+    return {_as_date(row['period']): row['metric_value'] or {} for row in rows}
+
+
+def _deltas(series):
+    """Period-over-period change; None where either side is missing"""
+    deltas = [None]
+    for previous, current in zip(series, series[1:]):
+        if previous is None or current is None:
+            deltas.append(None)
+        else:
+            deltas.append(round(current - previous, 2))
+    return deltas
+
+
+def compute_trends(company, granularity='month', periods=12, end=None):
+    """
+    Compute gap-filled trend series for a company. Not cached; see get_trends.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+    trunc = GRANULARITIES[granularity]
+    buckets = get_bucket_starts(granularity, periods, end)
+    window = _window(buckets, granularity)
+
+    extracted = _extracted_metric_buckets(company, trunc, window)
+    meters = _meter_reading_buckets(company, trunc, window)
+    scores = _score_buckets(company, trunc, window)
+
+    metrics = {}
+    for field, agg in EXTRACTED_TREND_FIELDS.items():
+        fill = 0.0 if agg is Sum else None
+        metrics[field] = [
+            round(extracted[b][field], 2) if b in extracted and extracted[b][field] is not None else fill
+            for b in buckets
+        ]
+    metrics['files_processed'] = [extracted.get(b, {}).get('files', 0) for b in buckets]
+    for field in METER_TREND_FIELDS.values():
+        metrics[field] = [round(meters.get(b, {}).get(field, 0.0), 2) for b in buckets]
+
+    # Scores persist between recalculations: carry the last known value
+    # forward, and the current period always reflects the live company score.
+    includes_today = buckets[-1] == _bucket_start(timezone.localdate(), granularity)
+    live_scores = {
+        'environmental': company.environmental_score,
+        'social': company.social_score,
+        'governance': company.governance_score,
+        'overall': company.overall_esg_score,
+    }
+    # Periods before the first recorded score have no history: they chart as
+    # 0 but are left out of the deltas so they don't read as an improvement.
+    recorded_series = {pillar: [] for pillar in live_scores}
+    last_known = {pillar: None for pillar in live_scores}
+    for index, bucket in enumerate(buckets):
+        recorded = scores.get(bucket, {})
+        for pillar in live_scores:
+            if includes_today and index == len(buckets) - 1:
+                last_known[pillar] = live_scores[pillar] or 0.0
+            elif recorded.get(pillar) is not None:
+                last_known[pillar] = recorded[pillar]
+            value = last_known[pillar]
+            recorded_series[pillar].append(round(value, 1) if value is not None else None)
+    score_series = {
+        pillar: [value if value is not None else 0.0 for value in series]
+        for pillar, series in recorded_series.items()
+    }
+
+    return {
+        'granularity': granularity,
+        'periods': [b.isoformat() for b in buckets],
+        'months': [_bucket_label(b, granularity) for b in buckets],
+        'environmental': score_series['environmental'],
+        'social': score_series['social'],
+        'governance': score_series['governance'],
+        'overall': score_series['overall'],
+        'score_deltas': {pillar: _deltas(series) for pillar, series in recorded_series.items()},
+        'metrics': metrics,
+        'metric_deltas': {field: _deltas(series) for field, series in metrics.items()},
+    }
+
+
+def get_trends(company, granularity='month', periods=12, end=None):
+    """
+    Cached trend series for a company. The key includes the company data
+    version and the current bucket, so new data or a new period recomputes.
+    """
+    buckets = get_bucket_starts(granularity, periods, end)
+    cache_key = f"esg_trends_{company.id}_{granularity}_{periods}_{buckets[-1].isoformat()}_{company.data_version}"
+    trends = cache.get(cache_key)
+    if trends is None:
+        trends = compute_trends(company, granularity, periods, end)
+        cache.set(cache_key, trends, TREND_CACHE_TIMEOUT)
+    return trends
+
+
+def summarize_trend(trends, pillar):
+    """Direction, rate (points per quarter) and consistency of a score series"""
+    series = trends[pillar]
+    deltas = trends['score_deltas'][pillar]
+    periods_per_quarter = PERIODS_PER_QUARTER[trends['granularity']]
+    changes = [d for d in deltas if d is not None]
+    if not changes or len(series) < 2:
+        return {'direction': 'stable', 'rate': 0.0, 'consistency': 'insufficient_data'}
+
+    rate = round(sum(changes) / len(changes) * periods_per_quarter, 1)
+    if rate > 0.5:
+        direction = 'improving'
+    elif rate < -0.5:
+        direction = 'declining'
+    else:
+        direction = 'stable'
+
+    moving = [d for d in changes if abs(d) > 0.05]
+    same_sign = all(d > 0 for d in moving) or all(d < 0 for d in moving)
+    return {
+        'direction': direction,
+        'rate': rate,
+        'consistency': 'stable' if same_sign else 'volatile',
+    }
+
+
+def get_trend_drivers(trends, fields, limit=2):
+    """Metric fields with the largest favourable change across the window"""
+    improvements = []
+    for field in fields:
+        series = [v for v in trends['metrics'].get(field, []) if v is not None]
+        if len(series) < 2 or not series[0]:
+            continue
+        change = (series[-1] - series[0]) / abs(series[0]) * 100
+        if field in LOWER_IS_BETTER:
+            change = -change
+        if change > 0:
+            improvements.append((change, field))
+    return [field for _, field in sorted(improvements, reverse=True)[:limit]]
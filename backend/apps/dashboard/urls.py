@@ -20,6 +20,7 @@ urlpatterns = [
     path('insights/', views.dashboard_insights, name='dashboard_insights'),
     path('quick-stats/', views.quick_stats, name='quick_stats'),
     path('kpis/', views.kpi_metrics, name='kpi_metrics'),
+    path('batch/', views.dashboard_batch, name='dashboard_batch'),
     
     # Alert management
     path('alerts/', views.dashboard_alerts, name='dashboard_alerts'),
@@ -9,10 +9,16 @@ from datetime import datetime, timedelta, date
 from django.contrib.auth import get_user_model
 from django.views.decorators.csrf import csrf_exempt
 from collections import defaultdict
+import logging
 import os
 import re
 
-from .models import DashboardMetric, DashboardWidget, DashboardAlert, BenchmarkData, AnalyticsEvent
+from .models import DashboardMetric, DashboardWidget, DashboardAlert, AnalyticsEvent
+from .benchmarks import find_benchmark, get_benchmark_distribution, percentile_rank
+from .batch import WIDGET_BUILDERS, build_batch_payload, get_configured_widget_keys
+from .enhanced_views import get_task_statistics
+from .metrics import refresh_company_metrics
+from .trends import GRANULARITIES, get_trends
 from .serializers import (
     DashboardOverviewSerializer, DashboardMetricSerializer, DashboardWidgetSerializer,
     DashboardAlertSerializer, ESGTrendsSerializer, EmissionsBreakdownSerializer,
@@ -27,6 +33,7 @@ from apps.esg_assessment.models import ESGAssessment, ESGResponse
 from apps.reports.models import GeneratedReport
 from apps.files.models import ExtractedFileData
 
+logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
@@ -46,6 +53,126 @@ def test_social_dashboard(request):
         return HttpResponse(f"Test dashboard HTML file not found at: {html_path}", status=404)
 
 
+# Per-category layout of the file-data endpoints: initial payload, the
+# "latest value" fields and the labels shown for each attachment
+FILE_DATA_SPECS = {
+    'social': {
+        'tasks_key': 'social_tasks',
+        'initial': ['training_hours', 'safety_incidents', 'satisfaction_score', 'diversity_ratio'],
+        'latest': [
+            ('training_hours', 'training_hours'),
+            ('safety_incidents', 'safety_incidents'),
+            ('satisfaction_score', 'employee_satisfaction_score'),
+            ('total_employees', 'total_employees'),
+        ],
+        'labels': [
+            ('training_hours', "Training Hours: {}"),
+            ('safety_incidents', "Safety Incidents: {}"),
+            ('employee_satisfaction_score', "Satisfaction Score: {}%"),
+            ('total_employees', "Total Employees: {}"),
+        ],
+    },
+    'environmental': {
+        'tasks_key': 'environmental_tasks',
+        'initial': ['energy_consumption', 'water_usage', 'waste_generated', 'carbon_emissions', 'renewable_energy'],
+        'latest': [
+            ('energy_consumption', 'energy_consumption_kwh'),
+            ('water_usage', 'water_usage_liters'),
+            ('waste_generated', 'waste_generated_kg'),
+            ('carbon_emissions', 'carbon_emissions_tco2'),
+            ('renewable_energy', 'renewable_energy_percentage'),
+        ],
+        'labels': [
+            ('energy_consumption_kwh', "Energy: {} kWh"),
+            ('water_usage_liters', "Water: {} L"),
+            ('waste_generated_kg', "Waste: {} kg"),
+            ('carbon_emissions_tco2', "Carbon: {} tCO2"),
+            ('renewable_energy_percentage', "Renewable: {}%"),
+        ],
+    },
+    'governance': {
+        'tasks_key': 'governance_tasks',
+        'initial': ['board_meetings', 'compliance_score', 'audit_findings', 'policy_updates', 'stakeholder_engagement'],
+        'latest': [
+            ('board_meetings', 'board_meetings'),
+            ('compliance_score', 'compliance_score'),
+        ],
+        'labels': [
+            ('board_meetings', "Board Meetings: {}"),
+            ('compliance_score', "Compliance Score: {}%"),
+        ],
+    },
+}
+
+
+def _get_category_extracted_records(company, category):
+    """Completed extraction records for one task category, newest first"""
+    return list(
+        ExtractedFileData.objects.filter(
+            task_attachment__task__company=company,
+            task_attachment__task__category__icontains=category,
+            processing_status='completed'
+        ).select_related('task_attachment__task').order_by('-extraction_date')
+    )
+
+
+def _build_file_data_payload(category, records):
+    """
+    Build the file-data payload for a category from extraction records
+    ordered newest first. Works on an in-memory list so the records can be
+    shared with other widgets (see apps.dashboard.batch).
+    """
+    spec = FILE_DATA_SPECS[category]
+    
+    extracted_data = {key: None for key in spec['initial']}
+    extracted_data.update({
+        'files_analyzed': len(records),
+        spec['tasks_key']: [],
+        'extraction_confidence': 0.0
+    })
+    
+    if not records:
+        return extracted_data
+    
+    avg_confidence = sum(r.confidence_score or 0.0 for r in records) / len(records)
+    extracted_data['extraction_confidence'] = round(avg_confidence, 1)
+    
+    # Latest non-null value for each metric
+    for payload_key, field in spec['latest']:
+        latest = next((r for r in records if getattr(r, field) is not None), None)
+        if latest:
+            extracted_data[payload_key] = getattr(latest, field)
+    
+    # Group by task for detailed view
+    tasks_data = {}
+    for extracted in records:
+        attachment = extracted.task_attachment
+        task = attachment.task
+        if task.id not in tasks_data:
+            tasks_data[task.id] = {
+                'title': task.title,
+                'attachments': []
+            }
+        
+        tasks_data[task.id]['attachments'].append({
+            'title': attachment.title,
+            'filename': attachment.original_filename,
+            'file_size': attachment.file.size if attachment.file else None,
+            'attachment_type': attachment.attachment_type,
+            'description': attachment.description,
+            'created_at': attachment.uploaded_at,
+            'extracted_values': [
+                label.format(getattr(extracted, field))
+                for field, label in spec['labels'] if getattr(extracted, field)
+            ],
+            'confidence_score': extracted.confidence_score,
+            'extraction_method': extracted.extraction_method
+        })
+    
+    extracted_data[spec['tasks_key']] = list(tasks_data.values())
+    return extracted_data
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def social_file_data(request):
@@ -56,93 +183,8 @@ def social_file_data(request):
     if not company:
         return Response({'error': 'No company associated with user'}, status=400)
     
-    # Get all extracted data for social tasks
-    social_extracted_data = ExtractedFileData.objects.filter(
-        task_attachment__task__company=company,
-        task_attachment__task__category__icontains='social',
-        processing_status='completed'
-    ).select_related('task_attachment__task')
-    
-    extracted_data = {
-        'training_hours': None,
-        'safety_incidents': None,
-        'satisfaction_score': None,
-        'diversity_ratio': None,
-        'files_analyzed': social_extracted_data.count(),
-        'social_tasks': [],
-        'extraction_confidence': 0.0
-    }
-    
-    # Aggregate data from extracted files
-    if social_extracted_data.exists():
-        # Calculate average confidence
-        avg_confidence = social_extracted_data.aggregate(
-            avg_confidence=Avg('confidence_score')
-        )['avg_confidence'] or 0.0
-        extracted_data['extraction_confidence'] = round(avg_confidence, 1)
-        
-        # Get latest values for each metric
-        latest_training = social_extracted_data.exclude(
-            training_hours__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_training:
-            extracted_data['training_hours'] = latest_training.training_hours
-        
-        latest_safety = social_extracted_data.exclude(
-            safety_incidents__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_safety:
-            extracted_data['safety_incidents'] = latest_safety.safety_incidents
-        
-        latest_satisfaction = social_extracted_data.exclude(
-            employee_satisfaction_score__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_satisfaction:
-            extracted_data['satisfaction_score'] = latest_satisfaction.employee_satisfaction_score
-        
-        latest_employees = social_extracted_data.exclude(
-            total_employees__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_employees:
-            extracted_data['total_employees'] = latest_employees.total_employees
-        
-        # Group by task for detailed view
-        tasks_data = {}
-        for extracted in social_extracted_data:
-            task = extracted.task_attachment.task
-            if task.id not in tasks_data:
-                tasks_data[task.id] = {
-            'title': task.title,
-            'attachments': []
-        }
-        
-            attachment_data = {
-                'title': extracted.task_attachment.title,
-                'filename': extracted.task_attachment.original_filename,
-                'file_size': extracted.task_attachment.file.size if extracted.task_attachment.file else None,
-                'attachment_type': extracted.task_attachment.attachment_type,
-                'description': extracted.task_attachment.description,
-                'created_at': extracted.task_attachment.uploaded_at,
-                'extracted_values': [],
-                'confidence_score': extracted.confidence_score,
-                'extraction_method': extracted.extraction_method
-            }
-            
-            # Add extracted metrics
-            if extracted.training_hours:
-                attachment_data['extracted_values'].append(f"Training Hours: {extracted.training_hours}")
-            if extracted.safety_incidents:
-                attachment_data['extracted_values'].append(f"Safety Incidents: {extracted.safety_incidents}")
-            if extracted.employee_satisfaction_score:
-                attachment_data['extracted_values'].append(f"Satisfaction Score: {extracted.employee_satisfaction_score}%")
-            if extracted.total_employees:
-                attachment_data['extracted_values'].append(f"Total Employees: {extracted.total_employees}")
-            
-            tasks_data[task.id]['attachments'].append(attachment_data)
-        
-        extracted_data['social_tasks'] = list(tasks_data.values())
-    
-    return Response(extracted_data)
+    records = _get_category_extracted_records(company, 'social')
+    return Response(_build_file_data_payload('social', records))
 
 
 def _get_task_data_entries(company):
@@ -281,18 +323,18 @@ def _get_meter_type_for_field(task, field_key):
     if requires_gas:
         required_types.append('gas')
     
-    print(f"     🔍 Task analysis: {task.title[:40]}...")
-    print(f"        Required types: {required_types}")
-    print(f"        Field key: {field_key}")
+    logger.debug(f"     🔍 Task analysis: {task.title[:40]}...")
+    logger.debug(f"        Required types: {required_types}")
+    logger.debug(f"        Field key: {field_key}")
     
     # STEP 2: Handle single meter type tasks (most common case)
     if len(required_types) == 1:
-        print(f"        -> Single meter task: {required_types[0]}")
+        logger.debug(f"        -> Single meter task: {required_types[0]}")
         return required_types[0]
     
     # STEP 3: Handle no meter requirements (shouldn't happen but safety check)
     if len(required_types) == 0:
-        print(f"        -> No meter requirements detected")
+        logger.debug(f"        -> No meter requirements detected")
         return None
     
     # STEP 4: Advanced pattern matching for multiple meter tasks
@@ -305,13 +347,13 @@ def _get_meter_type_for_field(task, field_key):
     
     # Try exact pattern matching first
     if requires_electricity and any(pattern in field_lower for pattern in elec_field_patterns):
-        print(f"        -> Matched electricity pattern in field name")
+        logger.debug(f"        -> Matched electricity pattern in field name")
         return 'electricity'
     elif requires_water and any(pattern in field_lower for pattern in water_field_patterns):
-        print(f"        -> Matched water pattern in field name") 
+        logger.debug(f"        -> Matched water pattern in field name") 
         return 'water'
     elif requires_gas and any(pattern in field_lower for pattern in gas_field_patterns):
-        print(f"        -> Matched gas pattern in field name")
+        logger.debug(f"        -> Matched gas pattern in field name")
         return 'gas'
     
     # STEP 5: Intelligent distribution for ambiguous field names
@@ -338,14 +380,14 @@ def _get_meter_type_for_field(task, field_key):
             field_index = numeric_keys.index(field_key)
             if field_index < len(required_types):
                 assigned_type = required_types[field_index]
-                print(f"        -> Distributed field {field_index + 1}/{len(numeric_keys)} to {assigned_type}")
+                logger.debug(f"        -> Distributed field {field_index + 1}/{len(numeric_keys)} to {assigned_type}")
                 return assigned_type
         except ValueError:
             pass
     
     # STEP 6: Fallback - default to first required type
     default_type = required_types[0]
-    print(f"        -> Fallback to first required type: {default_type}")
+    logger.debug(f"        -> Fallback to first required type: {default_type}")
     return default_type
 
 
@@ -501,102 +543,8 @@ def environmental_file_data(request):
     if not company:
         return Response({'error': 'No company associated with user'}, status=400)
     
-    # Get all extracted data for environmental tasks
-    environmental_extracted_data = ExtractedFileData.objects.filter(
-        task_attachment__task__company=company,
-        task_attachment__task__category__icontains='environmental',
-        processing_status='completed'
-    ).select_related('task_attachment__task')
-    
-    extracted_data = {
-        'energy_consumption': None,
-        'water_usage': None,
-        'waste_generated': None,
-        'carbon_emissions': None,
-        'renewable_energy': None,
-        'files_analyzed': environmental_extracted_data.count(),
-        'environmental_tasks': [],
-        'extraction_confidence': 0.0
-    }
-    
-    # Aggregate data from extracted files
-    if environmental_extracted_data.exists():
-        # Calculate average confidence
-        avg_confidence = environmental_extracted_data.aggregate(
-            avg_confidence=Avg('confidence_score')
-        )['avg_confidence'] or 0.0
-        extracted_data['extraction_confidence'] = round(avg_confidence, 1)
-        
-        # Get latest values for each metric
-        latest_energy = environmental_extracted_data.exclude(
-            energy_consumption_kwh__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_energy:
-            extracted_data['energy_consumption'] = latest_energy.energy_consumption_kwh
-        
-        latest_water = environmental_extracted_data.exclude(
-            water_usage_liters__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_water:
-            extracted_data['water_usage'] = latest_water.water_usage_liters
-        
-        latest_waste = environmental_extracted_data.exclude(
-            waste_generated_kg__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_waste:
-            extracted_data['waste_generated'] = latest_waste.waste_generated_kg
-        
-        latest_carbon = environmental_extracted_data.exclude(
-            carbon_emissions_tco2__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_carbon:
-            extracted_data['carbon_emissions'] = latest_carbon.carbon_emissions_tco2
-        
-        latest_renewable = environmental_extracted_data.exclude(
-            renewable_energy_percentage__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_renewable:
-            extracted_data['renewable_energy'] = latest_renewable.renewable_energy_percentage
-        
-        # Group by task for detailed view
-        tasks_data = {}
-        for extracted in environmental_extracted_data:
-            task = extracted.task_attachment.task
-            if task.id not in tasks_data:
-                tasks_data[task.id] = {
-                    'title': task.title,
-                    'attachments': []
-                }
-            
-            attachment_data = {
-                'title': extracted.task_attachment.title,
-                'filename': extracted.task_attachment.original_filename,
-                'file_size': extracted.task_attachment.file.size if extracted.task_attachment.file else None,
-                'attachment_type': extracted.task_attachment.attachment_type,
-                'description': extracted.task_attachment.description,
-                'created_at': extracted.task_attachment.uploaded_at,
-                'extracted_values': [],
-                'confidence_score': extracted.confidence_score,
-                'extraction_method': extracted.extraction_method
-            }
-            
-            # Add extracted metrics
-            if extracted.energy_consumption_kwh:
-                attachment_data['extracted_values'].append(f"Energy: {extracted.energy_consumption_kwh} kWh")
-            if extracted.water_usage_liters:
-                attachment_data['extracted_values'].append(f"Water: {extracted.water_usage_liters} L")
-            if extracted.waste_generated_kg:
-                attachment_data['extracted_values'].append(f"Waste: {extracted.waste_generated_kg} kg")
-            if extracted.carbon_emissions_tco2:
-                attachment_data['extracted_values'].append(f"Carbon: {extracted.carbon_emissions_tco2} tCO2")
-            if extracted.renewable_energy_percentage:
-                attachment_data['extracted_values'].append(f"Renewable: {extracted.renewable_energy_percentage}%")
-            
-            tasks_data[task.id]['attachments'].append(attachment_data)
-        
-        extracted_data['environmental_tasks'] = list(tasks_data.values())
-    
-    return Response(extracted_data)
+    records = _get_category_extracted_records(company, 'environmental')
+    return Response(_build_file_data_payload('environmental', records))
 
 
 @api_view(['GET'])
@@ -609,78 +557,8 @@ def governance_file_data(request):
     if not company:
         return Response({'error': 'No company associated with user'}, status=400)
     
-    # Get all extracted data for governance tasks
-    governance_extracted_data = ExtractedFileData.objects.filter(
-        task_attachment__task__company=company,
-        task_attachment__task__category__icontains='governance',
-        processing_status='completed'
-    ).select_related('task_attachment__task')
-    
-    extracted_data = {
-        'board_meetings': None,
-        'compliance_score': None,
-        'audit_findings': None,
-        'policy_updates': None,
-        'stakeholder_engagement': None,
-        'files_analyzed': governance_extracted_data.count(),
-        'governance_tasks': [],
-        'extraction_confidence': 0.0
-    }
-    
-    # Aggregate data from extracted files
-    if governance_extracted_data.exists():
-        # Calculate average confidence
-        avg_confidence = governance_extracted_data.aggregate(
-            avg_confidence=Avg('confidence_score')
-        )['avg_confidence'] or 0.0
-        extracted_data['extraction_confidence'] = round(avg_confidence, 1)
-        
-        # Get latest values for each metric
-        latest_board = governance_extracted_data.exclude(
-            board_meetings__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_board:
-            extracted_data['board_meetings'] = latest_board.board_meetings
-        
-        latest_compliance = governance_extracted_data.exclude(
-            compliance_score__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_compliance:
-            extracted_data['compliance_score'] = latest_compliance.compliance_score
-        
-        # Group by task for detailed view
-        tasks_data = {}
-        for extracted in governance_extracted_data:
-            task = extracted.task_attachment.task
-            if task.id not in tasks_data:
-                tasks_data[task.id] = {
-            'title': task.title,
-            'attachments': []
-        }
-        
-            attachment_data = {
-                'title': extracted.task_attachment.title,
-                'filename': extracted.task_attachment.original_filename,
-                'file_size': extracted.task_attachment.file.size if extracted.task_attachment.file else None,
-                'attachment_type': extracted.task_attachment.attachment_type,
-                'description': extracted.task_attachment.description,
-                'created_at': extracted.task_attachment.uploaded_at,
-                'extracted_values': [],
-                'confidence_score': extracted.confidence_score,
-                'extraction_method': extracted.extraction_method
-            }
-            
-            # Add extracted metrics
-            if extracted.board_meetings:
-                attachment_data['extracted_values'].append(f"Board Meetings: {extracted.board_meetings}")
-            if extracted.compliance_score:
-                attachment_data['extracted_values'].append(f"Compliance Score: {extracted.compliance_score}%")
-            
-            tasks_data[task.id]['attachments'].append(attachment_data)
-        
-        extracted_data['governance_tasks'] = list(tasks_data.values())
-    
-    return Response(extracted_data)
+    records = _get_category_extracted_records(company, 'governance')
+    return Response(_build_file_data_payload('governance', records))
 
 
 @api_view(['GET'])
@@ -770,6 +648,10 @@ def dashboard_metrics(request):
         is_current=True
     ).order_by('-calculated_at')
     
+    # Precomputed by refresh_dashboard_metrics; compute on first access
+    if not metrics.exists():
+        refresh_company_metrics(company, force=True)
+    
     serializer = DashboardMetricSerializer(metrics, many=True)
     return Response(serializer.data)
 
@@ -823,17 +705,7 @@ def alert_summary(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    alerts = DashboardAlert.objects.filter(company=company, is_active=True)
-    
-    summary_data = {
-        'total_alerts': alerts.count(),
-        'unread_alerts': alerts.filter(is_read=False).count(),
-        'critical_alerts': alerts.filter(severity='critical').count(),
-        'alerts_by_type': dict(alerts.values('alert_type').annotate(count=Count('id')).values_list('alert_type', 'count')),
-        'recent_alerts': alerts.order_by('-created_at')[:5]
-    }
-    
-    serializer = AlertSummarySerializer(summary_data)
+    serializer = AlertSummarySerializer(_build_alert_summary(company))
     return Response(serializer.data)
 
 
@@ -848,7 +720,19 @@ def esg_trends(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    trends_data = _get_esg_trends(company)
+    granularity = request.query_params.get('granularity', 'month')
+    if granularity not in GRANULARITIES:
+        return Response(
+            {'error': f"granularity must be one of: {', '.join(GRANULARITIES)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        periods = min(max(int(request.query_params.get('periods', 12)), 2), 104)
+    except ValueError:
+        periods = 12
+    
+    trends_data = get_trends(company, granularity=granularity, periods=periods)
     serializer = ESGTrendsSerializer(trends_data)
     return Response(serializer.data)
 
@@ -864,11 +748,9 @@ def company_comparison(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Get benchmark data for company's sector
-    benchmark = BenchmarkData.objects.filter(
-        sector=company.business_sector,
-        is_current=True
-    ).first()
+    # Live benchmark for the company's sector and emirate (see benchmarks.py),
+    # falling back to the national and cross-sector benchmarks
+    benchmark = find_benchmark(company)
     
     if not benchmark:
         return Response(
@@ -890,7 +772,14 @@ def company_comparison(request):
             'overall': benchmark.overall_average,
         },
         'percentile_ranking': _calculate_percentile_ranking(company, benchmark),
-        'comparison_analysis': _generate_comparison_analysis(company, benchmark)
+        'comparison_analysis': _generate_comparison_analysis(company, benchmark),
+        'benchmark': {
+            'sector': benchmark.sector,
+            'region': benchmark.region,
+            'sample_size': benchmark.sample_size,
+            'data_source': benchmark.data_source,
+            'data_period': benchmark.data_period,
+        }
     }
     
     serializer = CompanyComparisonSerializer(comparison_data)
@@ -908,19 +797,7 @@ def dashboard_insights(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    insights_data = {
-        'performance_summary': _generate_performance_summary(company),
-        'key_achievements': _get_key_achievements(company),
-        'areas_for_improvement': _get_improvement_areas(company),
-        'trending_upward': _get_trending_metrics(company, direction='up'),
-        'trending_downward': _get_trending_metrics(company, direction='down'),
-        'forecasted_score': _forecast_esg_score(company),
-        'projected_completion_date': _project_completion_date(company),
-        'industry_position': _get_industry_position(company),
-        'peer_comparison': _get_peer_comparison(company)
-    }
-    
-    serializer = DashboardInsightSerializer(insights_data)
+    serializer = DashboardInsightSerializer(_build_dashboard_insights(company))
     return Response(serializer.data)
 
 
@@ -935,33 +812,7 @@ def quick_stats(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    today = timezone.now().date()
-    
-    stats_data = {
-        'total_assessments': ESGAssessment.objects.filter(company=company).count(),
-        'active_frameworks': ESGAssessment.objects.filter(
-            company=company, 
-            status='active'
-        ).values('framework').distinct().count(),
-        'completed_tasks_today': Task.objects.filter(
-            company=company,
-            status='completed',
-            updated_at__date=today
-        ).count(),
-        'reports_generated': GeneratedReport.objects.filter(company=company).count(),
-        'team_members': User.objects.filter(company=company).count(),
-        'data_points_collected': ESGResponse.objects.filter(
-            assessment__company=company
-        ).count(),
-        'score_improvement': 2.3,  # Mock improvement percentage
-        'completion_rate': 67.8,  # Mock completion rate
-        'average_task_completion_days': 4.2,  # Mock average
-        'last_report_generated': GeneratedReport.objects.filter(
-            company=company
-        ).order_by('-created_at').first().created_at if GeneratedReport.objects.filter(company=company).exists() else None
-    }
-    
-    serializer = QuickStatsSerializer(stats_data)
+    serializer = QuickStatsSerializer(_build_quick_stats(company))
     return Response(serializer.data)
 
 
@@ -981,6 +832,41 @@ def kpi_metrics(request):
     return Response(serializer.data)
 
 
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def dashboard_batch(request):
+    """
+    Load several dashboard widgets in one round trip.
+    Widgets come from ``?widgets=a,b`` (GET) or ``{"widgets": [...]}`` (POST);
+    without them the company's configured DashboardWidget layout is used.
+    """
+    company = request.user.company
+    if not company:
+        return Response(
+            {'error': 'User not associated with a company'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if request.method == 'POST':
+        widget_keys = request.data.get('widgets')
+    else:
+        widget_keys = [key.strip() for key in request.query_params.get('widgets', '').split(',') if key.strip()]
+    
+    if widget_keys and not isinstance(widget_keys, list):
+        return Response(
+            {'error': 'widgets must be a list of widget keys'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if not widget_keys:
+        widget_keys = get_configured_widget_keys(company, request.user)
+    
+    payload = build_batch_payload(company, widget_keys)
+    payload['available_widgets'] = sorted(WIDGET_BUILDERS)
+    payload['generated_at'] = timezone.now()
+    return Response(payload)
+
+
 class DashboardWidgetListView(generics.ListCreateAPIView):
     """List and create dashboard widgets"""
     serializer_class = DashboardWidgetSerializer
@@ -1030,9 +916,75 @@ def track_analytics_event(request):
 
 # Helper functions
 
+def _build_alert_summary(company):
+    """Alert summary statistics for a company"""
+    alerts = DashboardAlert.objects.filter(company=company, is_active=True)
+    counts = alerts.aggregate(
+        total=Count('id'),
+        unread=Count('id', filter=Q(is_read=False)),
+        critical=Count('id', filter=Q(severity='critical')),
+    )
+    
+    return {
+        'total_alerts': counts['total'],
+        'unread_alerts': counts['unread'],
+        'critical_alerts': counts['critical'],
+        'alerts_by_type': dict(alerts.values('alert_type').annotate(count=Count('id')).values_list('alert_type', 'count')),
+        'recent_alerts': alerts.order_by('-created_at')[:5]
+    }
+
+
+def _build_dashboard_insights(company):
+    """Insight and analytics data for a company"""
+    return {
+        'performance_summary': _generate_performance_summary(company),
+        'key_achievements': _get_key_achievements(company),
+        'areas_for_improvement': _get_improvement_areas(company),
+        'trending_upward': _get_trending_metrics(company, direction='up'),
+        'trending_downward': _get_trending_metrics(company, direction='down'),
+        'forecasted_score': _forecast_esg_score(company),
+        'projected_completion_date': _project_completion_date(company),
+        'industry_position': _get_industry_position(company),
+        'peer_comparison': _get_peer_comparison(company)
+    }
+
+
+def _build_quick_stats(company, task_stats=None):
+    """
+    Quick statistics for dashboard widgets. ``task_stats`` (from
+    get_task_statistics) lets the batch endpoint share the task aggregate.
+    """
+    if task_stats is None:
+        task_stats = get_task_statistics(company)
+    reports = GeneratedReport.objects.filter(company=company).aggregate(
+        count=Count('id'),
+        last_created_at=Max('created_at'),
+    )
+    
+    return {
+        'total_assessments': ESGAssessment.objects.filter(company=company).count(),
+        'active_frameworks': ESGAssessment.objects.filter(
+            company=company, 
+            status='active'
+        ).exclude(target_frameworks=None).values('target_frameworks').distinct().count(),
+        'completed_tasks_today': task_stats['completed_today'],
+        'reports_generated': reports['count'],
+        'team_members': User.objects.filter(company=company).count(),
+        'data_points_collected': ESGResponse.objects.filter(
+            assessment__company=company
+        ).count(),
+        'score_improvement': 2.3,  # Mock improvement percentage
+        'completion_rate': 67.8,  # Mock completion rate
+        'average_task_completion_days': 4.2,  # Mock average
+        'last_report_generated': reports['last_created_at']
+    }
+
+
 def _get_esg_trends(company):
-    """Generate ESG trends data for the last 12 months"""
-    # Mock data - in production, this would come from historical metrics
+    """ESG trends data for the last 12 months (demo data without a company)"""
+    if company is not None:
+        return get_trends(company)
+    
     months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     
@@ -1141,15 +1093,23 @@ def _calculate_percentile_ranking(company, benchmark):
     """Calculate company's percentile ranking against benchmark"""
     rankings = {}
     
+    # Live benchmarks keep every peer score: rank exactly by binary search
+    distribution = get_benchmark_distribution(benchmark)
+    if distribution:
+        for category in ['environmental', 'social', 'governance', 'overall']:
+            company_score = company.overall_esg_score if category == 'overall' else getattr(company, f'{category}_score')
+            rankings[category] = percentile_rank(distribution[category], company_score)
+        return rankings
+    
     for category in ['environmental', 'social', 'governance', 'overall']:
-        company_score = getattr(company, f'{category}_score')
+        company_score = company.overall_esg_score if category == 'overall' else getattr(company, f'{category}_score')
         
         if category == 'overall':
             avg = benchmark.overall_average
             p25, p50, p75 = benchmark.percentile_25, benchmark.percentile_50, benchmark.percentile_75
         else:
             avg = getattr(benchmark, f'{category}_average')
-            # Mock percentile data for categories
+            # Static benchmarks only carry overall quartiles: estimate the rest
             p25, p50, p75 = avg - 10, avg, avg + 10
         
         if company_score >= p75:
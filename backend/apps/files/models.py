@@ -128,6 +128,7 @@ def extract_data_from_attachment(sender, instance, created, **kwargs):
             extracted_record.save()
             
             # Update company metrics cache
+            instance.task.company.bump_data_version()
             update_company_metrics_cache(instance.task.company)
             
             logger.info(f"Successfully extracted data from {instance.original_filename} with confidence {extracted_data.confidence_score:.1f}%")
@@ -81,7 +81,7 @@ class GeneratedReportAdmin(admin.ModelAdmin):
         }),
         ('Status', {
             'fields': (
-                'status', 'progress_percentage', 'error_message',
+                'status', 'progress_percentage', 'progress_stage', 'error_message',
                 'generated_by', 'generation_time_seconds'
             )
         }),
@@ -0,0 +1,154 @@
+"""
+Report file downloads
+
+Files are streamed in chunks instead of being read into memory, with
+single-range ``Range`` requests (resumable downloads, PDF viewers), an
+``ETag`` derived from the file's SHA-256 and optional web-server offload via
+``X-Sendfile`` or ``X-Accel-Redirect`` (``REPORT_DOWNLOAD_OFFLOAD``). Access
+logging runs once the response body starts, so a slow or failed log write
+never delays the first byte and aborted requests are not logged.
+"""
+
+import hashlib
+import logging
+import os
+import re
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+
+from .models import GeneratedReport
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'xml': 'application/xml',
+}
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def report_filename(report):
+    safe_name = report.name.replace('/', '_').replace(':', '_').replace('"', '')
+    return f"{safe_name}.{report.format}"
+
+
+def report_file_hash(report):
+    """SHA-256 of the report file, computed on first use and stored on the report"""
+    if not report.file_hash:
+        digest = hashlib.sha256()
+        with report.file.open('rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        report.file_hash = digest.hexdigest()
+        GeneratedReport.objects.filter(pk=report.pk).update(file_hash=report.file_hash)
+    return report.file_hash
+
+
+def _parse_range(header, size):
+    """
+    (start, end) inclusive for a single byte range, None to serve the whole
+    file, or False when the range cannot be satisfied
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: serving the full body is allowed
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _stream(report, start, length, on_start):
+    if on_start:
+        try:
+            on_start()
+        except Exception as e:
+            logger.error(f"Could not log access to report {report.pk}: {e}")
+
+    remaining = length
+    if remaining <= 0:
+        return
+    with report.file.open('rb') as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _offload_response(report, offload, on_start):
+    # The web server reads the file (and handles Range itself); the empty
+    # streaming body still triggers access logging when it is sent
+    response = StreamingHttpResponse(_stream(report, 0, 0, on_start))
+    if offload == 'x-accel-redirect':
+        prefix = getattr(settings, 'REPORT_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+        name = report.file.name
+        if os.path.isabs(name):
+            # Older reports stored the absolute path as the file name
+            name = os.path.relpath(name, settings.MEDIA_ROOT)
+        response['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{name}"
+    else:
+        response['X-Sendfile'] = report.file.path
+    return response
+
+
+def serve_report_file(request, report, on_start=None):
+    """
+    Streaming response for the report file honouring If-None-Match and Range.
+    ``on_start`` runs when the body starts being sent (access logging).
+    """
+    etag = f'"{report_file_hash(report)}"'
+    size = report.file.size
+
+    if etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        return response
+
+    offload = getattr(settings, 'REPORT_DOWNLOAD_OFFLOAD', None)
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    # If-Range: only resume when the client holds the current version
+    if range_header and request.META.get('HTTP_IF_RANGE', etag) == etag and not offload:
+        byte_range = _parse_range(range_header, size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if offload:
+        response = _offload_response(report, offload, on_start)
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(_stream(report, start, end - start + 1, on_start), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = StreamingHttpResponse(_stream(report, 0, size, on_start))
+        response['Content-Length'] = str(size)
+
+    response['Content-Type'] = CONTENT_TYPES.get(report.format, 'application/octet-stream')
+    response['Content-Disposition'] = f'attachment; filename="{report_filename(report)}"'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,258 @@
+"""
+Raw ESG data exports
+
+Meter readings, extracted file metrics, task data entries and ESG score
+history for a company and reporting period, produced one row at a time.
+Querysets are read with ``.iterator()`` and only the columns that are
+written, so an export of hundreds of thousands of rows holds one chunk in
+memory at a time. Rows are plain tuples of Python values; the Excel report
+writer and the CSV/Parquet streams below format them for their output.
+
+Meter readings carry no date of their own, so (as in the dashboard trends)
+they are attributed to the period in which their task was last updated.
+Extracted metrics use the extraction date, scores the calculation time.
+
+Parquet output needs the optional ``pyarrow`` package.
+"""
+
+import csv
+import io
+import logging
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from apps.dashboard.models import DashboardMetric
+from apps.files.models import ExtractedFileData
+from apps.tasks.models import Task
+from .services import EXTRACTED_METRIC_FIELDS
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows per Parquet row group / record batch
+PARQUET_BATCH_ROWS = 10000
+
+METER_UNITS = {
+    'electricity': 'kWh',
+    'water': 'm³',
+    'gas': 'm³',
+}
+
+METER_READING_COLUMNS = ['Recorded', 'Task', 'Category', 'Meter', 'Meter Type', 'Reading', 'Unit']
+TASK_ENTRY_COLUMNS = ['Updated', 'Task', 'Category', 'Status', 'Field', 'Value']
+EXTRACTED_METRIC_COLUMNS = ['Extracted', 'File', 'Task', 'Category', 'Method', 'Confidence'] + [
+    field.replace('_', ' ').title().replace('Kwh', 'kWh').replace('Tco2', 'tCO2') for field in EXTRACTED_METRIC_FIELDS
+]
+SCORE_HISTORY_COLUMNS = ['Calculated', 'Period Start', 'Period End', 'Overall', 'Environmental', 'Social', 'Governance']
+
+# Column types for Parquet schemas (CSV and Excel take the values as they come)
+METER_READING_TYPES = ['datetime', 'string', 'string', 'string', 'string', 'float', 'string']
+TASK_ENTRY_TYPES = ['datetime', 'string', 'string', 'string', 'string', 'string']
+EXTRACTED_METRIC_TYPES = ['datetime', 'string', 'string', 'string', 'string', 'float'] + [
+    'int' if field in ('total_employees', 'safety_incidents', 'board_meetings') else 'float'
+    for field in EXTRACTED_METRIC_FIELDS
+]
+SCORE_HISTORY_TYPES = ['datetime', 'date', 'date', 'float', 'float', 'float', 'float']
+
+
+def period_window(period_start, period_end):
+    """Aware datetime range [start, end) covering the period's dates"""
+    return (
+        timezone.make_aware(datetime.combine(period_start, time.min)),
+        timezone.make_aware(datetime.combine(period_end + timedelta(days=1), time.min)),
+    )
+
+
+def _local(value):
+    # Spreadsheets cannot hold timezone-aware datetimes
+    return timezone.localtime(value).replace(tzinfo=None) if value else None
+
+
+def _number(value):
+    try:
+        return float(str(value).replace(',', ''))
+    except (ValueError, TypeError):
+        return None
+
+
+def _entry_tasks(company, period_start, period_end, categories=None):
+    window = period_window(period_start, period_end)
+    tasks = Task.objects.filter(
+        company=company,
+        data_entries__isnull=False,
+        updated_at__gte=window[0],
+        updated_at__lt=window[1],
+    ).exclude(data_entries={})
+    if categories:
+        tasks = tasks.filter(category__in=categories)
+    return tasks.only(
+        'title', 'description', 'action_required', 'category', 'status', 'data_entries', 'updated_at'
+    ).order_by('updated_at', 'id').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def iter_meter_readings(company, period_start, period_end, categories=None):
+    """Positive numeric readings of electricity, water and gas meters"""
+    from apps.dashboard.views import _get_meter_type_for_field
+
+    for task in _entry_tasks(company, period_start, period_end, categories):
+        recorded = _local(task.updated_at)
+        for key, value in task.data_entries.items():
+            if not value or 'cost' in key.lower():
+                continue
+            reading = _number(value)
+            if reading is None:
+                continue
+            meter_type = _get_meter_type_for_field(task, key)
+            if meter_type:
+                yield (recorded, task.title, task.category, key, meter_type, reading, METER_UNITS.get(meter_type, ''))
+
+
+def iter_task_entries(company, period_start, period_end, categories=None):
+    """Every non-empty data entry recorded on a task, numeric where possible"""
+    for task in _entry_tasks(company, period_start, period_end, categories):
+        updated = _local(task.updated_at)
+        for key, value in task.data_entries.items():
+            if value is None or not str(value).strip():
+                continue
+            number = _number(value)
+            yield (updated, task.title, task.category, task.status, key, value if number is None else number)
+
+
+def iter_extracted_metrics(company, period_start, period_end, categories=None):
+    """One row per completed file extraction with its quick-access metrics"""
+    window = period_window(period_start, period_end)
+    rows = ExtractedFileData.objects.filter(
+        task_attachment__task__company=company,
+        processing_status='completed',
+        extraction_date__gte=window[0],
+        extraction_date__lt=window[1],
+    )
+    if categories:
+        rows = rows.filter(task_attachment__task__category__in=categories)
+
+    for row in rows.order_by('extraction_date', 'id').values_list(
+        'extraction_date', 'task_attachment__original_filename', 'task_attachment__task__title',
+        'task_attachment__task__category', 'extraction_method', 'confidence_score', *EXTRACTED_METRIC_FIELDS
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield (_local(row[0]),) + row[1:]
+
+
+def iter_score_history(company, period_start, period_end, categories=None):
+    """Every ESG score snapshot recorded for the company in the period"""
+    window = period_window(period_start, period_end)
+    rows = DashboardMetric.objects.filter(
+        company=company,
+        metric_type='esg_score',
+        calculated_at__gte=window[0],
+        calculated_at__lt=window[1],
+    ).order_by('calculated_at', 'id').values_list(
+        'calculated_at', 'period_start', 'period_end', 'metric_value'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    for calculated_at, score_start, score_end, scores in rows:
+        scores = scores or {}
+        yield (
+            _local(calculated_at), score_start, score_end, scores.get('overall'),
+            scores.get('environmental'), scores.get('social'), scores.get('governance'),
+        )
+
+
+ExportDataset = namedtuple('ExportDataset', ['title', 'columns', 'types', 'rows'])
+
+EXPORT_DATASETS = {
+    'meter_readings': ExportDataset('Meter Readings', METER_READING_COLUMNS, METER_READING_TYPES, iter_meter_readings),
+    'extracted_metrics': ExportDataset('Extracted Metrics', EXTRACTED_METRIC_COLUMNS, EXTRACTED_METRIC_TYPES, iter_extracted_metrics),
+    'task_entries': ExportDataset('Task Data', TASK_ENTRY_COLUMNS, TASK_ENTRY_TYPES, iter_task_entries),
+    'score_history': ExportDataset('Score History', SCORE_HISTORY_COLUMNS, SCORE_HISTORY_TYPES, iter_score_history),
+}
+
+
+class _Drain(io.RawIOBase):
+    """Write target that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_csv(dataset, rows):
+    """CSV bytes, header first, one chunk per ``EXPORT_CHUNK_SIZE`` rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(dataset.columns)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def _parquet_schema(dataset):
+    types = {
+        'string': pa.string(),
+        'float': pa.float64(),
+        'int': pa.int64(),
+        'date': pa.date32(),
+        'datetime': pa.timestamp('us'),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in zip(dataset.columns, dataset.types)])
+
+
+def _parquet_batch(dataset, schema, batch):
+    columns = []
+    for i, kind in enumerate(dataset.types):
+        values = [row[i] for row in batch]
+        if kind == 'string':
+            values = [None if value is None else str(value) for value in values]
+        columns.append(pa.array(values, type=schema.field(i).type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def parquet_available():
+    return pa is not None
+
+
+def stream_parquet(dataset, rows):
+    """Parquet bytes written one row group per ``PARQUET_BATCH_ROWS`` rows"""
+    schema = _parquet_schema(dataset)
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema)
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == PARQUET_BATCH_ROWS:
+            writer.write_batch(_parquet_batch(dataset, schema, batch))
+            batch = []
+            yield sink.drain()
+    if batch:
+        writer.write_batch(_parquet_batch(dataset, schema, batch))
+    writer.close()
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', stream_csv),
+    'parquet': ('application/vnd.apache.parquet', stream_parquet),
+}
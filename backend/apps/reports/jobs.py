@@ -0,0 +1,135 @@
+"""
+Background report generation
+
+Report requests are stored as ``GeneratedReport`` rows with status
+``pending``; that table is the queue. Once the request transaction commits the
+report is handed to an in-process worker pool, which claims the row, renders
+the file and records progress on the row as it goes. Rows left pending (for
+example by a restart) are picked up by ``manage.py process_report_queue``.
+With ``REPORT_GENERATION_ASYNC = False`` reports render inline, which keeps
+tests and offline scripts deterministic.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import GeneratedReport
+
+logger = logging.getLogger(__name__)
+
+# Progress writes are skipped until the percentage moves this much
+PROGRESS_STEP = 5.0
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'REPORT_GENERATION_WORKERS', 2),
+                thread_name_prefix='report-worker',
+            )
+        return _executor
+
+
+class ReportProgress:
+    """Progress callback that writes throttled updates straight to the report row"""
+
+    def __init__(self, report):
+        self.report = report
+        self.percentage = report.progress_percentage
+        self.stage = report.progress_stage
+
+    def __call__(self, percentage, stage):
+        percentage = round(min(99.0, percentage), 1)
+        if stage == self.stage and percentage - self.percentage < PROGRESS_STEP:
+            return
+        self.percentage = percentage
+        self.stage = stage
+        GeneratedReport.objects.filter(pk=self.report.pk).update(
+            progress_percentage=percentage,
+            progress_stage=stage,
+            updated_at=timezone.now(),
+        )
+
+
+def render_report(report, progress=None):
+    """Render the report file for its format; returns the stored file path"""
+    from .utils import generate_report_excel, generate_report_pdf
+
+    if report.format == 'xlsx' or (report.format != 'pdf' and report.template.report_type == 'custom_export'):
+        return generate_report_excel(report, progress)
+    # Standard reports fall back to PDF for other formats
+    return generate_report_pdf(report, progress)
+
+
+def run_report_job(report_id):
+    """
+    Claim a pending report and generate it. Returns the final status, or None
+    when the report was already claimed by another worker.
+    """
+    claimed = GeneratedReport.objects.filter(pk=report_id, status='pending').update(
+        status='generating',
+        progress_percentage=0.0,
+        progress_stage='collecting_data',
+        updated_at=timezone.now(),
+    )
+    if not claimed:
+        return None
+
+    report = GeneratedReport.objects.select_related('company', 'template').get(pk=report_id)
+    started = time.monotonic()
+    try:
+        render_report(report, ReportProgress(report))
+    except Exception as e:
+        logger.error(f"Report generation failed for {report_id}: {e}")
+        report.progress_stage = 'failed'
+        report.generation_time_seconds = round(time.monotonic() - started, 3)
+        report.mark_failed(str(e))
+        return report.status
+
+    report.progress_stage = 'completed'
+    report.generation_time_seconds = round(time.monotonic() - started, 3)
+    # The renderer already stored the file (relative name) on the report
+    report.mark_completed()
+    logger.info(f"Report generated successfully: {report.name} ({report.generation_time_seconds}s)")
+    return report.status
+
+
+def _run_in_worker(report_id):
+    # Worker threads hold their own connections; drop them between jobs
+    close_old_connections()
+    try:
+        return run_report_job(report_id)
+    except Exception as e:
+        logger.error(f"Report worker crashed on {report_id}: {e}")
+    finally:
+        close_old_connections()
+
+
+def _dispatch(report_id):
+    if getattr(settings, 'REPORT_GENERATION_ASYNC', True):
+        _get_executor().submit(_run_in_worker, report_id)
+    else:
+        run_report_job(report_id)
+
+
+def enqueue_report(report):
+    """Schedule generation of a pending report once the current transaction commits"""
+    transaction.on_commit(lambda: _dispatch(report.pk))
+
+
+def process_pending_reports(limit=None):
+    """Generate queued reports in creation order; returns {report_id: status}"""
+    report_ids = GeneratedReport.objects.filter(status='pending').order_by('created_at').values_list('id', flat=True)
+    if limit:
+        report_ids = report_ids[:limit]
+    return {report_id: run_report_job(report_id) for report_id in report_ids}
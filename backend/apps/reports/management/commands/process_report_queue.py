@@ -0,0 +1,37 @@
+"""
+Django management command to generate queued (pending) reports
+Usage: python manage.py process_report_queue [--limit=N] [--watch=SECONDS]
+"""
+
+import time
+from django.core.management.base import BaseCommand
+from apps.reports.jobs import process_pending_reports
+
+
+class Command(BaseCommand):
+    help = 'Generate reports left in the pending queue (e.g. after a restart)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Generate at most this many reports per pass',
+        )
+        parser.add_argument(
+            '--watch',
+            type=float,
+            help='Keep polling the queue every SECONDS instead of exiting when it is empty',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            results = process_pending_reports(limit=options.get('limit'))
+            for report_id, report_status in results.items():
+                if report_status:
+                    self.stdout.write(f"{report_id}: {report_status}")
+
+            if not options.get('watch'):
+                generated = sum(1 for report_status in results.values() if report_status)
+                self.stdout.write(self.style.SUCCESS(f'Processed {generated} queued report(s).'))
+                return
+            time.sleep(options['watch'])
@@ -0,0 +1,86 @@
+"""
+Django management command to run due report schedules
+Usage: python manage.py run_report_schedules [--now=ISO_DATETIME] [--workers=N] [--limit=N] [--loop=SECONDS] [--dry-run]
+
+Run it from cron (e.g. every 5 minutes) or keep it running with --loop.
+--now replays a run against a fake clock. For local delivery, point
+EMAIL_HOST/EMAIL_PORT at an SMTP stand-in (python -m smtpd -n -c DebuggingServer
+localhost:1025 on Python <= 3.11) or set EMAIL_BACKEND to the console backend.
+"""
+
+import time
+from dateutil.parser import isoparse
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.reports.models import ReportSchedule
+from apps.reports.scheduling import (
+    DEFAULT_SCHEDULE_WORKERS, next_run_after, run_due_schedules, schedule_period
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate and deliver reports for schedules whose next_run is due'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--now',
+            type=str,
+            help='Run as of this ISO datetime instead of the current time (fake clock)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_SCHEDULE_WORKERS,
+            help='Company/period groups generated in parallel (SQLite always uses one)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Claim at most this many schedules per pass',
+        )
+        parser.add_argument(
+            '--loop',
+            type=float,
+            help='Keep running, checking for due schedules every SECONDS',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List due schedules without claiming or running them',
+        )
+
+    def _now(self, options):
+        if not options.get('now'):
+            return timezone.now()
+        try:
+            now = isoparse(options['now'])
+        except ValueError:
+            raise CommandError(f'Invalid --now value "{options["now"]}"; use an ISO datetime.')
+        return timezone.make_aware(now) if timezone.is_naive(now) else now
+
+    def handle(self, *args, **options):
+        if options.get('dry_run'):
+            now = self._now(options)
+            due = ReportSchedule.objects.filter(is_active=True, next_run__lte=now).select_related('company')
+            for schedule in due.order_by('next_run'):
+                period_start, period_end = schedule_period(schedule.frequency, schedule.next_run)
+                self.stdout.write(
+                    f"{schedule.company.name} - {schedule.name}: {period_start} to {period_end}, "
+                    f"next run would move to {next_run_after(schedule, now):%Y-%m-%d %H:%M}"
+                )
+            self.stdout.write(self.style.SUCCESS(f'{due.count()} schedule(s) due.'))
+            return
+
+        while True:
+            results = run_due_schedules(self._now(options), workers=options['workers'], limit=options.get('limit'))
+            for result in results:
+                style = self.style.SUCCESS if result['status'] == 'completed' else self.style.ERROR
+                self.stdout.write(style(
+                    f"{result['company']} - {result['schedule']} ({result['period']}): {result['status']}, "
+                    f"sent to {result['delivered_to']} recipient(s)"
+                ))
+
+            if not options.get('loop'):
+                self.stdout.write(self.style.SUCCESS(f'Ran {len(results)} scheduled report(s).'))
+                return
+            time.sleep(options['loop'])
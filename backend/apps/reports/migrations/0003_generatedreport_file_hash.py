@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_generatedreport_progress_stage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedreport',
+            name='file_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the file (download ETag)', max_length=64),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_generatedreport_page_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reportschedule',
+            index=models.Index(fields=['is_active', 'next_run'], name='reports_rep_is_acti_75ce04_idx'),
+        ),
+    ]
@@ -166,11 +166,14 @@ class GeneratedReport(models.Model):
     # Status and progress
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     progress_percentage = models.FloatField(default=0.0)
+    progress_stage = models.CharField(max_length=50, blank=True)
     error_message = models.TextField(blank=True)
     
     # File information
     file = models.FileField(upload_to='generated_reports/', null=True, blank=True)
     file_size = models.BigIntegerField(null=True, blank=True)
+    file_hash = models.CharField(max_length=64, blank=True, help_text='SHA-256 of the file (download ETag)')
+    page_count = models.PositiveIntegerField(null=True, blank=True)
     
     # Generation metadata
     generated_by = models.ForeignKey(
@@ -234,6 +237,7 @@ class GeneratedReport(models.Model):
         self.completed_at = timezone.now()
         if file_path:
             self.file = file_path
+            self.file_hash = ''  # recomputed for the new file on first download
         self.save()
     
     def mark_failed(self, error_message):
@@ -356,6 +360,9 @@ class ReportSchedule(models.Model):
         verbose_name = 'Report Schedule'
         verbose_name_plural = 'Report Schedules'
         ordering = ['company', 'name']
+        indexes = [
+            models.Index(fields=['is_active', 'next_run']),
+        ]
     
     def __str__(self):
         return f"{self.company.name} - {self.name} ({self.frequency})"
@@ -0,0 +1,199 @@
+"""
+Report schedule execution
+
+Due schedules (``is_active`` and ``next_run <= now``) are read through the
+(is_active, next_run) index and claimed by moving ``next_run`` forward in the
+same transaction. The claim is a conditional update, and the rows are also
+locked with SKIP LOCKED where the database supports it, so concurrent
+runners never pick up the same schedule. Claimed schedules that share a
+company and reporting period are run together by one worker, so the first
+report builds the aggregated snapshot and the rest reuse it. Finished
+reports are mailed to the schedule's recipients.
+
+``now`` is always passed in, so runs can be replayed against a fake clock.
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import close_old_connections, connection, transaction
+
+from .downloads import CONTENT_TYPES, report_filename
+from .jobs import run_report_job
+from .models import GeneratedReport, ReportSchedule
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_STEPS = {
+    'weekly': relativedelta(weeks=1),
+    'monthly': relativedelta(months=1),
+    'quarterly': relativedelta(months=3),
+    'semi_annual': relativedelta(months=6),
+    'annual': relativedelta(years=1),
+}
+
+# Calendar months per reporting period (weekly periods are handled apart)
+PERIOD_MONTHS = {
+    'monthly': 1,
+    'quarterly': 3,
+    'semi_annual': 6,
+    'annual': 12,
+}
+
+DEFAULT_SCHEDULE_WORKERS = 2
+
+
+def next_run_after(schedule, now):
+    """First run time after ``now`` on the schedule's cadence (missed runs are skipped)"""
+    step = FREQUENCY_STEPS[schedule.frequency]
+    next_run = schedule.next_run + step
+    while next_run <= now:
+        next_run += step
+    return next_run
+
+
+def schedule_period(frequency, run_at):
+    """
+    Reporting period a run covers: the last complete week, or the last
+    complete calendar month/quarter/half/year before the run date
+    """
+    run_date = run_at.date()
+    if frequency == 'weekly':
+        period_end = run_date - timedelta(days=1)
+        return period_end - timedelta(days=6), period_end
+
+    months = PERIOD_MONTHS[frequency]
+    current_start = date(run_date.year, ((run_date.month - 1) // months) * months + 1, 1)
+    period_start = current_start - relativedelta(months=months)
+    return period_start, current_start - timedelta(days=1)
+
+
+def claim_due_schedules(now, limit=None):
+    """
+    Claim due schedules by advancing their next_run. Returns
+    [(schedule, period_start, period_end)] for the runs this caller owns.
+    """
+    claimed = []
+    with transaction.atomic():
+        due = ReportSchedule.objects.filter(is_active=True, next_run__lte=now).order_by('next_run')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        if limit:
+            due = due[:limit]
+
+        for schedule in due:
+            period_start, period_end = schedule_period(schedule.frequency, schedule.next_run)
+            # Conditional on the next_run we read: another runner that got
+            # here first (no row locks on SQLite) makes this a no-op
+            won = ReportSchedule.objects.filter(pk=schedule.pk, next_run=schedule.next_run).update(
+                next_run=next_run_after(schedule, now),
+                last_run=now,
+                updated_at=now,
+            )
+            if won:
+                claimed.append((schedule.pk, period_start, period_end))
+
+    schedules = ReportSchedule.objects.select_related('company', 'template', 'created_by').in_bulk(
+        [schedule_id for schedule_id, _, _ in claimed]
+    )
+    return [(schedules[schedule_id], period_start, period_end) for schedule_id, period_start, period_end in claimed]
+
+
+def deliver_scheduled_report(schedule, report):
+    """Email the generated file to the schedule's recipients"""
+    if not schedule.recipients or not report.file:
+        return False
+
+    message = EmailMessage(
+        subject=f"{schedule.name}: {report.period_start} to {report.period_end}",
+        body=(
+            f"Your scheduled {schedule.template.display_name} for {schedule.company.name} "
+            f"covering {report.period_start} to {report.period_end} is attached."
+        ),
+        from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', None),
+        to=schedule.recipients,
+    )
+    with report.file.open('rb') as f:
+        message.attach(report_filename(report), f.read(), CONTENT_TYPES.get(report.format, 'application/octet-stream'))
+    message.send()
+    return True
+
+
+def _run_schedule(schedule, period_start, period_end):
+    report = GeneratedReport.objects.create(
+        company=schedule.company,
+        template=schedule.template,
+        name=f"{schedule.name} - {period_start} to {period_end}",
+        description=f"Scheduled {schedule.get_frequency_display().lower()} report",
+        format=schedule.parameters.get('format', 'pdf'),
+        period_start=period_start,
+        period_end=period_end,
+        parameters={**schedule.parameters, 'schedule_id': str(schedule.pk)},
+        generated_by=schedule.created_by,
+        status='pending',
+        access_token=str(uuid.uuid4()),
+    )
+    report_status = run_report_job(report.pk)
+    report.refresh_from_db()
+
+    delivered = False
+    if report_status == 'completed':
+        try:
+            delivered = deliver_scheduled_report(schedule, report)
+        except Exception as e:
+            logger.error(f"Delivery of scheduled report {report.pk} failed: {e}")
+
+    return {
+        'schedule_id': str(schedule.pk),
+        'schedule': schedule.name,
+        'company': schedule.company.name,
+        'report_id': str(report.pk),
+        'period': f"{period_start} to {period_end}",
+        'status': report.status,
+        'delivered_to': len(schedule.recipients) if delivered else 0,
+    }
+
+
+def _run_group(runs, in_worker):
+    # One company and period per group: reports after the first reuse the
+    # cached aggregated snapshot
+    if in_worker:
+        close_old_connections()
+    try:
+        return [_run_schedule(*run) for run in runs]
+    finally:
+        if in_worker:
+            close_old_connections()
+
+
+def run_due_schedules(now, workers=DEFAULT_SCHEDULE_WORKERS, limit=None):
+    """Claim and run every due schedule; returns one result dict per run"""
+    claimed = claim_due_schedules(now, limit=limit)
+    if not claimed:
+        return []
+
+    groups = defaultdict(list)
+    for schedule, period_start, period_end in claimed:
+        groups[(schedule.company_id, period_start, period_end)].append((schedule, period_start, period_end))
+
+    # SQLite allows a single writer
+    if connection.vendor == 'sqlite':
+        workers = 1
+    workers = max(1, min(workers, len(groups)))
+
+    results = []
+    if workers == 1:
+        for runs in groups.values():
+            results.extend(_run_group(runs, in_worker=False))
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-schedule') as executor:
+            for group_results in executor.map(lambda runs: _run_group(runs, in_worker=True), groups.values()):
+                results.extend(group_results)
+
+    logger.info(f"Ran {len(results)} scheduled report(s) in {len(groups)} company/period group(s)")
+    return results
@@ -105,7 +105,7 @@ class GeneratedReportSerializer(serializers.ModelSerializer):
         model = GeneratedReport
         fields = [
             'id', 'name', 'description', 'format', 'period_start', 'period_end',
-            'status', 'progress_percentage', 'error_message', 'file', 'file_size_mb',
+            'status', 'progress_percentage', 'progress_stage', 'error_message', 'file', 'file_size_mb', 'page_count',
             'is_expired', 'is_shared', 'expires_at', 'company_name', 'template_name',
             'generated_by_name', 'generation_time_seconds', 'data_completeness',
             'created_at', 'updated_at', 'completed_at',
@@ -113,7 +113,7 @@ class GeneratedReportSerializer(serializers.ModelSerializer):
             'template', 'report_type', 'report_period'
         ]
         read_only_fields = [
-            'status', 'progress_percentage', 'file_size_mb', 'is_expired',
+            'status', 'progress_percentage', 'progress_stage', 'file_size_mb', 'page_count', 'is_expired',
             'generation_time_seconds', 'created_at', 'updated_at', 'completed_at'
         ]
     
@@ -204,8 +204,13 @@ class ComplianceStatusSerializer(serializers.Serializer):
     compliance_percentage = serializers.FloatField()
     status = serializers.CharField()  # compliant, partial, non_compliant
     missing_requirements = serializers.ListField()
+    missing_count = serializers.IntegerField(required=False)
+    requirements = serializers.IntegerField(required=False)
+    requirements_met = serializers.IntegerField(required=False)
+    mandatory_requirements = serializers.IntegerField(required=False)
+    mandatory_met = serializers.IntegerField(required=False)
     last_updated = serializers.DateTimeField()
-    next_review_date = serializers.DateField()
+    next_review_date = serializers.DateField(allow_null=True)
 
 
 class ReportAccessSerializer(serializers.ModelSerializer):
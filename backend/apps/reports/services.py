@@ -1,15 +1,39 @@
 """
 ESG Report Generation Services
 """
+from django.core.cache import cache
 from django.utils import timezone
 from django.db.models import Q, Count, Avg, Sum
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import logging
+from apps.tasks.compliance import get_compliance_status, get_framework_compliance
 from .fake_data_generator import enhance_data_with_fake_content
 
 logger = logging.getLogger(__name__)
 
+# Aggregated report datasets are reused across formats and templates until
+# the company data changes (the key carries the data version)
+REPORT_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+SNAPSHOT_COLLECTORS = {
+    'comprehensive': 'collect_comprehensive_data',
+    'dst_compliance': 'collect_dst_compliance_data',
+    'green_key': 'collect_green_key_data',
+}
+
+# Framework names as produced by the task framework tags (apps.tasks.classifier)
+DST_FRAMEWORK = 'Dubai Sustainable Tourism'
+GREEN_KEY_FRAMEWORK = 'Green Key Global'
+
+# ExtractedFileData metrics folded into report data
+EXTRACTED_METRIC_FIELDS = [
+    'energy_consumption_kwh', 'water_usage_liters', 'waste_generated_kg',
+    'carbon_emissions_tco2', 'renewable_energy_percentage', 'total_employees',
+    'training_hours', 'safety_incidents', 'employee_satisfaction_score',
+    'board_meetings', 'compliance_score',
+]
+
 
 class ESGDataAggregator:
     """
@@ -21,6 +45,8 @@ class ESGDataAggregator:
         self.company = company
         self.period_start = period_start or (timezone.now() - timedelta(days=365)).date()
         self.period_end = period_end or timezone.now().date()
+        # Combined environmental data is read by several sections; compute once
+        self._environmental_data = None
     
     def collect_comprehensive_data(self) -> Dict[str, Any]:
         """Collect all data needed for comprehensive ESG reports"""
@@ -258,6 +284,11 @@ class ESGDataAggregator:
     
     def _get_environmental_data(self) -> Dict[str, Any]:
         """Aggregate environmental metrics from combined data sources (task entries + files)"""
+        if self._environmental_data is None:
+            self._environmental_data = self._build_environmental_data()
+        return self._environmental_data
+    
+    def _build_environmental_data(self) -> Dict[str, Any]:
         # Get combined data using same logic as dashboard
         combined_data = self._get_combined_environmental_data()
         
@@ -382,40 +413,17 @@ class ESGDataAggregator:
         }
     
     def _get_compliance_status(self) -> List[Dict[str, Any]]:
-        """Get compliance status for various frameworks"""
+        """Get compliance status for the frameworks the company's tasks are tagged with"""
         return [
             {
-                'framework': 'Dubai Sustainable Tourism',
-                'compliance_percentage': 87.0,
-                'status': 'compliant',
-                'last_assessment': timezone.now() - timedelta(days=30),
-                'next_review': timezone.now() + timedelta(days=90),
-                'missing_requirements': ['Water consumption tracking', 'Waste diversion metrics']
-            },
-            {
-                'framework': 'Green Key Certification',
-                'compliance_percentage': 73.0,
-                'status': 'in_progress',
-                'last_assessment': timezone.now() - timedelta(days=15),
-                'next_review': timezone.now() + timedelta(days=60),
-                'missing_requirements': [
-                    'Environmental policy documentation',
-                    'Staff training records',
-                    'Energy efficiency measures'
-                ]
-            },
-            {
-                'framework': 'UAE Federal Climate Law',
-                'compliance_percentage': 68.0,
-                'status': 'partial',
-                'last_assessment': timezone.now() - timedelta(days=45),
-                'next_review': timezone.now() + timedelta(days=30),
-                'missing_requirements': [
-                    'Carbon footprint assessment',
-                    'Emission reduction plan',
-                    'Renewable energy adoption'
-                ]
+                'framework': framework['framework'],
+                'compliance_percentage': framework['compliance_percentage'],
+                'status': framework['status'],
+                'last_assessment': framework['last_updated'],
+                'next_review': framework['next_review_date'],
+                'missing_requirements': framework['missing_requirements']
             }
+            for framework in get_compliance_status(self.company)['frameworks']
         ]
     
     def _get_task_progress(self) -> Dict[str, Any]:
@@ -522,29 +530,39 @@ class ESGDataAggregator:
         return recommendations
     
     def _calculate_trends(self) -> Dict[str, Any]:
-        """Calculate performance trends over time"""
-        # Mock trend data - in production, calculate from historical records
+        """Calculate performance trends over the report period"""
+        from apps.dashboard.trends import get_trends, summarize_trend, get_trend_drivers
+        
+        months = (self.period_end.year - self.period_start.year) * 12 + self.period_end.month - self.period_start.month + 1
+        trends = get_trends(self.company, granularity='month', periods=min(max(months, 2), 36), end=self.period_end)
+        
         return {
-            'esg_score_trend': {
-                'direction': 'improving',
-                'rate': 2.5,  # points per quarter
-                'consistency': 'stable'
-            },
+            'esg_score_trend': summarize_trend(trends, 'overall'),
             'environmental_trend': {
-                'direction': 'improving',
-                'key_drivers': ['energy_efficiency', 'waste_reduction'],
-                'rate': 3.2
+                **summarize_trend(trends, 'environmental'),
+                'key_drivers': get_trend_drivers(trends, [
+                    'energy_consumption_kwh', 'meter_electricity_kwh', 'water_usage_liters',
+                    'meter_water_m3', 'waste_generated_kg', 'carbon_emissions_tco2',
+                    'renewable_energy_percentage'
+                ]),
             },
             'social_trend': {
-                'direction': 'stable',
-                'key_drivers': ['employee_satisfaction', 'community_engagement'],
-                'rate': 1.1
+                **summarize_trend(trends, 'social'),
+                'key_drivers': get_trend_drivers(trends, [
+                    'training_hours', 'safety_incidents', 'employee_satisfaction_score'
+                ]),
             },
             'governance_trend': {
-                'direction': 'improving',
-                'key_drivers': ['board_diversity', 'transparency'],
-                'rate': 2.8
-            }
+                **summarize_trend(trends, 'governance'),
+                'key_drivers': get_trend_drivers(trends, ['compliance_score', 'board_meetings']),
+            },
+            'monthly_scores': {
+                'months': trends['months'],
+                'environmental': trends['environmental'],
+                'social': trends['social'],
+                'governance': trends['governance'],
+                'overall': trends['overall'],
+            },
         }
     
     def _get_benchmark_data(self) -> Dict[str, Any]:
@@ -669,6 +687,10 @@ class ESGDataAggregator:
     
     def _calculate_dst_compliance_score(self) -> float:
         """Calculate overall DST compliance score"""
+        # Tracked from DST-tagged tasks when the company has them
+        framework = get_framework_compliance(self.company, DST_FRAMEWORK)
+        if framework:
+            return framework['compliance_percentage']
         requirements = self._get_dst_requirements()
         total_score = sum(req['score'] for req in requirements)
         return total_score / len(requirements)
@@ -873,6 +895,10 @@ class ESGDataAggregator:
     
     def _calculate_green_key_progress(self) -> float:
         """Calculate Green Key certification progress"""
+        # Tracked from Green Key-tagged tasks when the company has them
+        framework = get_framework_compliance(self.company, GREEN_KEY_FRAMEWORK)
+        if framework:
+            return framework['compliance_percentage']
         criteria = self._get_green_key_criteria()
         total_score = sum(criterion['score'] for criterion in criteria)
         return total_score / len(criteria)
@@ -926,30 +952,44 @@ class ESGDataAggregator:
             processing_status='completed'
         ).order_by('-extraction_date')
         
-        logger.info(f"📊 Found {extracted_data.count()} extracted file records for {self.company.name}")
+        # One pass over the records: per-metric sum and count of non-empty values
+        totals = {field: 0 for field in EXTRACTED_METRIC_FIELDS}
+        counts = {field: 0 for field in EXTRACTED_METRIC_FIELDS}
+        record_count = 0
+        for values in extracted_data.values_list(*EXTRACTED_METRIC_FIELDS):
+            record_count += 1
+            for field, value in zip(EXTRACTED_METRIC_FIELDS, values):
+                if value:
+                    totals[field] += value
+                    counts[field] += 1
         
-        if not extracted_data.exists():
+        logger.info(f"📊 Found {record_count} extracted file records for {self.company.name}")
+        
+        if not record_count:
             logger.warning(f"⚠️ No extracted data found for {self.company.name}, using basic real data")
             return real_data
         
+        def average(field):
+            return totals[field] / max(1, counts[field])
+        
         # Aggregate all extracted data
-        total_energy = sum(e.energy_consumption_kwh for e in extracted_data if e.energy_consumption_kwh)
-        total_water = sum(e.water_usage_liters for e in extracted_data if e.water_usage_liters)
-        total_waste = sum(e.waste_generated_kg for e in extracted_data if e.waste_generated_kg)
-        total_carbon = sum(e.carbon_emissions_tco2 for e in extracted_data if e.carbon_emissions_tco2)
-        avg_renewable = sum(e.renewable_energy_percentage for e in extracted_data if e.renewable_energy_percentage) / max(1, len([e for e in extracted_data if e.renewable_energy_percentage]))
+        total_energy = totals['energy_consumption_kwh']
+        total_water = totals['water_usage_liters']
+        total_waste = totals['waste_generated_kg']
+        total_carbon = totals['carbon_emissions_tco2']
+        avg_renewable = average('renewable_energy_percentage')
         
-        total_employees = sum(e.total_employees for e in extracted_data if e.total_employees)
-        total_training = sum(e.training_hours for e in extracted_data if e.training_hours)
-        total_incidents = sum(e.safety_incidents for e in extracted_data if e.safety_incidents)
-        avg_satisfaction = sum(e.employee_satisfaction_score for e in extracted_data if e.employee_satisfaction_score) / max(1, len([e for e in extracted_data if e.employee_satisfaction_score]))
+        total_employees = totals['total_employees']
+        total_training = totals['training_hours']
+        total_incidents = totals['safety_incidents']
+        avg_satisfaction = average('employee_satisfaction_score')
         
-        total_meetings = sum(e.board_meetings for e in extracted_data if e.board_meetings)
-        avg_compliance = sum(e.compliance_score for e in extracted_data if e.compliance_score) / max(1, len([e for e in extracted_data if e.compliance_score]))
+        total_meetings = totals['board_meetings']
+        avg_compliance = average('compliance_score')
         
         # Calculate ESG scores using same logic as dashboard for consistency
         from apps.dashboard.enhanced_views import calculate_esg_scores_from_extracted_data
-        dashboard_scores = calculate_esg_scores_from_extracted_data(self.company, extracted_data)
+        dashboard_scores = calculate_esg_scores_from_extracted_data(self.company, list(extracted_data))
         
         env_score = dashboard_scores['environmental']
         social_score = dashboard_scores['social'] 
@@ -1063,7 +1103,31 @@ class ReportContentGenerator:
         summary += f"assessed frameworks. Key compliance areas include:\n\n"
         
         for framework in compliance_data:
-            status_icon = "✅" if framework['status'] == 'compliant' else "⚠️" if framework['status'] == 'in_progress' else "❌"
+            status_icon = "✅" if framework['status'] == 'compliant' else "⚠️" if framework['status'] == 'partial' else "❌"
             summary += f"{status_icon} {framework['framework']}: {framework['compliance_percentage']}%\n"
         
-        return summary
\ No newline at end of file
+        return summary
+
+
+def report_snapshot_key(company, period_start, period_end, kind='comprehensive'):
+    # updated_at covers profile edits (name, sector, ...) that do not bump data_version
+    return (
+        f"report_snapshot_{kind}_{company.id}_{period_start}_{period_end}_"
+        f"{company.data_version}_{company.updated_at.timestamp() if company.updated_at else 0}"
+    )
+
+
+def get_report_snapshot(company, period_start, period_end, kind='comprehensive'):
+    """
+    Aggregated report dataset for a company and period. Computed once per
+    (company, period, data version) and shared by every template and format
+    built from it; callers get their own copy from the cache.
+    """
+    cache_key = report_snapshot_key(company, period_start, period_end, kind)
+    data = cache.get(cache_key)
+    if data is None:
+        aggregator = ESGDataAggregator(company, period_start, period_end)
+        data = getattr(aggregator, SNAPSHOT_COLLECTORS[kind])()
+        cache.set(cache_key, data, REPORT_SNAPSHOT_TIMEOUT)
+        logger.info(f"📦 Built {kind} report snapshot for {company.name} ({period_start} to {period_end})")
+    return data
@@ -0,0 +1,158 @@
+"""
+Report theme
+
+Brand colours, paragraph styles and table styles for generated PDFs. They
+are built once per process and shared by every report, so per-report setup
+is a dictionary lookup. The style sheet is a read-only mapping: builders
+look styles up by name and never modify them (derive a new ParagraphStyle
+with ``parent=`` when a variation is needed). Text uses the built-in
+Helvetica family, so no fonts need registering.
+"""
+
+from functools import lru_cache
+from types import MappingProxyType
+from reportlab.lib import colors
+from reportlab.lib.colors import HexColor
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import TableStyle
+
+# Brand palette
+BRAND_GREEN = HexColor('#2EC57D')
+BRAND_BLUE = HexColor('#3DAEFF')
+SUCCESS = HexColor('#4CAF50')
+WARNING = HexColor('#FFA500')
+DANGER = HexColor('#FF4444')
+TABLE_STRIPE = HexColor('#F8F9FA')
+TABLE_GRID = HexColor('#E0E0E0')
+
+# Title styles: (colour, font size, space after)
+TITLE_STYLES = {
+    'CustomTitle': (BRAND_GREEN, 28, 40),
+    'DSTTitle': (BRAND_BLUE, 26, 30),
+    'GreenKeyTitle': (SUCCESS, 26, 30),
+    'QuarterlyTitle': (BRAND_GREEN, 24, 25),
+    'BenchmarkTitle': (BRAND_BLUE, 26, 30),
+}
+
+# Section heading styles: (parent, colour, space before, space after)
+HEADING_STYLES = {
+    'ExecHeading': ('Heading1', BRAND_GREEN, 20, 15),
+    'PerfHeading': ('Heading2', BRAND_GREEN, 15, 10),
+    'ComplianceHeading': ('Heading2', BRAND_BLUE, 15, 10),
+    'GreenHeading': ('Heading2', SUCCESS, 15, 10),
+    'QuarterlyHeading': ('Heading2', BRAND_GREEN, 15, 10),
+    'BenchmarkHeading': ('Heading2', BRAND_BLUE, 15, 10),
+}
+
+BULLET_STYLES = ['BulletStyle', 'GreenBulletStyle', 'QuarterlyBulletStyle', 'BenchmarkBulletStyle']
+
+
+def priority_color(priority, low=WARNING):
+    """Colour for a high/medium/low priority label"""
+    if priority == 'high':
+        return DANGER
+    return WARNING if priority == 'medium' else low
+
+
+def threshold_color(value, good, fair):
+    """Green at or above ``good``, amber at or above ``fair``, red below"""
+    return SUCCESS if value >= good else WARNING if value >= fair else DANGER
+
+
+@lru_cache(maxsize=None)
+def report_styles():
+    """ReportLab sample styles plus the brand styles, keyed by name"""
+    base = getSampleStyleSheet()
+    styles = {name: base[name] for name in base.byName}
+
+    for name, (color, font_size, space_after) in TITLE_STYLES.items():
+        styles[name] = ParagraphStyle(
+            name,
+            parent=base['Title'],
+            fontSize=font_size,
+            textColor=color,
+            alignment=TA_CENTER,
+            spaceAfter=space_after,
+            fontName='Helvetica-Bold'
+        )
+
+    styles['CustomSubtitle'] = ParagraphStyle(
+        'CustomSubtitle',
+        parent=base['Normal'],
+        fontSize=16,
+        textColor=BRAND_BLUE,
+        alignment=TA_CENTER,
+        spaceAfter=30,
+        fontName='Helvetica-Bold'
+    )
+
+    for name, (parent, color, space_before, space_after) in HEADING_STYLES.items():
+        styles[name] = ParagraphStyle(
+            name,
+            parent=base[parent],
+            textColor=color,
+            spaceBefore=space_before,
+            spaceAfter=space_after
+        )
+
+    for name in BULLET_STYLES:
+        styles[name] = ParagraphStyle(
+            name,
+            parent=base['Normal'],
+            leftIndent=20,
+            bulletIndent=10,
+            spaceAfter=8
+        )
+
+    styles['RecStyle'] = ParagraphStyle(
+        'RecStyle',
+        parent=base['Normal'],
+        leftIndent=15,
+        spaceAfter=12,
+        bulletIndent=10
+    )
+    styles['ActionStyle'] = ParagraphStyle(
+        'ActionStyle',
+        parent=base['Normal'],
+        leftIndent=15,
+        spaceAfter=10
+    )
+
+    return MappingProxyType(styles)
+
+
+@lru_cache(maxsize=None)
+def data_table_style(header_color, header_font_size=11, body_font_size=10, left_columns=None, header_padding=None):
+    """Branded table style: coloured header row, alternating body rows, light grid"""
+    commands = [
+        ('BACKGROUND', (0, 0), (-1, 0), header_color),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ]
+    if left_columns is not None:
+        commands.append(('ALIGN', (0, 1), (left_columns, -1), 'LEFT'))
+    commands += [
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), header_font_size),
+        ('FONTSIZE', (0, 1), (-1, -1), body_font_size),
+    ]
+    if header_padding:
+        commands += [
+            ('TOPPADDING', (0, 0), (-1, 0), header_padding),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), header_padding),
+            ('TOPPADDING', (0, 1), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+        ]
+    else:
+        commands += [
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]
+    commands += [
+        ('BACKGROUND', (0, 1), (-1, -1), TABLE_STRIPE),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, TABLE_STRIPE]),
+        ('GRID', (0, 0), (-1, -1), 1, TABLE_GRID)
+    ]
+    return TableStyle(commands)
@@ -21,6 +21,9 @@ urlpatterns = [
     path('history/', views.report_history, name='report_history'),
     path('delete/<uuid:report_id>/', views.delete_report, name='delete_report'),
     
+    # Bulk data export (CSV / Parquet)
+    path('export/', views.export_data, name='export_data'),
+    
     # Compliance tracking
     path('compliance-status/', views.compliance_status, name='compliance_status'),
     
@@ -2,37 +2,127 @@
 Enhanced Report generation utilities with professional styling
 """
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak, KeepTogether
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Image, PageBreak, KeepTogether
+from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_JUSTIFY
 from reportlab.graphics.shapes import Drawing, Rect, Line
 from reportlab.graphics.charts.piecharts import Pie
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.charts.linecharts import HorizontalLineChart
 from reportlab.graphics import renderPDF
-from reportlab.lib.colors import HexColor
 
 import openpyxl
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.chart import BarChart, PieChart, LineChart, Reference
+from openpyxl.cell import WriteOnlyCell
 
 from django.conf import settings
+from django.core.files import File
 from django.utils import timezone
 from datetime import datetime
+import hashlib
 import os
 import tempfile
 import logging
 
-from .services import ESGDataAggregator, ReportContentGenerator
+from .exports import EXPORT_DATASETS
+from .sections import ReportSection, build_story
+from .services import ReportContentGenerator, get_report_snapshot
+from .theme import (
+    BRAND_BLUE, BRAND_GREEN, SUCCESS, WARNING, data_table_style, priority_color, report_styles, threshold_color
+)
 
 logger = logging.getLogger(__name__)
 
 
-def generate_report_pdf(report):
+# Rendered files stay in memory up to this size, then spill to one temp file
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+
+# Rows per worksheet, header included
+EXCEL_MAX_ROWS = 1048576
+EXCEL_HEADER_FONT = Font(bold=True)
+
+
+def _report_progress(progress, percentage, stage):
+    if progress:
+        progress(percentage, stage)
+
+
+class _HashingReader:
+    """Read-through wrapper that hashes the bytes storage copies out of a buffer"""
+    
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.digest = hashlib.sha256()
+    
+    def read(self, size=-1):
+        chunk = self.buffer.read(size)
+        self.digest.update(chunk)
+        return chunk
+    
+    def seek(self, offset, whence=os.SEEK_SET):
+        if offset == 0 and whence == os.SEEK_SET:
+            # Storage backends rewind before copying; start the hash over
+            self.digest = hashlib.sha256()
+        return self.buffer.seek(offset, whence)
+    
+    def tell(self):
+        return self.buffer.tell()
+
+
+def _store_report_file(report, buffer, extension, page_count=None):
+    """
+    Hand a rendered buffer to storage and record size, hash and page count
+    from the same copy
+    """
+    with buffer:
+        size = buffer.seek(0, os.SEEK_END)
+        buffer.seek(0)
+        reader = _HashingReader(buffer)
+        report.file.save(f"{report.name}.{extension}", File(reader), save=False)
+    
+    report.file_size = size
+    report.file_hash = reader.digest.hexdigest()
+    report.page_count = page_count
+    report.save(update_fields=['file', 'file_size', 'file_hash', 'page_count', 'updated_at'])
+
+
+def _write_pdf(report, story, progress=None):
+    """Lay out the story into a spooled buffer and store it on the report"""
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=18
+    )
+    
+    # Build PDF; layout progress maps onto 40-90%
+    _report_progress(progress, 40, 'rendering')
+    if progress:
+        layout = {'total': len(story) or 1}
+
+        def on_layout(kind, value):
+            if kind == 'SIZE_EST':
+                layout['total'] = value or 1
+            elif kind == 'PROGRESS':
+                progress(40 + 50 * min(1.0, value / layout['total']), 'rendering')
+
+        doc.setProgressCallBack(on_layout)
+    doc.build(story)
+    
+    # Save to report model
+    _report_progress(progress, 90, 'saving')
+    _store_report_file(report, buffer, 'pdf', page_count=doc.page)
+
+
+def generate_report_pdf(report, progress=None):
     """
-    Generate PDF report using ReportLab or serve pre-made template files
+    Generate PDF report using ReportLab or serve pre-made template files.
+    ``progress(percentage, stage)`` is called as the report moves through
+    content building, page layout and saving.
     """
     try:
         # DEBUG: Log which template type is being generated
@@ -66,22 +156,10 @@ def generate_report_pdf(report):
         # Fallback to dynamic generation if no template file exists
         logger.info(f"⚙️ Generating dynamic content for {report.template.report_type}")
         
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            temp_file.name,
-            pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
-        
         # Build content
         story = []
-        styles = getSampleStyleSheet()
+        styles = report_styles()
+        _report_progress(progress, 10, 'building_content')
         
         # Add content based on report template
         if report.template.report_type == 'esg_comprehensive':
@@ -104,19 +182,7 @@ def generate_report_pdf(report):
         else:
             story.extend(_build_default_content(report, styles))
         
-        # Build PDF
-        doc.build(story)
-        
-        # Save to report model
-        with open(temp_file.name, 'rb') as f:
-            report.file.save(
-                f"{report.name}.pdf",
-                f,
-                save=True
-            )
-        
-        # Clean up temp file
-        os.unlink(temp_file.name)
+        _write_pdf(report, story, progress)
         
         logger.info(f"📄 Dynamic report generated successfully for {report.template.report_type}")
         return report.file.path
@@ -126,41 +192,35 @@ def generate_report_pdf(report):
         raise
 
 
-def generate_report_excel(report):
+def generate_report_excel(report, progress=None):
     """
-    Generate Excel report using openpyxl
+    Generate Excel report using openpyxl in write-only mode: rows are
+    streamed to disk as they are appended, so memory stays flat however
+    many readings the period holds
     """
     try:
-        # Create workbook
-        wb = openpyxl.Workbook()
+        _report_progress(progress, 10, 'building_content')
         
-        # Remove default sheet
-        wb.remove(wb.active)
+        # Write-only workbooks start without a sheet
+        wb = openpyxl.Workbook(write_only=True)
         
         # Add content based on report template
         if report.template.report_type == 'esg_comprehensive':
-            _build_esg_excel_sheets(wb, report)
+            _build_esg_excel_sheets(wb, report, progress)
         elif report.template.report_type == 'dst_compliance':
-            _build_dst_excel_sheets(wb, report)
+            _build_dst_excel_sheets(wb, report, progress)
         elif report.template.report_type == 'custom_export':
-            _build_custom_excel_sheets(wb, report)
+            _build_custom_excel_sheets(wb, report, progress)
         else:
-            _build_default_excel_sheets(wb, report)
-        
-        # Save to temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-        wb.save(temp_file.name)
+            _build_default_excel_sheets(wb, report, progress)
         
-        # Save to report model
-        with open(temp_file.name, 'rb') as f:
-            report.file.save(
-                f"{report.name}.xlsx",
-                f,
-                save=True
-            )
+        # Serialize straight into the upload buffer
+        _report_progress(progress, 60, 'rendering')
+        buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        wb.save(buffer)
         
-        # Clean up
-        os.unlink(temp_file.name)
+        _report_progress(progress, 90, 'saving')
+        _store_report_file(report, buffer, 'xlsx')
         
         return report.file.path
         
@@ -169,498 +229,424 @@ def generate_report_excel(report):
         raise
 
 
-def _build_esg_comprehensive_content(report, styles):
-    """Build ESG comprehensive report content with integrated data"""
-    story = []
-    company = report.company
-    
-    # Initialize data aggregator with unique seed per report
-    aggregator = ESGDataAggregator(company, report.period_start, report.period_end)
-    
-    # Pass report ID to ensure completely unique data per report
-    aggregator.report_id = str(report.id)
-    
-    # DEBUG: Log unique data generation details
-    logger.info(f"🎲 Generating ESG data for report: {report.id}")
-    logger.info(f"🎲 Company: {company.name}")
-    logger.info(f"🎲 Period: {report.period_start} to {report.period_end}")
-    
-    data = aggregator.collect_comprehensive_data()
-    content_generator = ReportContentGenerator(data)
-    
-    # DEBUG: Log key data variations for debugging
-    logger.info(f"🔍 Report {report.id} Debug Data:")
-    logger.info(f"  📊 ESG Score: {data['esg_scores']['overall_score']}")
-    logger.info(f"  🏭 Company Size: {data.get('environmental_data', {}).get('company_size_category', 'unknown')}")
-    logger.info(f"  👥 Employee Count: {data.get('social_data', {}).get('employee_metrics', {}).get('total_employees', 'unknown')}")
-    logger.info(f"  ⚡ Energy kWh: {data.get('environmental_data', {}).get('energy_consumption', {}).get('total_kwh', 'unknown')}")
-    logger.info(f"  🌱 Performance Level: {data.get('esg_scores', {}).get('performance_level', 'unknown')}")
-    
-    # Enhanced title page with brand colors
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Title'],
-        fontSize=28,
-        textColor=HexColor('#2EC57D'),
-        alignment=TA_CENTER,
-        spaceAfter=40,
-        fontName='Helvetica-Bold'
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Normal'],
-        fontSize=16,
-        textColor=HexColor('#3DAEFF'),
-        alignment=TA_CENTER,
-        spaceAfter=30,
-        fontName='Helvetica-Bold'
-    )
-    
-    story.append(Paragraph("ESG Comprehensive Report", title_style))
-    story.append(Paragraph(f"{company.name}", subtitle_style))
-    story.append(Paragraph(
-        f"Report Period: {report.period_start.strftime('%B %d, %Y')} - {report.period_end.strftime('%B %d, %Y')}",
-        styles['Normal']
-    ))
-    story.append(Spacer(1, 30))
-    
+def _data_table(rows, col_widths, header_color, **style_options):
+    table = Table(rows, colWidths=col_widths)
+    table.setStyle(data_table_style(header_color, **style_options))
+    return table
+
+
+def _branded_title(report_title, company_name, styles, title_style):
+    return [
+        Paragraph(report_title, styles[title_style]),
+        Paragraph(company_name, styles['Heading1']),
+    ]
+
+
+# ESG comprehensive sections
+
+def _esg_title_inputs(report, data):
+    return {
+        'company': report.company.name,
+        'period_start': report.period_start,
+        'period_end': report.period_end,
+    }
+
+
+def _esg_title_section(inputs, styles):
+    return [
+        Paragraph("ESG Comprehensive Report", styles['CustomTitle']),
+        Paragraph(f"{inputs['company']}", styles['CustomSubtitle']),
+        Paragraph(
+            f"Report Period: {inputs['period_start'].strftime('%B %d, %Y')} - {inputs['period_end'].strftime('%B %d, %Y')}",
+            styles['Normal']
+        ),
+        Spacer(1, 30),
+    ]
+
+
+def _esg_summary_inputs(report, data):
+    return {'summary': ReportContentGenerator(data).generate_executive_summary()}
+
+
+def _esg_summary_section(inputs, styles):
     # Executive Summary with AI-generated content
-    exec_heading_style = ParagraphStyle(
-        'ExecHeading',
-        parent=styles['Heading1'],
-        textColor=HexColor('#2EC57D'),
-        spaceBefore=20,
-        spaceAfter=15
-    )
-    
-    story.append(Paragraph("Executive Summary", exec_heading_style))
-    story.append(Paragraph(
-        content_generator.generate_executive_summary(),
-        styles['Normal']
-    ))
-    story.append(Spacer(1, 25))
-    
+    return [
+        Paragraph("Executive Summary", styles['ExecHeading']),
+        Paragraph(inputs['summary'], styles['Normal']),
+        Spacer(1, 25),
+    ]
+
+
+def _esg_performance_inputs(report, data):
+    return {
+        'esg_scores': data['esg_scores'],
+        'benchmarks': data['benchmarks']['comparisons'],
+    }
+
+
+def _esg_performance_section(inputs, styles):
     # ESG Performance Overview with real data
-    performance_heading_style = ParagraphStyle(
-        'PerfHeading',
-        parent=styles['Heading2'],
-        textColor=HexColor('#2EC57D'),
-        spaceBefore=15,
-        spaceAfter=10
-    )
-    
-    story.append(Paragraph("ESG Performance Overview", performance_heading_style))
-    
-    esg_scores = data['esg_scores']
-    benchmarks = data['benchmarks']['comparisons']
-    
-    score_data = [
-        ['Category', 'Score', 'Industry Average', 'Top Quartile', 'Performance'],
-        [
-            'Environmental', 
-            f"{esg_scores['environmental_score']:.0f}%", 
-            f"{benchmarks['environmental']['industry_average']:.0f}%",
-            f"{benchmarks['environmental']['top_quartile']:.0f}%",
-            benchmarks['environmental']['performance'].replace('_', ' ').title()
-        ],
-        [
-            'Social', 
-            f"{esg_scores['social_score']:.0f}%", 
-            f"{benchmarks['social']['industry_average']:.0f}%",
-            f"{benchmarks['social']['top_quartile']:.0f}%",
-            benchmarks['social']['performance'].replace('_', ' ').title()
-        ],
-        [
-            'Governance', 
-            f"{esg_scores['governance_score']:.0f}%", 
-            f"{benchmarks['governance']['industry_average']:.0f}%",
-            f"{benchmarks['governance']['top_quartile']:.0f}%",
-            benchmarks['governance']['performance'].replace('_', ' ').title()
-        ],
-        [
-            'Overall ESG', 
-            f"{esg_scores['overall_score']:.0f}%", 
-            f"{benchmarks['overall_esg']['industry_average']:.0f}%",
-            f"{benchmarks['overall_esg']['top_quartile']:.0f}%",
-            benchmarks['overall_esg']['performance'].replace('_', ' ').title()
-        ]
+    esg_scores = inputs['esg_scores']
+    benchmarks = inputs['benchmarks']
+
+    score_data = [['Category', 'Score', 'Industry Average', 'Top Quartile', 'Performance']]
+    for label, score_key, benchmark_key in [
+        ('Environmental', 'environmental_score', 'environmental'),
+        ('Social', 'social_score', 'social'),
+        ('Governance', 'governance_score', 'governance'),
+        ('Overall ESG', 'overall_score', 'overall_esg'),
+    ]:
+        benchmark = benchmarks[benchmark_key]
+        score_data.append([
+            label,
+            f"{esg_scores[score_key]:.0f}%",
+            f"{benchmark['industry_average']:.0f}%",
+            f"{benchmark['top_quartile']:.0f}%",
+            benchmark['performance'].replace('_', ' ').title()
+        ])
+
+    return [
+        Paragraph("ESG Performance Overview", styles['PerfHeading']),
+        _data_table(score_data, [1.8*inch, 0.8*inch, 1.2*inch, 1*inch, 1.2*inch], BRAND_GREEN, header_padding=8),
+        Spacer(1, 25),
     ]
-    
-    score_table = Table(score_data, colWidths=[1.8*inch, 0.8*inch, 1.2*inch, 1*inch, 1.2*inch])
-    score_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#2EC57D')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ('BACKGROUND', (0, 1), (-1, -1), HexColor('#F8F9FA')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, HexColor('#F8F9FA')]),
-        ('GRID', (0, 0), (-1, -1), 1, HexColor('#E0E0E0'))
-    ]))
-    
-    story.append(score_table)
-    story.append(Spacer(1, 25))
-    
-    # Key Achievements with real data
-    story.append(Paragraph("Key Achievements", performance_heading_style))
-    
-    achievements = data['key_achievements']
-    bullet_style = ParagraphStyle(
-        'BulletStyle',
-        parent=styles['Normal'],
-        leftIndent=20,
-        bulletIndent=10,
-        spaceAfter=8
-    )
-    
-    for achievement in achievements[:6]:  # Show top 6 achievements
+
+
+def _esg_achievements_inputs(report, data):
+    return {'achievements': data['key_achievements'][:6]}  # Show top 6 achievements
+
+
+def _esg_achievements_section(inputs, styles):
+    bullet_style = styles['BulletStyle']
+    story = [Paragraph("Key Achievements", styles['PerfHeading'])]
+    for achievement in inputs['achievements']:
         story.append(Paragraph(f"• {achievement}", bullet_style))
-    
     story.append(Spacer(1, 25))
-    
+    return story
+
+
+def _esg_recommendations_inputs(report, data):
+    return {'recommendations': data['recommendations'][:4]}  # Show top 4 recommendations
+
+
+def _esg_recommendations_section(inputs, styles):
     # Priority Recommendations with AI-generated content
-    story.append(Paragraph("Priority Recommendations", performance_heading_style))
-    
-    recommendations = data['recommendations']
-    
-    for i, rec in enumerate(recommendations[:4], 1):  # Show top 4 recommendations
+    story = [Paragraph("Priority Recommendations", styles['PerfHeading'])]
+
+    for i, rec in enumerate(inputs['recommendations'], 1):
         # Priority indicator
-        priority_color = HexColor('#FF4444') if rec['priority'] == 'high' else HexColor('#FFA500') if rec['priority'] == 'medium' else HexColor('#4CAF50')
-        
-        rec_style = ParagraphStyle(
-            f'RecStyle{i}',
-            parent=styles['Normal'],
-            leftIndent=15,
-            spaceAfter=12,
-            bulletIndent=10
-        )
-        
-        priority_text = f"<font color='{priority_color.hexval()}'>[{rec['priority'].upper()}]</font>"
+        color = priority_color(rec['priority'], low=SUCCESS)
+        priority_text = f"<font color='{color.hexval()}'>[{rec['priority'].upper()}]</font>"
         story.append(Paragraph(
             f"{i}. {priority_text} <b>{rec['title']}</b><br/>"
             f"   {rec['description']}<br/>"
             f"   <i>Expected Impact:</i> {rec['impact']} | <i>Timeline:</i> {rec['timeline']}",
-            rec_style
+            styles['RecStyle']
         ))
-    
+
     story.append(Spacer(1, 25))
-    
-    # Data Quality Assessment
-    story.append(Paragraph("Data Quality & Completeness", performance_heading_style))
-    
-    quality_data = data['data_quality']
+    return story
+
+
+def _esg_quality_inputs(report, data):
+    return {'quality': data['data_quality']}
+
+
+def _esg_quality_section(inputs, styles):
+    quality_data = inputs['quality']
     quality_text = f"""
     Overall data completeness: <b>{quality_data['overall_completeness']:.0f}%</b><br/>
-    Environmental data: {quality_data['environmental_completeness']:.0f}% | 
-    Social data: {quality_data['social_completeness']:.0f}% | 
+    Environmental data: {quality_data['environmental_completeness']:.0f}% |
+    Social data: {quality_data['social_completeness']:.0f}% |
     Governance data: {quality_data['governance_completeness']:.0f}%<br/>
     Evidence documentation: {quality_data['evidence_completeness']:.0f}%<br/>
     Data quality score: <b>{quality_data['quality_score']:.0f}%</b>
     """
-    
-    story.append(Paragraph(quality_text, styles['Normal']))
-    story.append(Spacer(1, 15))
-    
-    # Compliance Summary
-    story.append(Paragraph("Compliance Status", performance_heading_style))
-    story.append(Paragraph(
-        content_generator.generate_compliance_summary(),
-        styles['Normal']
-    ))
-    
-    return story
 
+    return [
+        Paragraph("Data Quality & Completeness", styles['PerfHeading']),
+        Paragraph(quality_text, styles['Normal']),
+        Spacer(1, 15),
+    ]
 
-def _build_dst_compliance_content(report, styles):
-    """Build Dubai Sustainable Tourism compliance report content with real data"""
-    story = []
+
+def _esg_compliance_inputs(report, data):
+    return {'summary': ReportContentGenerator(data).generate_compliance_summary()}
+
+
+def _esg_compliance_section(inputs, styles):
+    return [
+        Paragraph("Compliance Status", styles['PerfHeading']),
+        Paragraph(inputs['summary'], styles['Normal']),
+    ]
+
+
+ESG_COMPREHENSIVE_SECTIONS = [
+    ReportSection('title', _esg_title_inputs, _esg_title_section),
+    ReportSection('executive_summary', _esg_summary_inputs, _esg_summary_section),
+    ReportSection('performance_overview', _esg_performance_inputs, _esg_performance_section),
+    ReportSection('key_achievements', _esg_achievements_inputs, _esg_achievements_section),
+    ReportSection('recommendations', _esg_recommendations_inputs, _esg_recommendations_section),
+    ReportSection('data_quality', _esg_quality_inputs, _esg_quality_section),
+    ReportSection('compliance', _esg_compliance_inputs, _esg_compliance_section),
+]
+
+
+def _build_esg_comprehensive_content(report, styles):
+    """Build ESG comprehensive report content with integrated data"""
     company = report.company
-    
-    # Initialize DST data aggregator
-    aggregator = ESGDataAggregator(company, report.period_start, report.period_end)
-    data = aggregator.collect_dst_compliance_data()
-    
+
+    # DEBUG: Log data generation details
+    logger.info(f"🎲 Generating ESG data for report: {report.id}")
+    logger.info(f"🎲 Company: {company.name}")
+    logger.info(f"🎲 Period: {report.period_start} to {report.period_end}")
+
+    # Aggregated dataset shared with other formats/templates of this period
+    data = get_report_snapshot(company, report.period_start, report.period_end)
+
+    # DEBUG: Log key data variations for debugging
+    logger.info(f"🔍 Report {report.id} Debug Data:")
+    logger.info(f"  📊 ESG Score: {data['esg_scores']['overall_score']}")
+    logger.info(f"  🏭 Company Size: {data.get('environmental_data', {}).get('company_size_category', 'unknown')}")
+    logger.info(f"  👥 Employee Count: {data.get('social_data', {}).get('employee_metrics', {}).get('total_employees', 'unknown')}")
+    logger.info(f"  ⚡ Energy kWh: {data.get('environmental_data', {}).get('energy_consumption', {}).get('total_kwh', 'unknown')}")
+    logger.info(f"  🌱 Performance Level: {data.get('esg_scores', {}).get('performance_level', 'unknown')}")
+
+    return build_story('esg_comprehensive', ESG_COMPREHENSIVE_SECTIONS, report, data, styles)
+
+
+# DST compliance sections
+
+def _company_title_inputs(report, data):
+    return {'company': report.company.name}
+
+
+def _dst_title_section(inputs, styles):
     # Enhanced title with DST branding
-    title_style = ParagraphStyle(
-        'DSTTitle',
-        parent=styles['Title'],
-        fontSize=26,
-        textColor=HexColor('#3DAEFF'),
-        alignment=TA_CENTER,
-        spaceAfter=30,
-        fontName='Helvetica-Bold'
-    )
-    
-    story.append(Paragraph("Dubai Sustainable Tourism Compliance Report", title_style))
-    story.append(Paragraph(f"{company.name}", styles['Heading1']))
+    story = _branded_title("Dubai Sustainable Tourism Compliance Report", f"{inputs['company']}", styles, 'DSTTitle')
     story.append(Spacer(1, 30))
-    
-    # Compliance Status with real data
-    compliance_heading_style = ParagraphStyle(
-        'ComplianceHeading',
-        parent=styles['Heading2'],
-        textColor=HexColor('#3DAEFF'),
-        spaceBefore=15,
-        spaceAfter=10
-    )
-    
-    story.append(Paragraph("Compliance Status", compliance_heading_style))
-    
-    compliance_score = data['compliance_score']
-    readiness = data['certification_readiness']
-    
-    status_color = HexColor('#4CAF50') if compliance_score >= 85 else HexColor('#FFA500') if compliance_score >= 70 else HexColor('#FF4444')
+    return story
+
+
+def _dst_status_inputs(report, data):
+    return {
+        'compliance_score': data['compliance_score'],
+        'readiness': data['certification_readiness'],
+    }
+
+
+def _dst_status_section(inputs, styles):
+    compliance_score = inputs['compliance_score']
+    readiness = inputs['readiness']
+
+    status_color = threshold_color(compliance_score, 85, 70)
     status_text = 'Compliant' if compliance_score >= 85 else 'Near Compliant' if compliance_score >= 70 else 'Non-Compliant'
-    
-    story.append(Paragraph(
-        f"Current compliance level: <font color='{status_color.hexval()}'><b>{compliance_score:.1f}%</b></font><br/>"
-        f"Status: <font color='{status_color.hexval()}'><b>{status_text}</b></font><br/>"
-        f"Certification readiness: <b>{readiness['overall_readiness'].replace('_', ' ').title()}</b><br/>"
-        f"Estimated certification date: {readiness['estimated_certification_date']}",
-        styles['Normal']
-    ))
-    story.append(Spacer(1, 25))
-    
-    # Requirements checklist with real data
-    story.append(Paragraph("DST Requirements Checklist", compliance_heading_style))
-    
-    requirements = data['dst_requirements']
+
+    return [
+        Paragraph("Compliance Status", styles['ComplianceHeading']),
+        Paragraph(
+            f"Current compliance level: <font color='{status_color.hexval()}'><b>{compliance_score:.1f}%</b></font><br/>"
+            f"Status: <font color='{status_color.hexval()}'><b>{status_text}</b></font><br/>"
+            f"Certification readiness: <b>{readiness['overall_readiness'].replace('_', ' ').title()}</b><br/>"
+            f"Estimated certification date: {readiness['estimated_certification_date']}",
+            styles['Normal']
+        ),
+        Spacer(1, 25),
+    ]
+
+
+def _dst_requirements_inputs(report, data):
+    return {'requirements': data['dst_requirements']}
+
+
+def _dst_requirements_section(inputs, styles):
     requirements_data = [['Requirement', 'Status', 'Score', 'Evidence']]
-    
-    for req in requirements:
-        status_color = '#4CAF50' if req['status'] == 'complete' else '#FFA500' if req['status'] == 'in_progress' else '#FF4444'
-        evidence_status = '✅' if req['evidence_uploaded'] else '❌'
-        
+    for req in inputs['requirements']:
         requirements_data.append([
             req['requirement'],
             req['status'].replace('_', ' ').title(),
             f"{req['score']:.0f}%",
-            evidence_status
+            '✅' if req['evidence_uploaded'] else '❌'
         ])
-    
-    req_table = Table(requirements_data, colWidths=[2.5*inch, 1.2*inch, 0.8*inch, 0.5*inch])
-    req_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#3DAEFF')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 1), (-1, -1), HexColor('#F8F9FA')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, HexColor('#F8F9FA')]),
-        ('GRID', (0, 0), (-1, -1), 1, HexColor('#E0E0E0'))
-    ]))
-    
-    story.append(req_table)
-    story.append(Spacer(1, 25))
-    
-    # Gap Analysis
-    story.append(Paragraph("Gap Analysis & Action Plan", compliance_heading_style))
-    
-    gap_analysis = data['gap_analysis']
-    action_plan = data['action_plan']
-    
+
+    return [
+        Paragraph("DST Requirements Checklist", styles['ComplianceHeading']),
+        _data_table(requirements_data, [2.5*inch, 1.2*inch, 0.8*inch, 0.5*inch], BRAND_BLUE, left_columns=0),
+        Spacer(1, 25),
+    ]
+
+
+def _dst_gaps_inputs(report, data):
+    return {
+        'gap_analysis': data['gap_analysis'],
+        'action_plan': data['action_plan'],
+    }
+
+
+def _dst_gaps_section(inputs, styles):
+    gap_analysis = inputs['gap_analysis']
+
     gap_text = f"""
     <b>Identified Gaps:</b> {gap_analysis['total_gaps']} requirements need attention<br/>
     <b>Critical gaps:</b> {len(gap_analysis['critical_gaps'])} high-priority items<br/>
     <b>Missing evidence:</b> {len(gap_analysis['missing_evidence'])} documentation items<br/>
     <b>Estimated completion:</b> {gap_analysis['estimated_completion_time']}
     """
-    
-    story.append(Paragraph(gap_text, styles['Normal']))
-    story.append(Spacer(1, 15))
-    
-    story.append(Paragraph("Priority Actions:", styles['Heading3']))
-    
-    for action in action_plan:
-        priority_color = HexColor('#FF4444') if action['priority'] == 'high' else HexColor('#FFA500')
-        action_style = ParagraphStyle(
-            'ActionStyle',
-            parent=styles['Normal'],
-            leftIndent=15,
-            spaceAfter=10
-        )
-        
+
+    story = [
+        Paragraph("Gap Analysis & Action Plan", styles['ComplianceHeading']),
+        Paragraph(gap_text, styles['Normal']),
+        Spacer(1, 15),
+        Paragraph("Priority Actions:", styles['Heading3']),
+    ]
+
+    for action in inputs['action_plan']:
+        color = priority_color(action['priority'], low=WARNING)
         story.append(Paragraph(
-            f"<font color='{priority_color.hexval()}'>[{action['priority'].upper()}]</font> "
+            f"<font color='{color.hexval()}'>[{action['priority'].upper()}]</font> "
             f"<b>{action['action']}</b><br/>"
             f"Responsible: {action['responsible']} | Timeline: {action['timeline']}<br/>"
             f"Resources: {action['resources_needed']}",
-            action_style
+            styles['ActionStyle']
         ))
-    
+
     return story
 
 
-def _build_green_key_content(report, styles):
-    """Build Green Key certification report content with real data"""
-    story = []
-    company = report.company
-    
-    # Initialize Green Key data aggregator
-    aggregator = ESGDataAggregator(company, report.period_start, report.period_end)
-    data = aggregator.collect_green_key_data()
-    
-    # Green Key branded title
-    title_style = ParagraphStyle(
-        'GreenKeyTitle',
-        parent=styles['Title'],
-        fontSize=26,
-        textColor=HexColor('#4CAF50'),
-        alignment=TA_CENTER,
-        spaceAfter=30,
-        fontName='Helvetica-Bold'
-    )
-    
-    story.append(Paragraph("Green Key Certification Assessment", title_style))
-    story.append(Paragraph(f"{company.name}", styles['Heading1']))
+DST_COMPLIANCE_SECTIONS = [
+    ReportSection('title', _company_title_inputs, _dst_title_section),
+    ReportSection('compliance_status', _dst_status_inputs, _dst_status_section),
+    ReportSection('requirements', _dst_requirements_inputs, _dst_requirements_section),
+    ReportSection('gap_analysis', _dst_gaps_inputs, _dst_gaps_section),
+]
+
+
+def _build_dst_compliance_content(report, styles):
+    """Build Dubai Sustainable Tourism compliance report content with real data"""
+    # DST dataset (cached per period and data version)
+    data = get_report_snapshot(report.company, report.period_start, report.period_end, 'dst_compliance')
+    return build_story('dst_compliance', DST_COMPLIANCE_SECTIONS, report, data, styles)
+
+
+# Green Key sections
+
+def _green_key_title_section(inputs, styles):
+    story = _branded_title("Green Key Certification Assessment", f"{inputs['company']}", styles, 'GreenKeyTitle')
     story.append(Spacer(1, 30))
-    
-    # Certification status with real data
-    green_heading_style = ParagraphStyle(
-        'GreenHeading',
-        parent=styles['Heading2'],
-        textColor=HexColor('#4CAF50'),
-        spaceBefore=15,
-        spaceAfter=10
-    )
-    
-    story.append(Paragraph("Certification Progress", green_heading_style))
-    
-    progress = data['certification_progress']
-    timeline = data['implementation_timeline']
-    
-    progress_color = HexColor('#4CAF50') if progress >= 80 else HexColor('#FFA500') if progress >= 60 else HexColor('#FF4444')
-    
-    story.append(Paragraph(
-        f"Current progress: <font color='{progress_color.hexval()}'><b>{progress:.0f}%</b></font><br/>"
-        f"Status: <b>{'Certification Ready' if progress >= 80 else 'In Progress'}</b><br/>"
-        f"Target completion: {timeline['target_completion']}<br/>"
-        f"Estimated timeline: {timeline['estimated_months']:.0f} months",
-        styles['Normal']
-    ))
-    story.append(Spacer(1, 25))
-    
-    # Criteria Assessment
-    story.append(Paragraph("Green Key Criteria Assessment", green_heading_style))
-    
-    criteria = data['green_key_criteria']
+    return story
+
+
+def _green_key_progress_inputs(report, data):
+    return {
+        'progress': data['certification_progress'],
+        'timeline': data['implementation_timeline'],
+    }
+
+
+def _green_key_progress_section(inputs, styles):
+    progress = inputs['progress']
+    timeline = inputs['timeline']
+
+    progress_color = threshold_color(progress, 80, 60)
+
+    return [
+        Paragraph("Certification Progress", styles['GreenHeading']),
+        Paragraph(
+            f"Current progress: <font color='{progress_color.hexval()}'><b>{progress:.0f}%</b></font><br/>"
+            f"Status: <b>{'Certification Ready' if progress >= 80 else 'In Progress'}</b><br/>"
+            f"Target completion: {timeline['target_completion']}<br/>"
+            f"Estimated timeline: {timeline['estimated_months']:.0f} months",
+            styles['Normal']
+        ),
+        Spacer(1, 25),
+    ]
+
+
+def _green_key_criteria_inputs(report, data):
+    return {'criteria': data['green_key_criteria']}
+
+
+def _green_key_criteria_section(inputs, styles):
     criteria_data = [['Category', 'Criteria', 'Status', 'Score']]
-    
-    for criterion in criteria:
-        status_color = '#4CAF50' if criterion['status'] == 'complete' else '#FFA500'
+    for criterion in inputs['criteria']:
         criteria_data.append([
             criterion['category'],
             criterion['criteria'],
             criterion['status'].replace('_', ' ').title(),
             f"{criterion['score']:.0f}%"
         ])
-    
-    criteria_table = Table(criteria_data, colWidths=[1.5*inch, 2*inch, 1.2*inch, 0.8*inch])
-    criteria_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#4CAF50')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (0, 1), (1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 1), (-1, -1), HexColor('#F8F9FA')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, HexColor('#F8F9FA')]),
-        ('GRID', (0, 0), (-1, -1), 1, HexColor('#E0E0E0'))
-    ]))
-    
-    story.append(criteria_table)
-    story.append(Spacer(1, 25))
-    
-    # Missing Requirements
-    missing_requirements = data['missing_requirements']
-    if missing_requirements:
-        story.append(Paragraph("Outstanding Requirements", green_heading_style))
-        
-        bullet_style = ParagraphStyle(
-            'GreenBulletStyle',
-            parent=styles['Normal'],
-            leftIndent=20,
-            bulletIndent=10,
-            spaceAfter=8
-        )
-        
-        for requirement in missing_requirements:
-            story.append(Paragraph(f"• {requirement}", bullet_style))
-    
+
+    return [
+        Paragraph("Green Key Criteria Assessment", styles['GreenHeading']),
+        _data_table(criteria_data, [1.5*inch, 2*inch, 1.2*inch, 0.8*inch], SUCCESS, left_columns=1),
+        Spacer(1, 25),
+    ]
+
+
+def _green_key_missing_inputs(report, data):
+    return {'missing_requirements': data['missing_requirements']}
+
+
+def _green_key_missing_section(inputs, styles):
+    missing_requirements = inputs['missing_requirements']
+    if not missing_requirements:
+        return []
+
+    bullet_style = styles['GreenBulletStyle']
+    story = [Paragraph("Outstanding Requirements", styles['GreenHeading'])]
+    for requirement in missing_requirements:
+        story.append(Paragraph(f"• {requirement}", bullet_style))
     return story
 
 
-def _build_quarterly_summary_content(report, styles):
-    """Build quarterly summary report content with trend analysis"""
-    story = []
-    company = report.company
-    
-    # Initialize data aggregator with unique seed per report
-    aggregator = ESGDataAggregator(company, report.period_start, report.period_end)
-    
-    # Pass report ID to ensure completely unique data per report
-    aggregator.report_id = str(report.id)
-    
-    # DEBUG: Log unique data generation details
-    logger.info(f"🎲 Generating Quarterly data for report: {report.id}")
-    logger.info(f"🎲 Company: {company.name}")
-    logger.info(f"🎲 Period: {report.period_start} to {report.period_end}")
-    
-    data = aggregator.collect_comprehensive_data()
-    
-    # Quarterly branded title
-    title_style = ParagraphStyle(
-        'QuarterlyTitle',
-        parent=styles['Title'],
-        fontSize=24,
-        textColor=HexColor('#2EC57D'),
-        alignment=TA_CENTER,
-        spaceAfter=25,
-        fontName='Helvetica-Bold'
-    )
-    
-    quarter = f"Q{((report.period_end.month-1)//3)+1} {report.period_end.year}"
-    story.append(Paragraph("Quarterly ESG Summary", title_style))
-    story.append(Paragraph(f"{company.name} - {quarter}", styles['Heading1']))
+GREEN_KEY_SECTIONS = [
+    ReportSection('title', _company_title_inputs, _green_key_title_section),
+    ReportSection('certification_progress', _green_key_progress_inputs, _green_key_progress_section),
+    ReportSection('criteria', _green_key_criteria_inputs, _green_key_criteria_section),
+    ReportSection('missing_requirements', _green_key_missing_inputs, _green_key_missing_section),
+]
+
+
+def _build_green_key_content(report, styles):
+    """Build Green Key certification report content with real data"""
+    # Green Key dataset (cached per period and data version)
+    data = get_report_snapshot(report.company, report.period_start, report.period_end, 'green_key')
+    return build_story('green_key', GREEN_KEY_SECTIONS, report, data, styles)
+
+
+# Quarterly summary sections
+
+def _quarterly_title_inputs(report, data):
+    return {
+        'company': report.company.name,
+        'quarter': f"Q{((report.period_end.month-1)//3)+1} {report.period_end.year}",
+    }
+
+
+def _quarterly_title_section(inputs, styles):
+    story = _branded_title("Quarterly ESG Summary", f"{inputs['company']} - {inputs['quarter']}", styles, 'QuarterlyTitle')
     story.append(Spacer(1, 25))
-    
-    # Performance Summary
-    quarterly_heading_style = ParagraphStyle(
-        'QuarterlyHeading',
-        parent=styles['Heading2'],
-        textColor=HexColor('#2EC57D'),
-        spaceBefore=15,
-        spaceAfter=10
-    )
-    
-    story.append(Paragraph("Quarter Performance Summary", quarterly_heading_style))
-    
-    trends = data['trends']
-    esg_scores = data['esg_scores']
-    
+    return story
+
+
+def _quarterly_performance_inputs(report, data):
+    return {
+        'trends': data['trends'],
+        'esg_scores': data['esg_scores'],
+    }
+
+
+def _quarterly_performance_section(inputs, styles):
+    trends = inputs['trends']
+    esg_scores = inputs['esg_scores']
+
     # Create performance summary with trend indicators
     trend_icons = {
         'improving': '↗️',
-        'stable': '➡️', 
+        'stable': '➡️',
         'declining': '↘️'
     }
-    
+
     summary_text = f"""
     <b>Overall ESG Score:</b> {esg_scores['overall_score']:.0f}% {trend_icons.get(trends['esg_score_trend']['direction'], '')}<br/>
     <b>Environmental:</b> {esg_scores['environmental_score']:.0f}% {trend_icons.get(trends['environmental_trend']['direction'], '')}<br/>
@@ -668,155 +654,165 @@ def _build_quarterly_summary_content(report, styles):
     <b>Governance:</b> {esg_scores['governance_score']:.0f}% {trend_icons.get(trends['governance_trend']['direction'], '')}<br/><br/>
     <b>Data Completion:</b> {esg_scores['data_completion']:.0f}% | <b>Evidence Completion:</b> {esg_scores['evidence_completion']:.0f}%
     """
-    
-    story.append(Paragraph(summary_text, styles['Normal']))
-    story.append(Spacer(1, 20))
-    
-    # Key Achievements (Top 4 for quarterly)
-    story.append(Paragraph("Quarter Highlights", quarterly_heading_style))
-    
-    achievements = data['key_achievements'][:4]
-    bullet_style = ParagraphStyle(
-        'QuarterlyBulletStyle',
-        parent=styles['Normal'],
-        leftIndent=20,
-        bulletIndent=10,
-        spaceAfter=8
-    )
-    
-    for achievement in achievements:
+
+    return [
+        Paragraph("Quarter Performance Summary", styles['QuarterlyHeading']),
+        Paragraph(summary_text, styles['Normal']),
+        Spacer(1, 20),
+    ]
+
+
+def _quarterly_highlights_inputs(report, data):
+    return {'achievements': data['key_achievements'][:4]}  # Top 4 for quarterly
+
+
+def _quarterly_highlights_section(inputs, styles):
+    bullet_style = styles['QuarterlyBulletStyle']
+    story = [Paragraph("Quarter Highlights", styles['QuarterlyHeading'])]
+    for achievement in inputs['achievements']:
         story.append(Paragraph(f"• {achievement}", bullet_style))
-    
     story.append(Spacer(1, 20))
-    
-    # Next Quarter Priorities
-    story.append(Paragraph("Next Quarter Priorities", quarterly_heading_style))
-    
-    recommendations = data['recommendations'][:3]  # Top 3 for next quarter
-    for i, rec in enumerate(recommendations, 1):
-        priority_color = HexColor('#FF4444') if rec['priority'] == 'high' else HexColor('#FFA500')
-        
+    return story
+
+
+def _quarterly_priorities_inputs(report, data):
+    return {'recommendations': data['recommendations'][:3]}  # Top 3 for next quarter
+
+
+def _quarterly_priorities_section(inputs, styles):
+    bullet_style = styles['QuarterlyBulletStyle']
+    story = [Paragraph("Next Quarter Priorities", styles['QuarterlyHeading'])]
+    for i, rec in enumerate(inputs['recommendations'], 1):
+        color = priority_color(rec['priority'], low=WARNING)
         story.append(Paragraph(
-            f"{i}. <font color='{priority_color.hexval()}'>[{rec['priority'].upper()}]</font> "
+            f"{i}. <font color='{color.hexval()}'>[{rec['priority'].upper()}]</font> "
             f"<b>{rec['title']}</b><br/>"
             f"   Timeline: {rec['timeline']} | Impact: {rec['impact']}",
             bullet_style
         ))
-    
     return story
 
 
-def _build_benchmark_analysis_content(report, styles):
-    """Build benchmark analysis report content with focus on industry comparisons"""
-    story = []
+QUARTERLY_SUMMARY_SECTIONS = [
+    ReportSection('title', _quarterly_title_inputs, _quarterly_title_section),
+    ReportSection('performance_summary', _quarterly_performance_inputs, _quarterly_performance_section),
+    ReportSection('highlights', _quarterly_highlights_inputs, _quarterly_highlights_section),
+    ReportSection('priorities', _quarterly_priorities_inputs, _quarterly_priorities_section),
+]
+
+
+def _build_quarterly_summary_content(report, styles):
+    """Build quarterly summary report content with trend analysis"""
     company = report.company
-    
-    # Initialize data aggregator with unique seed per report
-    aggregator = ESGDataAggregator(company, report.period_start, report.period_end)
-    aggregator.report_id = str(report.id)
-    
-    logger.info(f"🎲 Generating Benchmark data for report: {report.id}")
+
+    # DEBUG: Log data generation details
+    logger.info(f"🎲 Generating Quarterly data for report: {report.id}")
     logger.info(f"🎲 Company: {company.name}")
-    
-    data = aggregator.collect_comprehensive_data()
-    
-    # Benchmark branded title
-    title_style = ParagraphStyle(
-        'BenchmarkTitle',
-        parent=styles['Title'],
-        fontSize=26,
-        textColor=HexColor('#3DAEFF'),
-        alignment=TA_CENTER,
-        spaceAfter=30,
-        fontName='Helvetica-Bold'
-    )
-    
-    story.append(Paragraph("ESG Benchmark Analysis", title_style))
-    story.append(Paragraph(f"{company.name}", styles['Heading1']))
+    logger.info(f"🎲 Period: {report.period_start} to {report.period_end}")
+
+    data = get_report_snapshot(company, report.period_start, report.period_end)
+    return build_story('quarterly_summary', QUARTERLY_SUMMARY_SECTIONS, report, data, styles)
+
+
+# Benchmark analysis sections
+
+BENCHMARK_CATEGORIES = [
+    ('environmental', 'Environmental', 'environmental_score'),
+    ('social', 'Social', 'social_score'),
+    ('governance', 'Governance', 'governance_score'),
+    ('overall_esg', 'Overall ESG', 'overall_score'),
+]
+
+
+def _benchmark_title_section(inputs, styles):
+    story = _branded_title("ESG Benchmark Analysis", f"{inputs['company']}", styles, 'BenchmarkTitle')
     story.append(Spacer(1, 30))
-    
-    # Benchmark comparison focus
-    benchmark_heading_style = ParagraphStyle(
-        'BenchmarkHeading',
-        parent=styles['Heading2'],
-        textColor=HexColor('#3DAEFF'),
-        spaceBefore=15,
-        spaceAfter=10
-    )
-    
-    story.append(Paragraph("Industry Benchmark Performance", benchmark_heading_style))
-    
-    benchmarks = data['benchmarks']['comparisons']
-    esg_scores = data['esg_scores']
-    
+    return story
+
+
+def _benchmark_comparison_inputs(report, data):
+    return {
+        'esg_scores': data['esg_scores'],
+        'benchmarks': data['benchmarks']['comparisons'],
+    }
+
+
+def _benchmark_comparison_section(inputs, styles):
+    esg_scores = inputs['esg_scores']
+    benchmarks = inputs['benchmarks']
+
     # Create detailed benchmark table
     benchmark_data = [
         ['ESG Category', 'Your Score', 'Industry Avg', 'Top Quartile', 'Performance Gap', 'Industry Rank']
     ]
-    
-    categories = ['environmental', 'social', 'governance', 'overall_esg']
-    category_names = ['Environmental', 'Social', 'Governance', 'Overall ESG']
-    scores = [esg_scores['environmental_score'], esg_scores['social_score'], 
-              esg_scores['governance_score'], esg_scores['overall_score']]
-    
-    for i, (cat, name, score) in enumerate(zip(categories, category_names, scores)):
+    for cat, name, score_key in BENCHMARK_CATEGORIES:
         bench = benchmarks[cat]
+        score = esg_scores[score_key]
         gap = score - bench['industry_average']
-        rank = f"{bench.get('industry_rank', 'N/A')}/100"
-        
+
         benchmark_data.append([
             name,
             f"{score:.0f}%",
             f"{bench['industry_average']:.0f}%",
             f"{bench['top_quartile']:.0f}%",
             f"{gap:+.0f}%",
-            rank
+            f"{bench.get('industry_rank', 'N/A')}/100"
         ])
-    
-    benchmark_table = Table(benchmark_data, colWidths=[1.5*inch, 0.8*inch, 1*inch, 1*inch, 1*inch, 0.7*inch])
-    benchmark_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#3DAEFF')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 1), (-1, -1), HexColor('#F8F9FA')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, HexColor('#F8F9FA')]),
-        ('GRID', (0, 0), (-1, -1), 1, HexColor('#E0E0E0'))
-    ]))
-    
-    story.append(benchmark_table)
-    story.append(Spacer(1, 25))
-    
-    # Key insights from benchmarking
-    story.append(Paragraph("Benchmark Insights", benchmark_heading_style))
-    
+
+    return [
+        Paragraph("Industry Benchmark Performance", styles['BenchmarkHeading']),
+        _data_table(benchmark_data, [1.5*inch, 0.8*inch, 1*inch, 1*inch, 1*inch, 0.7*inch], BRAND_BLUE,
+                    header_font_size=10, body_font_size=9, left_columns=0),
+        Spacer(1, 25),
+    ]
+
+
+def _benchmark_insights_inputs(report, data):
+    return {
+        'sector': report.company.business_sector,
+        'esg_scores': data['esg_scores'],
+        'overall': data['benchmarks']['comparisons']['overall_esg'],
+    }
+
+
+def _benchmark_insights_section(inputs, styles):
+    esg_scores = inputs['esg_scores']
+    overall = inputs['overall']
+
+    # Environmental, social and governance only
+    category_names = [name for _, name, _ in BENCHMARK_CATEGORIES[:3]]
+    scores = [esg_scores[score_key] for _, _, score_key in BENCHMARK_CATEGORIES[:3]]
+
     insights = [
-        f"Your overall ESG score of {esg_scores['overall_score']:.0f}% ranks in the {benchmarks['overall_esg']['performance'].replace('_', ' ')} tier",
-        f"Strongest performance: {max(category_names[:3], key=lambda x: scores[category_names.index(x)])} ({max(scores[:3]):.0f}%)",
-        f"Greatest opportunity: {min(category_names[:3], key=lambda x: scores[category_names.index(x)])} ({min(scores[:3]):.0f}%)",
-        f"Industry position: {benchmarks['overall_esg'].get('percentile', 'N/A')} percentile across {company.business_sector} sector"
+        f"Your overall ESG score of {esg_scores['overall_score']:.0f}% ranks in the {overall['performance'].replace('_', ' ')} tier",
+        f"Strongest performance: {max(category_names, key=lambda x: scores[category_names.index(x)])} ({max(scores):.0f}%)",
+        f"Greatest opportunity: {min(category_names, key=lambda x: scores[category_names.index(x)])} ({min(scores):.0f}%)",
+        f"Industry position: {overall.get('percentile', 'N/A')} percentile across {inputs['sector']} sector"
     ]
-    
-    bullet_style = ParagraphStyle(
-        'BenchmarkBulletStyle',
-        parent=styles['Normal'],
-        leftIndent=20,
-        bulletIndent=10,
-        spaceAfter=8
-    )
-    
+
+    bullet_style = styles['BenchmarkBulletStyle']
+    story = [Paragraph("Benchmark Insights", styles['BenchmarkHeading'])]
     for insight in insights:
         story.append(Paragraph(f"• {insight}", bullet_style))
-    
     return story
 
 
+BENCHMARK_ANALYSIS_SECTIONS = [
+    ReportSection('title', _company_title_inputs, _benchmark_title_section),
+    ReportSection('comparison', _benchmark_comparison_inputs, _benchmark_comparison_section),
+    ReportSection('insights', _benchmark_insights_inputs, _benchmark_insights_section),
+]
+
+
+def _build_benchmark_analysis_content(report, styles):
+    """Build benchmark analysis report content with focus on industry comparisons"""
+    logger.info(f"🎲 Generating Benchmark data for report: {report.id}")
+    logger.info(f"🎲 Company: {report.company.name}")
+
+    data = get_report_snapshot(report.company, report.period_start, report.period_end)
+    return build_story('benchmark_analysis', BENCHMARK_ANALYSIS_SECTIONS, report, data, styles)
+
+
 def _build_default_content(report, styles):
     """Build default report content"""
     story = []
@@ -836,103 +832,123 @@ def _build_default_content(report, styles):
     return story
 
 
-def _build_esg_excel_sheets(wb, report):
-    """Build ESG comprehensive Excel sheets"""
-    company = report.company
+def _header_row(ws, values, font=None):
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = font or EXCEL_HEADER_FONT
+        cells.append(cell)
+    return cells
+
+
+def _write_rows(wb, title, columns, rows):
+    """
+    Stream rows into write-only sheets, continuing on "<title> (2)", ...
+    past Excel's row limit. Returns the number of rows written.
+    """
+    count = 0
+    sheets = 0
+    ws_rows = EXCEL_MAX_ROWS
+    for row in rows:
+        if ws_rows == EXCEL_MAX_ROWS:
+            sheets += 1
+            ws = wb.create_sheet(title=title if sheets == 1 else f"{title} ({sheets})")
+            ws.freeze_panes = 'A2'
+            ws.append(_header_row(ws, columns))
+            ws_rows = 1
+        ws.append(row)
+        ws_rows += 1
+        count += 1
+
+    if not sheets:
+        # Keep the sheet so readers see the columns and that nothing matched
+        ws = wb.create_sheet(title=title)
+        ws.append(_header_row(ws, columns))
+    return count
+
+
+def _write_data_sheets(wb, report, datasets, categories=None, progress=None):
+    """Append one sheet per raw dataset; progress moves across 20-60%"""
+    for i, name in enumerate(datasets):
+        dataset = EXPORT_DATASETS[name]
+        rows = dataset.rows(report.company, report.period_start, report.period_end, categories)
+        written = _write_rows(wb, dataset.title, dataset.columns, rows)
+        logger.info(f"📗 {dataset.title}: {written} row(s) for {report.company.name}")
+        _report_progress(progress, 20 + 40 * (i + 1) / len(datasets), 'building_content')
+
+
+def _write_title_rows(ws, title, report):
+    ws.append(_header_row(ws, [title], font=Font(size=16, bold=True, color="2EC57D")))
+    ws.append(_header_row(ws, [report.company.name], font=Font(size=14, bold=True)))
+    ws.append([f"Period: {report.period_start} to {report.period_end}"])
+    ws.append([])
+
+
+def _build_esg_excel_sheets(wb, report, progress=None):
+    """Build ESG comprehensive Excel sheets: score summary plus raw data"""
+    data = get_report_snapshot(report.company, report.period_start, report.period_end)
+    esg_scores = data['esg_scores']
+    benchmarks = data['benchmarks']['comparisons']
     
     # Summary sheet
     ws_summary = wb.create_sheet(title="ESG Summary")
+    ws_summary.column_dimensions['A'].width = 24
+    _write_title_rows(ws_summary, "ESG Comprehensive Report", report)
+    ws_summary.append(_header_row(ws_summary, ["ESG Category", "Score (%)", "Industry Average (%)", "Top Quartile (%)"]))
+    for label, score_key, benchmark_key in [
+        ("Environmental", 'environmental_score', 'environmental'),
+        ("Social", 'social_score', 'social'),
+        ("Governance", 'governance_score', 'governance'),
+        ("Overall ESG", 'overall_score', 'overall_esg'),
+    ]:
+        benchmark = benchmarks[benchmark_key]
+        ws_summary.append([
+            label,
+            round(esg_scores[score_key], 1),
+            round(benchmark['industry_average'], 1),
+            round(benchmark['top_quartile'], 1),
+        ])
     
-    # Header
-    ws_summary['A1'] = "ESG Comprehensive Report"
-    ws_summary['A1'].font = Font(size=16, bold=True, color="2EC57D")
-    ws_summary['A2'] = company.name
-    ws_summary['A2'].font = Font(size=14, bold=True)
-    
-    # ESG Scores
-    ws_summary['A4'] = "ESG Category"
-    ws_summary['B4'] = "Score"
-    ws_summary['C4'] = "Industry Average"
-    
-    scores = [
-        ("Environmental", company.environmental_score or 72, 68),
-        ("Social", company.social_score or 78, 74),
-        ("Governance", company.governance_score or 75, 71),
-        ("Overall ESG", company.overall_esg_score or 75, 71)
-    ]
-    
-    for i, (category, score, avg) in enumerate(scores, 5):
-        ws_summary[f'A{i}'] = category
-        ws_summary[f'B{i}'] = f"{score}%"
-        ws_summary[f'C{i}'] = f"{avg}%"
-    
-    # Environmental sheet
-    ws_env = wb.create_sheet(title="Environmental")
-    ws_env['A1'] = "Environmental Metrics"
-    ws_env['A1'].font = Font(size=14, bold=True)
-    
-    # Social sheet
-    ws_social = wb.create_sheet(title="Social")
-    ws_social['A1'] = "Social Metrics"
-    ws_social['A1'].font = Font(size=14, bold=True)
-    
-    # Governance sheet
-    ws_gov = wb.create_sheet(title="Governance")
-    ws_gov['A1'] = "Governance Metrics"
-    ws_gov['A1'].font = Font(size=14, bold=True)
+    _write_data_sheets(wb, report, list(EXPORT_DATASETS), progress=progress)
 
 
-def _build_dst_excel_sheets(wb, report):
+def _build_dst_excel_sheets(wb, report, progress=None):
     """Build DST compliance Excel sheets"""
-    company = report.company
+    data = get_report_snapshot(report.company, report.period_start, report.period_end, 'dst_compliance')
     
     ws = wb.create_sheet(title="DST Compliance")
-    ws['A1'] = "Dubai Sustainable Tourism Compliance"
-    ws['A1'].font = Font(size=16, bold=True)
-    ws['A2'] = company.name
-    
-    # Compliance checklist
-    ws['A4'] = "Requirement"
-    ws['B4'] = "Status"
-    ws['C4'] = "Score"
-    
-    requirements = [
-        ("Environmental Management System", "Complete", "95%"),
-        ("Energy Efficiency Measures", "Complete", "88%"),
-        ("Water Conservation Program", "In Progress", "75%"),
-        ("Waste Reduction Initiative", "Complete", "92%"),
-    ]
-    
-    for i, (req, status, score) in enumerate(requirements, 5):
-        ws[f'A{i}'] = req
-        ws[f'B{i}'] = status
-        ws[f'C{i}'] = score
+    ws.column_dimensions['A'].width = 40
+    _write_title_rows(ws, "Dubai Sustainable Tourism Compliance", report)
+    ws.append(_header_row(ws, ["Requirement", "Status", "Score (%)", "Evidence"]))
+    for req in data['dst_requirements']:
+        ws.append([
+            req['requirement'],
+            req['status'].replace('_', ' ').title(),
+            round(req['score'], 1),
+            'Yes' if req['evidence_uploaded'] else 'No',
+        ])
 
 
-def _build_custom_excel_sheets(wb, report):
-    """Build custom export Excel sheets"""
-    company = report.company
+def _build_custom_excel_sheets(wb, report, progress=None):
+    """Build custom export Excel sheets: selected categories of raw data"""
     config = report.parameters
+    categories = config.get('include_categories') or ['environmental', 'social', 'governance']
     
     ws = wb.create_sheet(title="Custom Export")
-    ws['A1'] = config.get('name', 'Custom ESG Export')
-    ws['A1'].font = Font(size=16, bold=True)
-    ws['A2'] = company.name
-    
-    # Add selected categories
-    row = 4
-    for category in config.get('include_categories', []):
-        ws[f'A{row}'] = f"{category.title()} Metrics"
-        ws[f'A{row}'].font = Font(bold=True)
-        row += 2
+    _write_title_rows(ws, config.get('name', 'Custom ESG Export'), report)
+    ws.append(_header_row(ws, ["Included Categories"]))
+    for category in categories:
+        ws.append([f"{category.title()} Metrics"])
+    
+    # Meter readings and file metrics are environmental data
+    datasets = list(EXPORT_DATASETS) if 'environmental' in categories else ['task_entries']
+    _write_data_sheets(wb, report, datasets, categories=categories, progress=progress)
 
 
-def _build_default_excel_sheets(wb, report):
+def _build_default_excel_sheets(wb, report, progress=None):
     """Build default Excel sheets"""
-    company = report.company
-    
     ws = wb.create_sheet(title="Report")
-    ws['A1'] = report.template.display_name
-    ws['A1'].font = Font(size=16, bold=True)
-    ws['A2'] = company.name
-    ws['A4'] = f"Generated: {timezone.now().strftime('%Y-%m-%d %H:%M')}"
\ No newline at end of file
+    ws.append(_header_row(ws, [report.template.display_name], font=Font(size=16, bold=True)))
+    ws.append([report.company.name])
+    ws.append([])
+    ws.append([f"Generated: {timezone.now().strftime('%Y-%m-%d %H:%M')}"])
@@ -3,11 +3,13 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
-from django.http import HttpResponse, Http404
+from django.utils.dateparse import parse_date
+from django.http import Http404, StreamingHttpResponse
 from django.db import models
 from django.views.decorators.csrf import csrf_exempt
-from datetime import timedelta, date
+from datetime import timedelta
 import logging
 import uuid
 
@@ -17,7 +19,10 @@ from .serializers import (
     ReportScheduleSerializer, ReportDashboardSerializer, ComplianceStatusSerializer,
     ReportShareSerializer, CustomReportConfigSerializer
 )
-from .utils import generate_report_pdf, generate_report_excel
+from .downloads import serve_report_file
+from .exports import EXPORT_DATASETS, EXPORT_FORMATS, parquet_available
+from .jobs import enqueue_report
+from apps.tasks.compliance import get_compliance_status
 
 logger = logging.getLogger(__name__)
 
@@ -63,10 +68,7 @@ class GeneratedReportViewSet(viewsets.ModelViewSet):
         """Download generated report file"""
         report = self.get_object()
         
-        # DEBUG: Log download request details
         logger.info(f"🔽 Download request for report ID: {pk}")
-        logger.info(f"🔽 Report object: {report.name}")
-        logger.info(f"🔽 Report file path: {report.file.path if report.file else 'None'}")
         
         if not report.file:
             logger.error(f"❌ No file found for report {pk}")
@@ -80,39 +82,42 @@ class GeneratedReportViewSet(viewsets.ModelViewSet):
                 'error': 'Report has expired'
             }, status=status.HTTP_410_GONE)
         
-        # Log access
-        ReportAccess.objects.create(
-            report=report,
-            accessed_by=request.user,
-            ip_address=self._get_client_ip(request),
-            user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            access_type='download'
-        )
+        def log_access():
+            ReportAccess.objects.create(
+                report=report,
+                accessed_by=request.user,
+                ip_address=self._get_client_ip(request),
+                user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                access_type='download'
+            )
         
-        # Get file content and log details
         try:
-            file_content = report.file.read()
-            logger.info(f"✅ Successfully read file: {len(file_content)} bytes")
-            
-            # Construct safe filename
-            safe_filename = f"{report.name.replace('/', '_').replace(':', '_')}.{report.format}"
-            logger.info(f"📁 Download filename: {safe_filename}")
-            
-            # Return file response
-            response = HttpResponse(
-                file_content,
-                content_type='application/pdf' if report.format == 'pdf' else 'application/octet-stream'
-            )
-            response['Content-Disposition'] = f'attachment; filename="{safe_filename}"'
-            
-            return response
-            
-        except Exception as e:
+            return serve_report_file(request, report, on_start=log_access)
+        except (OSError, ValueError) as e:
             logger.error(f"❌ Error reading file for report {pk}: {e}")
             return Response({
                 'error': f'Error reading report file: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @action(detail=True, methods=['get'], url_path='status')
+    def generation_status(self, request, pk=None):
+        """Generation progress of a queued report (poll until completed/failed)"""
+        report = self.get_object()
+        
+        data = {
+            'id': report.id,
+            'status': report.status,
+            'progress_percentage': report.progress_percentage,
+            'progress_stage': report.progress_stage,
+            'error_message': report.error_message,
+            'generation_time_seconds': report.generation_time_seconds,
+            'completed_at': report.completed_at,
+        }
+        if report.status == 'completed' and report.file:
+            data['download_url'] = reverse('reports:generated_report-download', args=[report.id])
+        
+        return Response(data)
+    
     @action(detail=True, methods=['post'])
     def share(self, request, pk=None):
         """Share report with external users"""
@@ -255,38 +260,18 @@ def generate_report(request):
         period_end=data['period_end'],
         parameters=data.get('parameters', {}),
         generated_by=request.user,
-        status='generating',
+        status='pending',
         access_token=str(uuid.uuid4())
     )
+    enqueue_report(report)
     
-    try:
-        # Generate report based on format
-        if data['format'] == 'pdf':
-            file_path = generate_report_pdf(report)
-        elif data['format'] == 'xlsx':
-            file_path = generate_report_excel(report)
-        else:
-            # For other formats, use basic generation
-            file_path = generate_report_pdf(report)  # Fallback to PDF
-        
-        # Mark as completed
-        report.mark_completed(file_path)
-        
-        logger.info(f"Report generated successfully: {report.name}")
-        
-        return Response({
-            'message': 'Report generated successfully',
-            'report': GeneratedReportSerializer(report).data
-        }, status=status.HTTP_201_CREATED)
-        
-    except Exception as e:
-        logger.error(f"Report generation failed: {e}")
-        report.mark_failed(str(e))
-        
-        return Response({
-            'error': 'Report generation failed',
-            'details': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    logger.info(f"Report queued for generation: {report.name}")
+    
+    return Response({
+        'message': 'Report generation started',
+        'report': GeneratedReportSerializer(report).data,
+        'status_url': reverse('reports:generated_report-generation-status', args=[report.id])
+    }, status=status.HTTP_202_ACCEPTED)
 
 
 @csrf_exempt
@@ -329,31 +314,81 @@ def generate_custom_report(request):
         period_end=config['period_end'],
         parameters=config,
         generated_by=request.user,
-        status='generating',
+        status='pending',
         access_token=str(uuid.uuid4())
     )
+    enqueue_report(report)
     
+    logger.info(f"Custom report queued for generation: {report.name}")
+    
+    return Response({
+        'message': 'Custom report generation started',
+        'report': GeneratedReportSerializer(report).data,
+        'status_url': reverse('reports:generated_report-generation-status', args=[report.id])
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_data(request):
+    """
+    Stream raw ESG data as CSV or Parquet
+
+    Query parameters: dataset (meter_readings, extracted_metrics, task_entries,
+    score_history), output (csv or parquet), period_start/period_end
+    (YYYY-MM-DD, default the last 12 months) and categories (comma separated).
+    """
+    company = request.user.company
+    if not company:
+        return Response({
+            'error': 'User is not associated with any company'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    dataset_name = request.query_params.get('dataset', 'task_entries')
+    if dataset_name not in EXPORT_DATASETS:
+        return Response({
+            'error': f"dataset must be one of: {', '.join(EXPORT_DATASETS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # ``format`` is taken by DRF's renderer negotiation
+    output = request.query_params.get('output', 'csv')
+    if output not in EXPORT_FORMATS:
+        return Response({
+            'error': f"output must be one of: {', '.join(EXPORT_FORMATS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if output == 'parquet' and not parquet_available():
+        return Response({
+            'error': 'Parquet export is not available on this server'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    raw_start = request.query_params.get('period_start')
+    raw_end = request.query_params.get('period_end')
     try:
-        # Generate custom report
-        if config['format'] == 'pdf':
-            file_path = generate_report_pdf(report)
-        else:
-            file_path = generate_report_excel(report)
-        
-        report.mark_completed(file_path)
-        
+        period_end = parse_date(raw_end) if raw_end else timezone.now().date()
+        period_start = parse_date(raw_start) if raw_start else period_end and period_end - timedelta(days=365)
+    except ValueError:
+        period_start = period_end = None
+    if period_start is None or period_end is None:
         return Response({
-            'message': 'Custom report generated successfully',
-            'report': GeneratedReportSerializer(report).data
-        }, status=status.HTTP_201_CREATED)
-        
-    except Exception as e:
-        logger.error(f"Custom report generation failed: {e}")
-        report.mark_failed(str(e))
-        
+            'error': 'period_start and period_end must be valid YYYY-MM-DD dates'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if period_start > period_end:
         return Response({
-            'error': 'Custom report generation failed'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            'error': 'period_start must be on or before period_end'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    categories = [category.strip() for category in request.query_params.get('categories', '').split(',') if category.strip()]
+    
+    dataset = EXPORT_DATASETS[dataset_name]
+    content_type, stream = EXPORT_FORMATS[output]
+    rows = dataset.rows(company, period_start, period_end, categories or None)
+    
+    response = StreamingHttpResponse(stream(dataset, rows), content_type=content_type)
+    filename = f"{company.name}_{dataset_name}_{period_start}_{period_end}".replace(' ', '_').replace('"', '')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+    response['Cache-Control'] = 'private, no-cache'
+    logger.info(f"📤 Streaming {dataset_name} {output} export for {company.name} ({period_start} to {period_end})")
+    return response
 
 
 @api_view(['GET'])
@@ -370,51 +405,18 @@ def compliance_status(request):
     
     company = request.user.company
     
-    # Mock compliance data matching report.html
-    compliance_data = [
-        {
-            'framework': 'Dubai Sustainable Tourism',
-            'compliance_percentage': 87.0,
-            'status': 'compliant',
-            'missing_requirements': [
-                'Water consumption tracking',
-                'Waste diversion metrics'
-            ],
-            'last_updated': timezone.now() - timedelta(days=1),
-            'next_review_date': date.today() + timedelta(days=90)
-        },
-        {
-            'framework': 'Green Key Certification',
-            'compliance_percentage': 73.0,
-            'status': 'partial',
-            'missing_requirements': [
-                'Environmental policy documentation',
-                'Staff training records',
-                'Energy efficiency measures'
-            ],
-            'last_updated': timezone.now() - timedelta(days=5),
-            'next_review_date': date.today() + timedelta(days=60)
-        },
-        {
-            'framework': 'UAE Federal Climate Law',
-            'compliance_percentage': 68.0,
-            'status': 'non_compliant',
-            'missing_requirements': [
-                'Carbon footprint assessment',
-                'Emission reduction plan',
-                'Renewable energy adoption'
-            ],
-            'last_updated': timezone.now() - timedelta(days=2),
-            'next_review_date': date.today() + timedelta(days=30)
-        }
-    ]
+    # Per-framework completion from framework-tagged tasks and their evidence
+    compliance = get_compliance_status(company)
+    frameworks = compliance['frameworks']
     
-    serializer = ComplianceStatusSerializer(compliance_data, many=True)
+    serializer = ComplianceStatusSerializer(frameworks, many=True)
     return Response({
         'compliance_status': serializer.data,
-        'overall_compliance': 76.0,
-        'total_frameworks': len(compliance_data),
-        'compliant_frameworks': len([f for f in compliance_data if f['status'] == 'compliant'])
+        'overall_compliance': compliance['overall_compliance'],
+        'total_frameworks': len(frameworks),
+        'compliant_frameworks': len([f for f in frameworks if f['status'] == 'compliant']),
+        'total_requirements': compliance['total_requirements'],
+        'requirements_met': compliance['requirements_met']
     })
 
 
@@ -537,19 +539,18 @@ def shared_report_download(request, access_token):
             'error': 'Report file not available'
         }, status=status.HTTP_404_NOT_FOUND)
     
-    # Log download
-    ReportAccess.objects.create(
-        report=report,
-        ip_address=request.META.get('REMOTE_ADDR'),
-        user_agent=request.META.get('HTTP_USER_AGENT', ''),
-        access_type='download'
-    )
-    
-    # Return file
-    response = HttpResponse(
-        report.file.read(),
-        content_type='application/octet-stream'
-    )
-    response['Content-Disposition'] = f'attachment; filename="{report.name}.{report.format}"'
+    def log_access():
+        ReportAccess.objects.create(
+            report=report,
+            ip_address=request.META.get('REMOTE_ADDR'),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            access_type='download'
+        )
     
-    return response
\ No newline at end of file
+    try:
+        return serve_report_file(request, report, on_start=log_access)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error reading shared report file {report.id}: {e}")
+        return Response({
+            'error': 'Report file not available'
+        }, status=status.HTTP_404_NOT_FOUND)
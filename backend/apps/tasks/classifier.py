@@ -0,0 +1,225 @@
+"""
+Rule engine that classifies parsed ESG questions for task generation
+
+All keyword rules are compiled once at import. ``classify_question`` lowercases
+each question's text once and derives category, priority, estimated hours,
+due-date class, framework tags and the matching onboarding answer in a single
+call.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, List, Optional
+
+
+def _any_keyword(keywords):
+    """Compiled equivalent of ``any(keyword in text for keyword in keywords)``"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+
+# Category rules, checked in order (food/health override environmental context)
+CATEGORY_RULES = [
+    ('social', _any_keyword([
+        'cafeteria', 'food service', 'healthy food', 'locally sourced', 'nutrition',
+        'health', 'safety', 'employee', 'staff', 'training', 'community', 'social',
+        'welfare', 'student', 'curriculum', 'education', 'guest', 'customer',
+        'medical waste', 'hazardous', 'single-use plastics'
+    ])),
+    ('environmental', _any_keyword([
+        'electricity', 'water consumption', 'track consumption', 'utility bills',
+        'recycling', 'waste', 'air quality', 'monitor', 'environmental',
+        'resource', 'energy', 'consumption', 'emission', 'carbon', 'reuse'
+    ])),
+    ('governance', _any_keyword([
+        'policy', 'strategy', 'sustainability plan', 'formal', 'written',
+        'governance', 'management', 'compliance', 'documentation', 'audit', 'reporting',
+        'designated person', 'team responsible', 'signed by senior', 'certification',
+        'assessment', 'impact assessment', 'contract', 'licensed company',
+        'paper use', 'digital', 'electronic records', 'paperless', 'digitization'
+    ])),
+]
+DEFAULT_CATEGORY = 'environmental'  # Default for ambiguous cases
+
+# Priority from the frameworks text: mandatory frameworks are high; training,
+# monitoring and voluntary standards are medium
+PRIORITY_RULES = [
+    ('high', _any_keyword([
+        'mandatory', 'required', 'mandates', 'dst carbon calculator',
+        'al sa\'fat', 'estidama', 'federal law', 'climate law'
+    ])),
+    ('medium', _any_keyword([
+        'training', 'monitoring', 'tracking', 'reporting', 'voluntary',
+        'green key', 'leed', 'breeam'
+    ])),
+]
+DEFAULT_PRIORITY = 'low'
+
+# Due-date class from the frameworks text, and days until due for each
+DUE_CLASS_RULES = [
+    ('high', _any_keyword(['mandatory', 'required', 'mandates'])),
+    ('low', _any_keyword(['voluntary', 'recommended'])),
+]
+DEFAULT_DUE_CLASS = 'medium'
+DUE_DAYS = {'high': 30, 'medium': 60, 'low': 90}
+
+# Estimated hours from the data source text
+HOURS_RULES = [
+    (8, _any_keyword(['bills', 'invoices', 'records', 'monitoring'])),  # Data collection tasks
+    (16, _any_keyword(['policy', 'plan', 'assessment'])),  # Policy/planning tasks
+    (12, _any_keyword(['training', 'committee', 'system'])),  # Implementation tasks
+]
+DEFAULT_HOURS = 4  # Simple tasks
+
+# Question text patterns and the frontend answer IDs they correspond to.
+# Frontend uses different IDs than backend, so we match by question text.
+ANSWER_RULES = [(re.compile(pattern), frontend_ids) for pattern, frontend_ids in [
+    # Governance questions (health_gov_1, health_gov_2)
+    ('sustainability plan.*reduce energy.*water.*waste', ['health_gov_1']),
+    ('reduce paper use.*electronic health records', ['health_gov_2']),
+
+    # Resource Management questions (health_resource_1, health_resource_2, health_resource_3)
+    ('built.*retrofitted.*green building.*al sa.*estidama.*leed', ['health_resource_1']),
+    ('track.*monthly electricity.*water consumption', ['health_resource_2']),
+    ('energy-efficient equipment.*led lighting', ['health_resource_3']),
+
+    # Waste Management questions (health_waste_1, health_waste_2, health_waste_3)
+    ('segregate.*medical waste.*point of generation', ['health_waste_1']),
+    ('contract.*licensed company.*biomedical waste', ['health_waste_2']),
+    ('reduce.*single-use plastics', ['health_waste_3']),
+]]
+
+# Known frameworks by case-sensitive marker, checked in order
+FRAMEWORK_NAME_RULES = [
+    (('ADEK',), 'ADEK Sustainability Policy'),
+    (('Emirates Coalition',), 'Emirates Coalition for Green Schools'),
+    (('DST', 'Dubai Sustainable Tourism'), 'Dubai Sustainable Tourism'),
+    (('Green Key',), 'Green Key Global'),
+    (('Al Sa\'fat',), 'Al Sa\'fat Dubai'),
+    (('Estidama',), 'Estidama Pearl'),
+    (('LEED',), 'LEED'),
+    (('BREEAM',), 'BREEAM'),
+    (('Federal Law', 'Climate Law'), 'UAE Federal Law'),
+    (('MOHAP',), 'MOHAP Hospital Regulation'),
+]
+
+# Cleanup of unrecognised framework references (cryptic numbers, criteria)
+_TRAILING_NUMBER = re.compile(r'\.\d+$')  # .63, .42, etc.
+_LEADING_SECTION = re.compile(r'^\d+\.\d+\s*&?\s*\d*\.\d*\s*')  # 2.1 & 2.6, 1.1, etc.
+_IMPERATIVE_CRITERION = re.compile(r'imperative\s+criterion\s+\d+\.\d+', re.IGNORECASE)
+_CRITERION = re.compile(r'criterion\s+\d+\.\d+', re.IGNORECASE)
+_MARKER = re.compile(r'\([IGC]\)')  # (I), (G), (C) markers
+
+_MANDATORY_STATUS = _any_keyword(['mandatory', 'required', 'mandates'])
+_RECOMMENDS_STATUS = _any_keyword(['voluntary', 'recommends', 'optional'])
+_ADEK_FALLBACK = _any_keyword(['curriculum', 'reuse', 'sustainability strategy'])
+
+
+@dataclass
+class QuestionClassification:
+    """Everything task generation derives from one ESG question"""
+    category: str
+    priority: str
+    due_class: str
+    due_days: int
+    estimated_hours: int
+    framework_tags: List[str] = field(default_factory=list)
+    user_answer: Optional[Any] = None
+
+
+def _first_match(rules, text, default):
+    for value, pattern in rules:
+        if pattern.search(text):
+            return value
+    return default
+
+
+def _framework_name(part):
+    for markers, name in FRAMEWORK_NAME_RULES:
+        if any(marker in part for marker in markers):
+            return name
+
+    # Extract first part as framework name if pattern not recognized
+    cleaned_part = part.replace('\\1', '').replace('\\2', '').replace('\\3', '')
+    cleaned_part = _TRAILING_NUMBER.sub('', cleaned_part)
+    cleaned_part = _LEADING_SECTION.sub('', cleaned_part)
+    cleaned_part = _IMPERATIVE_CRITERION.sub('', cleaned_part)
+    cleaned_part = _CRITERION.sub('', cleaned_part)
+    cleaned_part = _MARKER.sub('', cleaned_part)
+    cleaned_part = cleaned_part.strip()
+
+    if ':' in cleaned_part:
+        framework_name = cleaned_part.split(':')[0].strip()
+    else:
+        framework_name = cleaned_part.split('(')[0].strip()
+
+    # If framework name is too generic or short, use a default
+    if not framework_name or len(framework_name) < 3:
+        if _ADEK_FALLBACK.search(part.lower()):
+            return 'ADEK Sustainability Policy'
+        return 'Framework Requirement'
+    return framework_name
+
+
+@lru_cache(maxsize=1024)
+def _framework_tags(frameworks_text):
+    """Simplified '<framework>: <status>' tags, deduplicated in order"""
+    if not frameworks_text:
+        return ()
+
+    tags = []
+    # Split by comma to handle multiple frameworks
+    for part in frameworks_text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+
+        framework_name = _framework_name(part)
+        part_lower = part.lower()
+        if _MANDATORY_STATUS.search(part_lower):
+            status = 'Mandatory'
+        elif _RECOMMENDS_STATUS.search(part_lower):
+            status = 'Recommends'
+        else:
+            status = 'Required'  # Default
+
+        tag = f"{framework_name}: {status}"
+        if tag not in tags:
+            tags.append(tag)
+    return tuple(tags)
+
+
+def extract_framework_tags(frameworks_text):
+    """Extract simplified framework tags from frameworks text."""
+    return list(_framework_tags(frameworks_text or ''))
+
+
+def find_user_answer(question_text_lower, answers):
+    """Onboarding answer whose frontend question matches the (lowercased) question text"""
+    if not answers:
+        return None
+    for pattern, frontend_ids in ANSWER_RULES:
+        if pattern.search(question_text_lower):
+            for frontend_id in frontend_ids:
+                if frontend_id in answers:
+                    return answers[frontend_id]
+    return None
+
+
+def classify_question(question, answers=None):
+    """Classify one parsed ESGQuestion for task generation"""
+    question_text = question.wizard_question.lower()
+    frameworks_text = (question.frameworks or '').lower()
+    data_source = (question.data_source or '').lower()
+    combined_text = f"{(question.category or '').lower()} {question_text}"
+
+    due_class = _first_match(DUE_CLASS_RULES, frameworks_text, DEFAULT_DUE_CLASS)
+    return QuestionClassification(
+        category=_first_match(CATEGORY_RULES, combined_text, DEFAULT_CATEGORY),
+        priority=_first_match(PRIORITY_RULES, frameworks_text, DEFAULT_PRIORITY),
+        due_class=due_class,
+        due_days=DUE_DAYS[due_class],
+        estimated_hours=_first_match(HOURS_RULES, data_source, DEFAULT_HOURS),
+        framework_tags=extract_framework_tags(question.frameworks),
+        user_answer=find_user_answer(question_text, answers),
+    )
@@ -0,0 +1,257 @@
+"""
+Framework compliance engine
+
+Tasks carry ``framework_tags`` such as ``"Dubai Sustainable Tourism:
+Mandatory"``. Each tagged task is a requirement of those frameworks; it is
+met when the task is completed and has at least its expected evidence files.
+A company's tasks are read in one grouped query (tasks with their
+attachment counts) into an index: requirement per task, task ids per
+framework and a summary per framework.
+
+The index and the status built from it are cached under the company's
+``data_version``; reads only fetch the small status. When a single task or
+attachment changes, the task signals bump the version and call
+``update_task_compliance``, which moves the previous version's index
+forward by re-reading that one task and re-summarising only its frameworks.
+Any other change (bulk regeneration, file extraction) simply rebuilds on
+the next read. Index entries hold strings and epoch timestamps rather than
+UUIDs and datetimes, which keeps (un)pickling the index cheap.
+"""
+
+import logging
+from collections import namedtuple
+from datetime import datetime, timezone as dt_timezone
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+COMPLIANCE_CACHE_TIMEOUT = 60 * 60 * 24
+# Bump when the index layout changes
+COMPLIANCE_INDEX_VERSION = 1
+
+COMPLIANT_THRESHOLD = 85.0
+PARTIAL_THRESHOLD = 60.0
+MISSING_REQUIREMENTS_LIMIT = 10
+
+Requirement = namedtuple('Requirement', [
+    'title', 'frameworks', 'mandatory', 'completed', 'evidence_missing', 'due_date', 'updated_at'
+])
+
+
+def parse_framework_tag(tag):
+    """('Dubai Sustainable Tourism', 'Mandatory') from 'Dubai Sustainable Tourism: Mandatory'"""
+    name, _, level = str(tag).rpartition(': ')
+    if not name:
+        return level.strip(), 'Required'
+    return name.strip(), level.strip()
+
+
+def _requirement(title, status, expected_files, framework_tags, evidence, due_date, updated_at):
+    frameworks = []
+    mandatory = []
+    for tag in framework_tags or []:
+        name, level = parse_framework_tag(tag)
+        if name and name not in frameworks:
+            frameworks.append(name)
+            mandatory.append(level != 'Recommends')
+    if not frameworks:
+        return None
+    completed = status == 'completed'
+    return Requirement(
+        title=title,
+        frameworks=tuple(frameworks),
+        mandatory=tuple(mandatory),
+        completed=completed,
+        evidence_missing=completed and evidence < (expected_files or 0),
+        due_date=due_date.timestamp() if due_date else None,
+        updated_at=updated_at.timestamp(),
+    )
+
+
+def _requirement_rows(tasks):
+    """(task id, Requirement) for framework-tagged tasks, with attachment counts grouped in SQL"""
+    rows = tasks.exclude(framework_tags=[]).annotate(
+        evidence=Count('attachments')
+    ).values_list(
+        'id', 'title', 'status', 'expected_files', 'framework_tags', 'evidence', 'due_date', 'updated_at'
+    ).order_by()
+    for task_id, *fields in rows:
+        requirement = _requirement(*fields)
+        if requirement:
+            yield str(task_id), requirement
+
+
+def _summarize(name, task_ids, requirements):
+    total = met = mandatory_total = mandatory_met = 0
+    missing = []
+    last_updated = None
+    for task_id in task_ids:
+        requirement = requirements[task_id]
+        is_mandatory = requirement.mandatory[requirement.frameworks.index(name)]
+        is_met = requirement.completed and not requirement.evidence_missing
+        total += 1
+        met += is_met
+        mandatory_total += is_mandatory
+        mandatory_met += is_mandatory and is_met
+        if not is_met:
+            missing.append(requirement)
+        if last_updated is None or requirement.updated_at > last_updated:
+            last_updated = requirement.updated_at
+
+    percentage = round(met / total * 100, 1) if total else 0.0
+    if percentage >= COMPLIANT_THRESHOLD and mandatory_met == mandatory_total:
+        status = 'compliant'
+    elif percentage >= PARTIAL_THRESHOLD:
+        status = 'partial'
+    else:
+        status = 'non_compliant'
+
+    # Soonest due first; undated requirements last
+    missing.sort(key=lambda r: (r.due_date is None, r.due_date or 0, r.title))
+    open_due_dates = [r.due_date for r in missing if r.due_date is not None]
+    return {
+        'framework': name,
+        'compliance_percentage': percentage,
+        'status': status,
+        'requirements': total,
+        'requirements_met': met,
+        'mandatory_requirements': mandatory_total,
+        'mandatory_met': mandatory_met,
+        'missing_count': len(missing),
+        'missing_requirements': [
+            f"{r.title} (evidence missing)" if r.evidence_missing else r.title
+            for r in missing[:MISSING_REQUIREMENTS_LIMIT]
+        ],
+        'last_updated': _datetime(last_updated),
+        'next_review_date': timezone.localtime(_datetime(min(open_due_dates))).date() if open_due_dates else None,
+    }
+
+
+def _datetime(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+def _index_cache_key(company_id, data_version):
+    return f"compliance_index_v{COMPLIANCE_INDEX_VERSION}_{company_id}_{data_version}"
+
+
+def _status_cache_key(company_id, data_version):
+    return f"compliance_status_v{COMPLIANCE_INDEX_VERSION}_{company_id}_{data_version}"
+
+
+def build_compliance_index(company):
+    """Requirements, framework membership and framework summaries for a company"""
+    requirements = dict(_requirement_rows(Task.objects.filter(company=company)))
+    frameworks = {}
+    for task_id, requirement in requirements.items():
+        for name in requirement.frameworks:
+            frameworks.setdefault(name, set()).add(task_id)
+    return {
+        'requirements': requirements,
+        'frameworks': frameworks,
+        'summaries': {name: _summarize(name, task_ids, requirements) for name, task_ids in frameworks.items()},
+    }
+
+
+def _build_status(index):
+    frameworks = sorted(index['summaries'].values(), key=lambda s: (-s['requirements'], s['framework']))
+    requirements = index['requirements'].values()
+    met = sum(1 for r in requirements if r.completed and not r.evidence_missing)
+    return {
+        'frameworks': frameworks,
+        'overall_compliance': round(met / len(requirements) * 100, 1) if requirements else 0.0,
+        'total_requirements': len(requirements),
+        'requirements_met': met,
+    }
+
+
+def _store(company, index):
+    status = _build_status(index)
+    cache.set_many({
+        _index_cache_key(company.id, company.data_version): index,
+        _status_cache_key(company.id, company.data_version): status,
+    }, COMPLIANCE_CACHE_TIMEOUT)
+    return status
+
+
+def get_compliance_index(company):
+    """Cached compliance index for the company's current data version"""
+    index = cache.get(_index_cache_key(company.id, company.data_version))
+    if index is None:
+        index = build_compliance_index(company)
+        _store(company, index)
+    return index
+
+
+def _apply_task_change(company, task_id, load_requirement):
+    """
+    Carry the previous version's index forward with one task replaced by
+    ``load_requirement()`` (removed when it returns None). Returns False when
+    there was no previous index to update; the next read then rebuilds.
+    """
+    previous = cache.get(_index_cache_key(company.id, company.data_version - 1))
+    if previous is None:
+        return False
+    requirement = load_requirement()
+
+    requirements = previous['requirements']
+    frameworks = previous['frameworks']
+    old = requirements.pop(task_id, None)
+    touched = set(old.frameworks) if old else set()
+    if old:
+        for name in old.frameworks:
+            frameworks[name].discard(task_id)
+    if requirement:
+        requirements[task_id] = requirement
+        touched.update(requirement.frameworks)
+        for name in requirement.frameworks:
+            frameworks.setdefault(name, set()).add(task_id)
+
+    summaries = previous['summaries']
+    for name in touched:
+        if frameworks.get(name):
+            summaries[name] = _summarize(name, frameworks[name], requirements)
+        else:
+            frameworks.pop(name, None)
+            summaries.pop(name, None)
+
+    _store(company, previous)
+    return True
+
+
+def update_task_compliance(task):
+    """Incrementally update the company's index after one task or its evidence changed"""
+    def load_requirement():
+        return dict(_requirement_rows(Task.objects.filter(pk=task.pk))).get(str(task.pk))
+
+    return _apply_task_change(task.company, str(task.pk), load_requirement)
+
+
+def remove_task_compliance(task):
+    """Incrementally drop a deleted task from the company's index"""
+    return _apply_task_change(task.company, str(task.pk), lambda: None)
+
+
+def get_compliance_status(company):
+    """Per-framework compliance summaries, most requirements first, plus overall figures"""
+    status = cache.get(_status_cache_key(company.id, company.data_version))
+    if status is None:
+        index = cache.get(_index_cache_key(company.id, company.data_version))
+        if index is None:
+            status = _store(company, build_compliance_index(company))
+        else:
+            status = _build_status(index)
+            cache.set(_status_cache_key(company.id, company.data_version), status, COMPLIANCE_CACHE_TIMEOUT)
+    return status
+
+
+def get_framework_compliance(company, framework):
+    """Summary for one framework, or None when no task is tagged with it"""
+    for summary in get_compliance_status(company)['frameworks']:
+        if summary['framework'] == framework:
+            return summary
+    return None
@@ -0,0 +1,52 @@
+"""
+Django management command to prebuild the parsed ESG question index
+Usage: python manage.py build_esg_question_index [--output=PATH] [--check]
+"""
+
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from apps.tasks.markdown_parser import (
+    DEFAULT_INDEX_FILE, ESGContentParser, index_to_json
+)
+
+
+class Command(BaseCommand):
+    help = 'Parse the ESG scoping markdown once and write a JSON index for fast cold starts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            help=f'Where to write the index (default: {DEFAULT_INDEX_FILE})',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report whether the existing index matches the markdown file',
+        )
+
+    def handle(self, *args, **options):
+        output = Path(options.get('output') or DEFAULT_INDEX_FILE)
+
+        try:
+            index = ESGContentParser().build_index()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options.get('check'):
+            if not output.exists():
+                raise CommandError(f'No index at {output}')
+            with open(output, 'r', encoding='utf-8') as file:
+                existing = json.load(file)
+            if existing.get('source_sha256') != index['source_sha256']:
+                raise CommandError(f'Index at {output} is stale; rebuild it.')
+            self.stdout.write(self.style.SUCCESS(f'Index at {output} is up to date.'))
+            return
+
+        with open(output, 'w', encoding='utf-8') as file:
+            json.dump(index_to_json(index), file, ensure_ascii=False, indent=1)
+
+        counts = ', '.join(f"{sector}: {len(questions)}" for sector, questions in index['questions'].items())
+        self.stdout.write(f"Sectors: {counts}")
+        self.stdout.write(self.style.SUCCESS(f'Wrote ESG question index to {output}'))
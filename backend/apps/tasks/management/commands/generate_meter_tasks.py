@@ -104,18 +104,17 @@ class Command(BaseCommand):
                 self.stdout.write(f"Warning: Could not find/create user for task generation: {e}")
                 creator = None
 
-            # Clear existing tasks if requested
-            if clear_existing:
-                existing_count = Task.objects.filter(company=company).count()
-                if existing_count > 0:
-                    Task.objects.filter(company=company).delete()
-                    self.stdout.write(f"Cleared {existing_count} existing tasks for {company.name}")
-
-            # Generate tasks with meter enhancement
+            # Generate tasks with meter enhancement (clearing existing ones in
+            # the same transaction if requested)
+            existing_count = Task.objects.filter(company=company).count() if clear_existing else 0
             self.stdout.write(f"\nGenerating ESG tasks with meter enhancement for {company.name}...")
             self.stdout.write(f"Company sector: {company.business_sector}")
             
-            tasks = generate_initial_tasks_for_company(company, created_by=creator)
+            tasks = generate_initial_tasks_for_company(
+                company, created_by=creator, replace_existing=clear_existing
+            )
+            if existing_count and tasks:
+                self.stdout.write(f"Cleared {existing_count} existing tasks for {company.name}")
             
             if tasks:
                 self.stdout.write(
@@ -0,0 +1,53 @@
+"""
+Django management command to rebuild or verify the ESG score ledger
+Usage: python manage.py rebuild_score_ledger [--company-id=ID] [--check]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.companies.models import Company
+from apps.tasks.scoring import check_company_score_ledger, rebuild_company_score_ledger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or check) per-task score contributions and company ledger sums'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company-id',
+            type=str,
+            help='Only process this company',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Report ledger drift without changing anything (exit code 1 on drift)',
+        )
+
+    def handle(self, *args, **options):
+        companies = Company.objects.all()
+        if options.get('company_id'):
+            companies = companies.filter(id=options['company_id'])
+            if not companies.exists():
+                raise CommandError(f'Company with ID "{options["company_id"]}" does not exist.')
+
+        drifted = 0
+        for company in companies:
+            if options.get('check'):
+                issues = check_company_score_ledger(company)
+                if issues:
+                    drifted += 1
+                    self.stdout.write(self.style.WARNING(f"{company.name}: {len(issues)} ledger issue(s)"))
+                    for issue in issues:
+                        self.stdout.write(f"  {issue}")
+                continue
+
+            changed = rebuild_company_score_ledger(company)
+            company.update_esg_scores()
+            self.stdout.write(f"{company.name}: {changed} task contribution(s) corrected")
+
+        if options.get('check'):
+            if drifted:
+                raise CommandError(f'Score ledger drift found for {drifted} company(ies).')
+            self.stdout.write(self.style.SUCCESS('Score ledger is consistent.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt score ledger for {companies.count()} company(ies).'))
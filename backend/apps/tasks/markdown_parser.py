@@ -2,15 +2,52 @@
 ESG content parser for dynamic task generation from markdown files.
 Adapted from v1 system for v3 Django implementation.
 """
+import hashlib
+import json
 import re
+import threading
 from typing import List, Dict, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from pathlib import Path
 import logging
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+DEFAULT_CONTENT_FILE = DATA_DIR / "2jul-Sector-Specific ESG Scoping for UAE SMEs.md"
+
+# Optional prebuilt index (see the build_esg_question_index command)
+DEFAULT_INDEX_FILE = DATA_DIR / "esg_question_index.json"
+INDEX_FORMAT_VERSION = 1
+
+# Map sector keys to section names in the markdown
+SECTOR_MAPPING = {
+    'hospitality': 'Hospitality Sector',
+    'construction': 'Construction & Real Estate Sector',
+    'manufacturing': 'Manufacturing Sector',
+    'logistics': 'Logistics & Transportation Sector',
+    'education': 'Education Sector',
+    'health': 'Health Sector',
+    'healthcare': 'Health Sector',  # Alternative name
+    'retail': 'Retail Sector',
+    'technology': 'Technology Sector'
+}
+
+# Common framework patterns
+FRAMEWORK_PATTERNS = {
+    'dst': 'Dubai Sustainable Tourism',
+    'green key': 'Green Key Global',
+    'al sa\'fat': 'Al Sa\'fat Dubai',
+    'estidama': 'Estidama Pearl',
+    'leed': 'LEED',
+    'breeam': 'BREEAM',
+    'iso 14001': 'ISO 14001',
+    'climate law': 'UAE Climate Law',
+    'waste management': 'UAE Waste Management Law',
+    'federal law': 'UAE Federal Law'
+}
+
 
 @dataclass
 class ESGQuestion:
@@ -32,8 +69,7 @@ class ESGContentParser:
         """Initialize parser with content file path."""
         if content_file_path is None:
             # Default to the UAE SME document
-            base_path = Path(__file__).parent.parent.parent / "data"
-            content_file_path = base_path / "2jul-Sector-Specific ESG Scoping for UAE SMEs.md"
+            content_file_path = DEFAULT_CONTENT_FILE
         
         self.content_file_path = Path(content_file_path)
         self._content_cache = None
@@ -67,20 +103,7 @@ class ESGContentParser:
         try:
             markdown_content = self.load_content_file()
             
-            # Map sector keys to section names in the markdown
-            sector_mapping = {
-                'hospitality': 'Hospitality Sector',
-                'construction': 'Construction & Real Estate Sector',
-                'manufacturing': 'Manufacturing Sector',
-                'logistics': 'Logistics & Transportation Sector',
-                'education': 'Education Sector',
-                'health': 'Health Sector',
-                'healthcare': 'Health Sector',  # Alternative name
-                'retail': 'Retail Sector',
-                'technology': 'Technology Sector'
-            }
-            
-            sector_name = sector_mapping.get(sector.lower())
+            sector_name = SECTOR_MAPPING.get(sector.lower())
             if not sector_name:
                 logger.warning(f"No mapping found for sector: {sector}")
                 return []
@@ -261,54 +284,139 @@ class ESGContentParser:
     def get_sector_frameworks(self, sector: str) -> List[str]:
         """Get frameworks applicable to a sector."""
         try:
-            content = self.load_content_file()
-            questions = self.parse_sector_content(sector)
-            
-            frameworks = set()
-            for question in questions:
-                if question.frameworks:
-                    # Extract framework names
-                    fw_text = question.frameworks.lower()
-                    
-                    # Common framework patterns
-                    framework_patterns = {
-                        'dst': 'Dubai Sustainable Tourism',
-                        'green key': 'Green Key Global',
-                        'al sa\'fat': 'Al Sa\'fat Dubai',
-                        'estidama': 'Estidama Pearl',
-                        'leed': 'LEED',
-                        'breeam': 'BREEAM',
-                        'iso 14001': 'ISO 14001',
-                        'climate law': 'UAE Climate Law',
-                        'waste management': 'UAE Waste Management Law',
-                        'federal law': 'UAE Federal Law'
-                    }
-                    
-                    for pattern, full_name in framework_patterns.items():
-                        if pattern in fw_text:
-                            frameworks.add(full_name)
-            
-            return list(frameworks)
-            
+            return _frameworks_for_questions(self.parse_sector_content(sector))
         except Exception as e:
             logger.error(f"Error getting frameworks for sector {sector}: {e}")
             return []
+    
+    def build_index(self) -> Dict[str, Any]:
+        """Parse every known sector once into a serializable index."""
+        content = self.load_content_file()
+        questions = {sector: self.parse_sector_content(sector) for sector in SECTOR_MAPPING}
+        return {
+            'version': INDEX_FORMAT_VERSION,
+            'source_sha256': hashlib.sha256(content.encode('utf-8')).hexdigest(),
+            'questions': questions,
+            'frameworks': {sector: _frameworks_for_questions(items) for sector, items in questions.items()},
+            'available_sectors': self.get_available_sectors(),
+        }
+
+
+def _frameworks_for_questions(questions: List[ESGQuestion]) -> List[str]:
+    """Framework names referenced by a list of questions."""
+    frameworks = set()
+    for question in questions:
+        if question.frameworks:
+            fw_text = question.frameworks.lower()
+            for pattern, full_name in FRAMEWORK_PATTERNS.items():
+                if pattern in fw_text:
+                    frameworks.add(full_name)
+    return list(frameworks)
+
+
+def index_to_json(index: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-serializable form of a parsed content index."""
+    data = dict(index)
+    data['questions'] = {
+        sector: [asdict(question) for question in questions]
+        for sector, questions in index['questions'].items()
+    }
+    return data
+
+
+def _index_from_json(data: Dict[str, Any]) -> Dict[str, Any]:
+    index = dict(data)
+    index['questions'] = {
+        sector: [ESGQuestion(**question) for question in questions]
+        for sector, questions in data['questions'].items()
+    }
+    return index
+
+
+def _load_prebuilt_index(content_path: Path, index_path: Path) -> Optional[Dict[str, Any]]:
+    """Prebuilt index for the content file, or None if missing or stale."""
+    if not index_path.exists():
+        return None
+    try:
+        with open(index_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        with open(content_path, 'rb') as file:
+            source_sha256 = hashlib.sha256(file.read()).hexdigest()
+        if data.get('version') != INDEX_FORMAT_VERSION or data.get('source_sha256') != source_sha256:
+            logger.info(f"Ignoring stale ESG question index {index_path}")
+            return None
+        return _index_from_json(data)
+    except Exception as e:
+        logger.warning(f"Could not load ESG question index {index_path}: {e}")
+        return None
+
+
+# Process-wide parsed content, keyed by content file path and validated
+# against the file's modification time
+_index_cache: Dict[str, Any] = {}
+_index_lock = threading.Lock()
+
+
+def get_content_index(content_file_path: Optional[str] = None,
+                      index_file_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parsed questions and frameworks for every sector. Parsed once per process
+    and re-parsed only when the markdown file changes on disk; a matching
+    prebuilt JSON index skips the parse on a cold start.
+    """
+    content_path = Path(content_file_path or DEFAULT_CONTENT_FILE)
+    index_path = Path(index_file_path or DEFAULT_INDEX_FILE)
+    try:
+        mtime = content_path.stat().st_mtime
+    except FileNotFoundError:
+        logger.error(f"ESG content file not found: {content_path}")
+        raise ValueError(f"ESG content file not found: {content_path}")
+    
+    key = str(content_path)
+    cached = _index_cache.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    with _index_lock:
+        cached = _index_cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        index = _load_prebuilt_index(content_path, index_path)
+        if index is None:
+            index = ESGContentParser(content_path).build_index()
+        _index_cache[key] = (mtime, index)
+        return index
+
+
+def clear_content_index_cache():
+    """Drop the process-wide parsed content (e.g. after replacing the file)."""
+    with _index_lock:
+        _index_cache.clear()
 
 
 # Convenience functions for Django integration
 def parse_sector_questions(sector: str) -> List[ESGQuestion]:
-    """Parse questions for a sector (convenience function)."""
-    parser = ESGContentParser()
-    return parser.parse_sector_content(sector)
+    """Parse questions for a sector (convenience function, served from the cached index)."""
+    questions = get_content_index()['questions'].get((sector or '').lower())
+    if questions is None:
+        logger.warning(f"No mapping found for sector: {sector}")
+        return []
+    return list(questions)
 
 
 def get_sector_frameworks(sector: str) -> List[str]:
-    """Get frameworks for a sector (convenience function)."""
-    parser = ESGContentParser()
-    return parser.get_sector_frameworks(sector)
+    """Get frameworks for a sector (convenience function, served from the cached index)."""
+    try:
+        return list(get_content_index()['frameworks'].get((sector or '').lower(), []))
+    except Exception as e:
+        logger.error(f"Error getting frameworks for sector {sector}: {e}")
+        return []
 
 
 def get_available_sectors() -> List[str]:
-    """Get available sectors (convenience function)."""
-    parser = ESGContentParser()
-    return parser.get_available_sectors()
\ No newline at end of file
+    """Get available sectors (convenience function, served from the cached index)."""
+    try:
+        return list(get_content_index()['available_sectors'])
+    except Exception as e:
+        logger.error(f"Error getting available sectors: {e}")
+        return []
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_expected_files'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='has_meter_data',
+            field=models.BooleanField(default=False, help_text='Task has at least one positive meter reading'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='score_category',
+            field=models.CharField(blank=True, help_text='Category the score contribution is booked under', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='score_contribution',
+            field=models.FloatField(default=0.0, help_text='Points this task contributes to its category ESG score'),
+        ),
+    ]
@@ -0,0 +1,100 @@
+from django.db import migrations
+from django.db.models import Count
+
+# Frozen copy of the scoring rules in apps.tasks.scoring at the time of this
+# migration, so later changes to the live code don't alter what it computes
+
+SCORED_CATEGORIES = ['environmental', 'social', 'governance']
+
+LEDGER_FIELDS = [
+    'environmental_score_sum', 'environmental_task_count',
+    'social_score_sum', 'social_task_count',
+    'governance_score_sum', 'governance_task_count',
+    'meter_data_task_count',
+]
+
+# Task text patterns apps.dashboard.views._get_meter_type_for_field detects
+# a meter type from; it only finds none when the text matches none of them
+METER_PATTERNS = [
+    'electricity', 'electric', 'electrical', 'kwh', 'kw', 'power', 'energy',
+    'consumption', 'volt', 'watt', 'amp', 'current', 'dewa', 'addc', 'sewa',
+    'utility', 'grid', 'mains', 'solar', 'generator', 'ups',
+    'water', 'hydro', 'aqua', 'm³', 'm3', 'cubic', 'liter', 'litre', 'gallon',
+    'consumption', 'usage', 'supply', 'municipal', 'well', 'bore', 'tank',
+    'wastewater', 'sewage', 'irrigation', 'cooling tower', 'chiller',
+    'gas', 'natural gas', 'lng', 'lpg', 'propane', 'methane', 'fuel',
+    'heating', 'cooking', 'boiler', 'furnace', 'compressed', 'pipeline',
+]
+
+
+def _ledger_category(category):
+    category = (category or '').lower()
+    for scored in SCORED_CATEGORIES:
+        if scored in category:
+            return scored
+    return ''
+
+
+def _task_has_meter_data(task):
+    """True if any non-cost data entry is a positive reading and the task is about a meter"""
+    task_text = f"{task.title or ''} {task.description or ''} {task.action_required or ''}".lower()
+    if not any(pattern in task_text for pattern in METER_PATTERNS):
+        return False
+    for key, value in (task.data_entries or {}).items():
+        if not value or not str(value).strip() or 'cost' in key.lower():
+            continue
+        try:
+            numeric_value = float(str(value).replace(',', ''))
+        except (ValueError, TypeError):
+            continue
+        if numeric_value > 0:
+            return True
+    return False
+
+
+def _task_contribution(task, attachment_count):
+    """Up to 50 points for data entries (10 per non-empty field) and 50 for files (15 per file)"""
+    score = 0.0
+    data_entries = task.data_entries or {}
+    data_fields = len([v for v in data_entries.values() if v and str(v).strip()])
+    if data_fields > 0:
+        score += min(50, data_fields * 10)
+    if attachment_count > 0:
+        score += min(50, attachment_count * 15)
+    return float(score)
+
+
+def rebuild_score_ledgers(apps, schema_editor):
+    """Seed task contributions and company ledger sums from existing data"""
+    Company = apps.get_model('companies', 'Company')
+    Task = apps.get_model('tasks', 'Task')
+
+    for company in Company.objects.all():
+        totals = {field: 0 for field in LEDGER_FIELDS}
+        tasks = Task.objects.filter(company=company).annotate(attachment_total=Count('attachments'))
+        for task in tasks:
+            task.score_category = _ledger_category(task.category)
+            task.score_contribution = (
+                _task_contribution(task, task.attachment_total) if task.score_category else 0.0
+            )
+            task.has_meter_data = _task_has_meter_data(task)
+            if task.score_category:
+                totals[f'{task.score_category}_score_sum'] += task.score_contribution
+                totals[f'{task.score_category}_task_count'] += 1
+            if task.has_meter_data:
+                totals['meter_data_task_count'] += 1
+            task.save(update_fields=['score_contribution', 'score_category', 'has_meter_data'])
+
+        Company.objects.filter(pk=company.pk).update(**totals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0004_company_environmental_score_sum_and_more'),
+        ('tasks', '0005_task_has_meter_data_task_score_category_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_score_ledgers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_backfill_expected_files'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['company', '-priority', '-created_at', '-id'], name='tasks_task_company_55cd4f_idx'),
+        ),
+    ]
@@ -130,6 +130,21 @@ class Task(models.Model):
         help_text='Number of files expected for this task'
     )
     
+    # Score ledger entry (maintained by apps.tasks.scoring)
+    score_contribution = models.FloatField(
+        default=0.0,
+        help_text='Points this task contributes to its category ESG score'
+    )
+    score_category = models.CharField(
+        max_length=50,
+        blank=True,
+        help_text='Category the score contribution is booked under'
+    )
+    has_meter_data = models.BooleanField(
+        default=False,
+        help_text='Task has at least one positive meter reading'
+    )
+    
     # Dependencies
     depends_on = models.ManyToManyField(
         'self',
@@ -176,11 +191,57 @@ class Task(models.Model):
             models.Index(fields=['company', 'status']),
             models.Index(fields=['assigned_to', 'status']),
             models.Index(fields=['category', 'priority']),
+            # Company task list ordering / cursor pagination keys
+            models.Index(fields=['company', '-priority', '-created_at', '-id']),
         ]
     
     def __str__(self):
         return f"{self.company.name} - {self.title}"
     
+    # Booked by apps.tasks.scoring under a row lock; saving a task instance
+    # never writes them, so a stale instance can't overwrite the booked entry
+    SCORE_LEDGER_FIELDS = ('score_contribution', 'score_category', 'has_meter_data')
+
+    # Task text expected_files is estimated from; it is re-estimated when
+    # any of it changes after the task was loaded
+    EXPECTED_FILES_SOURCE_FIELDS = ('title', 'description', 'action_required')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_expected_files_source = instance._expected_files_source()
+        return instance
+
+    def _expected_files_source(self):
+        # Deferred fields are absent from __dict__; reading them would query
+        return tuple(self.__dict__.get(name) for name in self.EXPECTED_FILES_SOURCE_FIELDS)
+
+    def refresh_expected_files(self):
+        """
+        Estimate expected_files if it is unset or the task text changed since
+        the task was loaded. Returns True if it was re-estimated.
+        """
+        source = self._expected_files_source()
+        if self.expected_files and source == getattr(self, '_loaded_expected_files_source', source):
+            return False
+        from .utils import estimate_expected_files
+        self.expected_files = estimate_expected_files(self.title, self.action_required)
+        self._loaded_expected_files_source = self._expected_files_source()
+        return True
+
+    def save(self, *args, **kwargs):
+        # Persist the evidence expectation instead of re-deriving it per request
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(self.EXPECTED_FILES_SOURCE_FIELDS):
+            if self.refresh_expected_files() and update_fields is not None and 'expected_files' not in update_fields:
+                kwargs['update_fields'] = list(update_fields) + ['expected_files']
+        if not self._state.adding and not args and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SCORE_LEDGER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
     @property
     def is_overdue(self):
         """Check if task is overdue"""
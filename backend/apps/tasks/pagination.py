@@ -0,0 +1,106 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Keyset pagination for task lists. Pages seek on (priority, created_at, id),
+    matching the company task list index, instead of scanning an OFFSET.
+
+    DRF's CursorPagination only filters on the first ordering field and
+    relies on an offset (capped at ``offset_cutoff``) to step over ties, so
+    more than 1000 tasks of the same priority would page forever. Here the
+    cursor position holds the whole ordering tuple, which is unique because
+    it ends with the id, and pages seek past it with
+    ``priority < p OR (priority = p AND created_at < c) OR (... AND id < i)``.
+    """
+    ordering = ('-priority', '-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self._seek_filter(queryset.model, current_position, reverse))
+
+        # Positions are unique, so the offset is only ever non-zero for
+        # cursors a client built by hand
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _seek_filter(self, model, position, reverse):
+        """Rows strictly after ``position`` in the (possibly reversed) ordering"""
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            fields = [order.lstrip('-') for order in self.ordering]
+            values = [model._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        ties = {}
+        for order, field, value in zip(self.ordering, fields, values):
+            lookup = 'lt' if order.startswith('-') != reverse else 'gt'
+            condition |= Q(**ties, **{f'{field}__{lookup}': value})
+            ties[field] = value
+        return condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip('-')
+            attr = instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name)
+            values.append(attr.isoformat() if hasattr(attr, 'isoformat') else str(attr))
+        return json.dumps(values, separators=(',', ':'))
@@ -0,0 +1,280 @@
+"""
+Incremental ESG score ledger
+
+Each task stores the points it contributes to its category score
+(``Task.score_contribution``) and the company keeps running per-category
+sums and counts. When a task's data entries or attachments change, only the
+delta is applied, so refreshing company scores is O(1) per event instead of
+re-scoring every task; ``apply_task_scores`` does the same for a batch of
+bulk-written tasks. ``rebuild_company_score_ledger`` and
+``check_company_score_ledger`` cover drift.
+"""
+
+import logging
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+SCORED_CATEGORIES = ['environmental', 'social', 'governance']
+
+LEDGER_FIELDS = [
+    'environmental_score_sum', 'environmental_task_count',
+    'social_score_sum', 'social_task_count',
+    'governance_score_sum', 'governance_task_count',
+    'meter_data_task_count',
+]
+
+
+def _ledger_category(category):
+    category = (category or '').lower()
+    for scored in SCORED_CATEGORIES:
+        if scored in category:
+            return scored
+    return ''
+
+
+def task_has_meter_data(task):
+    """True if any non-cost data entry is a positive reading of a known meter type"""
+    from apps.dashboard.views import _get_meter_type_for_field
+
+    for key, value in (task.data_entries or {}).items():
+        if not value or not str(value).strip() or 'cost' in key.lower():
+            continue
+        try:
+            numeric_value = float(str(value).replace(',', ''))
+        except (ValueError, TypeError):
+            continue
+        if numeric_value > 0 and _get_meter_type_for_field(task, key):
+            return True
+    return False
+
+
+def calculate_task_contribution(task, attachment_count):
+    """
+    Points a task contributes to its category score: up to 50 for data
+    entries (10 per non-empty field) and up to 50 for files (15 per file)
+    """
+    score = 0.0
+    data_entries = task.data_entries or {}
+    data_fields = len([v for v in data_entries.values() if v and str(v).strip()])
+    if data_fields > 0:
+        score += min(50, data_fields * 10)
+    if attachment_count > 0:
+        score += min(50, attachment_count * 15)
+    return float(score)
+
+
+def calculate_scores_from_ledger(company):
+    """Category and overall scores from the company's ledger sums"""
+    scores = {}
+    for category in SCORED_CATEGORIES:
+        count = getattr(company, f'{category}_task_count')
+        total = getattr(company, f'{category}_score_sum')
+        scores[category] = min(100, total / count) if count > 0 else 0.0
+
+    # Bonus for having actual meter data (environmental category only)
+    if company.environmental_task_count > 0 and company.meter_data_task_count > 0:
+        scores['environmental'] = min(100, scores['environmental'] + 15)
+
+    # Environmental: 40%, Social: 30%, Governance: 30%
+    scores['overall'] = (
+        scores['environmental'] * 0.4 + scores['social'] * 0.3 + scores['governance'] * 0.3
+    )
+    return scores
+
+
+def _add_ledger_delta(updates, old_category, old_score, old_meter, new_category, new_score, new_meter):
+    """Accumulate one task's old -> new ledger change into ``updates`` ({field: delta})"""
+    def add(field, delta):
+        if delta:
+            updates[field] = updates.get(field, 0) + delta
+
+    if old_category:
+        add(f'{old_category}_score_sum', -old_score)
+        add(f'{old_category}_task_count', -1)
+    if new_category:
+        add(f'{new_category}_score_sum', new_score)
+        add(f'{new_category}_task_count', 1)
+    add('meter_data_task_count', int(new_meter) - int(old_meter))
+
+
+def _apply_ledger_delta(company, old_category, old_score, old_meter, new_category, new_score, new_meter):
+    updates = {}
+    _add_ledger_delta(updates, old_category, old_score, old_meter, new_category, new_score, new_meter)
+    _apply_ledger_updates(company, updates)
+
+
+def _apply_ledger_updates(company, updates):
+    from apps.companies.models import Company
+
+    updates = {field: delta for field, delta in updates.items() if delta}
+    if updates:
+        Company.objects.filter(pk=company.pk).update(
+            **{field: F(field) + delta for field, delta in updates.items()}
+        )
+        company.refresh_from_db(fields=LEDGER_FIELDS)
+
+
+def apply_task_score(task, attachment_count=None):
+    """
+    Re-score one task and apply the difference to its company's ledger.
+    Returns True if the ledger changed.
+    """
+    with transaction.atomic():
+        # Lock the task row: concurrent saves and uploads of the same task
+        # then apply their deltas one after the other, each from the
+        # contribution the previous one booked
+        stored = Task.objects.select_for_update().filter(pk=task.pk).values(
+            'score_contribution', 'score_category', 'has_meter_data'
+        ).first()
+        if stored is None:
+            return False
+
+        if attachment_count is None:
+            attachment_count = task.attachments.count()
+        new_category = _ledger_category(task.category)
+        new_score = calculate_task_contribution(task, attachment_count) if new_category else 0.0
+        new_meter = task_has_meter_data(task)
+
+        if (stored['score_category'], stored['score_contribution'], stored['has_meter_data']) == (new_category, new_score, new_meter):
+            return False
+
+        # Queryset update: keeps the task's post_save signal out of the loop
+        Task.objects.filter(pk=task.pk).update(
+            score_contribution=new_score,
+            score_category=new_category,
+            has_meter_data=new_meter,
+        )
+        _apply_ledger_delta(
+            task.company,
+            stored['score_category'], stored['score_contribution'], stored['has_meter_data'],
+            new_category, new_score, new_meter,
+        )
+
+    task.score_contribution = new_score
+    task.score_category = new_category
+    task.has_meter_data = new_meter
+    return True
+
+
+def apply_task_scores(company, tasks, attachment_counts):
+    """
+    Batch form of ``apply_task_score`` for tasks of one company written with
+    bulk_create/bulk_update (which skip the per-task signals). The booked
+    rows are locked and read in one query, changed entries are written with
+    one bulk_update and the summed difference is applied to the ledger once.
+    ``attachment_counts`` maps task pk -> attachments (missing means none).
+    Returns the number of tasks whose entry changed.
+    """
+    with transaction.atomic():
+        stored = {
+            row.pop('id'): row
+            for row in Task.objects.select_for_update().filter(pk__in=[task.pk for task in tasks]).values(
+                'id', 'score_contribution', 'score_category', 'has_meter_data'
+            )
+        }
+        updates = {}
+        changed = []
+        for task in tasks:
+            entry = stored.get(task.pk)
+            if entry is None:
+                continue
+            new_category = _ledger_category(task.category)
+            new_score = (
+                calculate_task_contribution(task, attachment_counts.get(task.pk, 0)) if new_category else 0.0
+            )
+            new_meter = task_has_meter_data(task)
+            old = (entry['score_category'], entry['score_contribution'], entry['has_meter_data'])
+            if old == (new_category, new_score, new_meter):
+                continue
+            _add_ledger_delta(updates, *old, new_category, new_score, new_meter)
+            task.score_contribution = new_score
+            task.score_category = new_category
+            task.has_meter_data = new_meter
+            changed.append(task)
+
+        Task.objects.bulk_update(changed, list(Task.SCORE_LEDGER_FIELDS), batch_size=500)
+        _apply_ledger_updates(company, updates)
+    return len(changed)
+
+
+def remove_task_score(task):
+    """Take a deleted task's booked contribution out of its company's ledger"""
+    _apply_ledger_delta(
+        task.company,
+        task.score_category, task.score_contribution, task.has_meter_data,
+        '', 0.0, False,
+    )
+
+
+def _score_company_tasks(company):
+    """Fresh (task, category, score, has_meter) entries for every company task"""
+    tasks = Task.objects.filter(company=company).annotate(
+        attachment_total=Count('attachments')
+    )
+    entries = []
+    for task in tasks:
+        category = _ledger_category(task.category)
+        score = calculate_task_contribution(task, task.attachment_total) if category else 0.0
+        entries.append((task, category, score, task_has_meter_data(task)))
+    return entries
+
+
+def _ledger_totals(entries):
+    totals = {field: 0 for field in LEDGER_FIELDS}
+    for _, category, score, has_meter in entries:
+        if category:
+            totals[f'{category}_score_sum'] += score
+            totals[f'{category}_task_count'] += 1
+        if has_meter:
+            totals['meter_data_task_count'] += 1
+    return totals
+
+
+def rebuild_company_score_ledger(company):
+    """Recompute every task contribution and reset the company ledger sums"""
+    entries = _score_company_tasks(company)
+
+    changed = []
+    for task, category, score, has_meter in entries:
+        if (task.score_category, task.score_contribution, task.has_meter_data) != (category, score, has_meter):
+            task.score_category = category
+            task.score_contribution = score
+            task.has_meter_data = has_meter
+            changed.append(task)
+
+    totals = _ledger_totals(entries)
+    with transaction.atomic():
+        Task.objects.bulk_update(changed, ['score_contribution', 'score_category', 'has_meter_data'], batch_size=500)
+        for field, value in totals.items():
+            setattr(company, field, value)
+        company.save(update_fields=LEDGER_FIELDS)
+
+    return len(changed)
+
+
+def check_company_score_ledger(company):
+    """
+    Compare the stored ledger with a fresh computation.
+    Returns a list of human-readable drift descriptions (empty when consistent).
+    """
+    company.refresh_from_db(fields=LEDGER_FIELDS)
+    entries = _score_company_tasks(company)
+    issues = []
+
+    for task, category, score, has_meter in entries:
+        if (task.score_category, task.score_contribution, task.has_meter_data) != (category, score, has_meter):
+            issues.append(
+                f"Task {task.id}: stored ({task.score_category or '-'}, {task.score_contribution}, "
+                f"meter={task.has_meter_data}) expected ({category or '-'}, {score}, meter={has_meter})"
+            )
+
+    for field, expected in _ledger_totals(entries).items():
+        stored = getattr(company, field)
+        if abs(stored - expected) > 1e-6:
+            issues.append(f"Company {field}: stored {stored} expected {expected}")
+
+    return issues
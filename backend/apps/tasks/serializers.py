@@ -1,7 +1,146 @@
+import logging
 from rest_framework import serializers
 from django.utils import timezone
 from .models import Task, TaskTemplate, TaskComment, TaskAttachment, TaskReminder, TaskProgress
 
+logger = logging.getLogger(__name__)
+
+
+# Task title keywords and the onboarding question IDs they most likely answer
+QUESTION_PATTERNS = {
+    # Energy related
+    'electricity': ['hosp_energy_1', 'edu_energy_1', 'health_energy_1'],
+    'energy consumption': ['hosp_energy_1', 'edu_energy_1', 'health_energy_1'],
+    'led lighting': ['hosp_energy_2', 'edu_energy_2', 'hosp_energy_5'],
+    'lighting': ['hosp_energy_2', 'edu_energy_2', 'hosp_energy_5'],
+    'light bulbs': ['hosp_energy_2', 'hosp_energy_5'],
+    'energy-efficient': ['hosp_energy_2', 'hosp_energy_5'],
+    'fuel': ['hosp_energy_3', 'logistics_fuel_1'],
+    'generator': ['hosp_energy_3'],
+    'liquefied petroleum gas': ['hosp_energy_3'],
+    'lpg': ['hosp_energy_3'],
+    'cooking': ['hosp_energy_3'],
+    'district cooling': ['hosp_energy_4'],
+    'cooling': ['hosp_energy_4'],
+    
+    # Water related  
+    'water consumption': ['hosp_water_1', 'edu_water_1', 'health_water_1'],
+    'water': ['hosp_water_1', 'edu_water_1', 'health_water_1'],
+    'shower': ['hosp_water_2'],
+    'low-flow': ['hosp_water_2'],
+    'towel': ['hosp_water_3'],
+    'linen': ['hosp_water_3'],
+    'reuse': ['hosp_water_3'],
+    
+    # Waste related
+    'waste': ['hosp_waste_1', 'edu_waste_1', 'health_waste_1'],
+    'recycling': ['hosp_waste_2', 'edu_waste_2', 'health_waste_2'],
+    'plastic': ['hosp_waste_3', 'health_waste_3'],
+    'bulk': ['hosp_waste_3'],
+    'dispenser': ['hosp_waste_3'],
+    'toiletries': ['hosp_waste_3'],
+    
+    # Supply Chain
+    'supplier': ['hosp_supply_1', 'health_supply_1'],
+    'procurement': ['hosp_supply_1', 'health_supply_1'],
+    'local': ['hosp_supply_1'],
+    'preference': ['hosp_supply_1'],
+    
+    # Governance
+    'sustainability policy': ['hosp_gov_1', 'edu_gov_1', 'health_gov_1'],
+    'policy': ['hosp_gov_1', 'edu_gov_1', 'health_gov_1'],
+    'strategy': ['hosp_gov_1', 'edu_gov_1', 'health_gov_1'],
+    'training': ['hosp_gov_2', 'edu_gov_2'],
+    'staff': ['hosp_gov_2', 'edu_gov_2'],
+    'team': ['hosp_gov_3', 'hosp_gov_1'],
+    'person': ['hosp_gov_3'],
+    'designated': ['hosp_gov_3'],
+    
+    # Health & Environment
+    'air quality': ['edu_health_1'],
+    'food policy': ['edu_health_2'],
+}
+
+
+class AnswerIndex:
+    """
+    Onboarding answers indexed for task lookup. Built once from a company's
+    scoping_data; patterns without a stored answer are dropped up front and
+    results are memoized per task title.
+    """
+    
+    def __init__(self, scoping_data):
+        self.scoping_data = scoping_data or {}
+        self.answers = None
+        self.match_by_content = False
+        
+        # Priority 1: answers stored in 'esg_answers' (new format)
+        # Priority 2: answers stored in esg_assessment.answers (current format)
+        if 'esg_answers' in self.scoping_data:
+            self.answers = self.scoping_data['esg_answers']
+            self.match_by_content = True
+        elif 'answers' in (self.scoping_data.get('esg_assessment') or {}):
+            self.answers = self.scoping_data['esg_assessment']['answers']
+            self.match_by_content = True
+        
+        self._pattern_answers = []
+        self._keyed_answers = []
+        self._by_title = {}
+        if isinstance(self.answers, dict):
+            for pattern, question_ids in QUESTION_PATTERNS.items():
+                for question_id in question_ids:
+                    if question_id in self.answers:
+                        self._pattern_answers.append((pattern, self.answers[question_id]))
+                        break
+            self._keyed_answers = [
+                (str(question_id).lower(), answer) for question_id, answer in self.answers.items()
+            ]
+    
+    def lookup(self, task):
+        if not self.scoping_data:
+            return None
+        if self.match_by_content:
+            if not isinstance(self.answers, dict):
+                return None
+            if task.title not in self._by_title:
+                self._by_title[task.title] = self._find_answer_by_title(task.title)
+            return self._by_title[task.title]
+        
+        # Priority 3: task has a related question (ideal case)
+        if task.related_question_id:
+            question_id = str(task.related_question_id)
+            scoping_data = self.scoping_data
+            
+            # Check various locations for the question ID
+            if question_id in scoping_data:
+                return scoping_data[question_id]
+            
+            if 'responses' in scoping_data and question_id in scoping_data['responses']:
+                response_data = scoping_data['responses'][question_id]
+                if isinstance(response_data, dict) and 'response_data' in response_data:
+                    return response_data['response_data']
+                return response_data
+            
+            if 'answers' in scoping_data and question_id in scoping_data['answers']:
+                return scoping_data['answers'][question_id]
+        
+        return None
+    
+    def _find_answer_by_title(self, title):
+        """Match task title against question patterns, then question ID keywords"""
+        title_lower = title.lower()
+        for pattern, answer in self._pattern_answers:
+            if pattern in title_lower:
+                return answer
+        
+        # If no pattern match, try direct key matching with task keywords
+        task_words = [word for word in title_lower.replace('?', '').split() if len(word) > 3]
+        for question_id, answer in self._keyed_answers:
+            for word in task_words:
+                if word in question_id:
+                    return answer
+        return None
+
 
 class TaskAttachmentSerializer(serializers.ModelSerializer):
     """Serializer for task attachments"""
@@ -34,7 +173,7 @@ class TaskCommentSerializer(serializers.ModelSerializer):
     def get_author_avatar(self, obj):
         """Get author avatar URL"""
         # In production, you might have actual avatar URLs
-        return f"https://storage.googleapis.com/uxpilot-auth.appspot.com/avatars/avatar-{obj.author.id % 6 + 1}.jpg"
+        return f"https://storage.googleapis.com/uxpilot-auth.appspot.com/avatars/avatar-{obj.author.id.int % 6 + 1}.jpg"
 
 
 class TaskProgressSerializer(serializers.ModelSerializer):
@@ -90,138 +229,57 @@ class TaskSerializer(serializers.ModelSerializer):
             'is_overdue', 'days_until_due'
         ]
     
+    def __init__(self, *args, **kwargs):
+        # Optional sparse fieldset: TaskSerializer(task, fields=['id', 'title'])
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+    
     def get_attachment_count(self, obj):
         """Get number of attachments"""
+        if hasattr(obj, 'attachment_total'):
+            return obj.attachment_total
         return obj.attachments.count()
     
     def get_comment_count(self, obj):
         """Get number of comments"""
+        if hasattr(obj, 'comment_total'):
+            return obj.comment_total
         return obj.comments.count()
     
+    def _get_answer_index(self, obj):
+        """Answer index for the task's company, built once per serialization"""
+        indexes = self.context.setdefault('_answer_indexes', {})
+        if obj.company_id not in indexes:
+            indexes[obj.company_id] = AnswerIndex(obj.company.scoping_data)
+        return indexes[obj.company_id]
+    
     def get_user_answer(self, obj):
         """Get user's answer from onboarding scoping data"""
         try:
-            # Get the company's scoping data
-            company = obj.company
-            if not company.scoping_data:
-                return None
-            
-            scoping_data = company.scoping_data
-            
-            # Priority 1: Check if answers are stored in 'esg_answers' object (new format)
-            if 'esg_answers' in scoping_data:
-                return self._find_answer_by_task_content(obj, scoping_data['esg_answers'])
-            
-            # Priority 2: Check if answers are stored in esg_assessment.answers (current format)
-            if 'esg_assessment' in scoping_data and 'answers' in scoping_data['esg_assessment']:
-                return self._find_answer_by_task_content(obj, scoping_data['esg_assessment']['answers'])
-            
-            # Priority 3: Check if task has a related question (ideal case)
-            if obj.related_question:
-                question_id = str(obj.related_question.id)
-                
-                # Check various locations for the question ID
-                if question_id in scoping_data:
-                    return scoping_data[question_id]
-                
-                if 'responses' in scoping_data and question_id in scoping_data['responses']:
-                    response_data = scoping_data['responses'][question_id]
-                    if isinstance(response_data, dict) and 'response_data' in response_data:
-                        return response_data['response_data']
-                    return response_data
-                
-                if 'answers' in scoping_data and question_id in scoping_data['answers']:
-                    return scoping_data['answers'][question_id]
-            
-            return None
-            
+            return self._get_answer_index(obj).lookup(obj)
         except Exception as e:
             # Log the error but don't break the serialization
-            import logging
-            logger = logging.getLogger(__name__)
             logger.warning(f"Error getting user answer for task {obj.id}: {e}")
             return None
+
+
+class TaskCompactSerializer(TaskSerializer):
+    """
+    Lightweight task row for tracker lists (?view=compact): no long text
+    fields, nested relations or onboarding answers
+    """
     
-    def _find_answer_by_task_content(self, task, answers_dict):
-        """Find answer by matching task content to question patterns"""
-        try:
-            task_title_lower = task.title.lower()
-            
-            # Common question patterns and their mapping to likely question IDs
-            question_patterns = {
-                # Energy related
-                'electricity': ['hosp_energy_1', 'edu_energy_1', 'health_energy_1'],
-                'energy consumption': ['hosp_energy_1', 'edu_energy_1', 'health_energy_1'],
-                'led lighting': ['hosp_energy_2', 'edu_energy_2', 'hosp_energy_5'],
-                'lighting': ['hosp_energy_2', 'edu_energy_2', 'hosp_energy_5'],
-                'light bulbs': ['hosp_energy_2', 'hosp_energy_5'],
-                'energy-efficient': ['hosp_energy_2', 'hosp_energy_5'],
-                'fuel': ['hosp_energy_3', 'logistics_fuel_1'],
-                'generator': ['hosp_energy_3'],
-                'liquefied petroleum gas': ['hosp_energy_3'],
-                'lpg': ['hosp_energy_3'],
-                'cooking': ['hosp_energy_3'],
-                'district cooling': ['hosp_energy_4'],
-                'cooling': ['hosp_energy_4'],
-                
-                # Water related  
-                'water consumption': ['hosp_water_1', 'edu_water_1', 'health_water_1'],
-                'water': ['hosp_water_1', 'edu_water_1', 'health_water_1'],
-                'shower': ['hosp_water_2'],
-                'low-flow': ['hosp_water_2'],
-                'towel': ['hosp_water_3'],
-                'linen': ['hosp_water_3'],
-                'reuse': ['hosp_water_3'],
-                
-                # Waste related
-                'waste': ['hosp_waste_1', 'edu_waste_1', 'health_waste_1'],
-                'recycling': ['hosp_waste_2', 'edu_waste_2', 'health_waste_2'],
-                'plastic': ['hosp_waste_3', 'health_waste_3'],
-                'bulk': ['hosp_waste_3'],
-                'dispenser': ['hosp_waste_3'],
-                'toiletries': ['hosp_waste_3'],
-                
-                # Supply Chain
-                'supplier': ['hosp_supply_1', 'health_supply_1'],
-                'procurement': ['hosp_supply_1', 'health_supply_1'],
-                'local': ['hosp_supply_1'],
-                'preference': ['hosp_supply_1'],
-                
-                # Governance
-                'sustainability policy': ['hosp_gov_1', 'edu_gov_1', 'health_gov_1'],
-                'policy': ['hosp_gov_1', 'edu_gov_1', 'health_gov_1'],
-                'strategy': ['hosp_gov_1', 'edu_gov_1', 'health_gov_1'],
-                'training': ['hosp_gov_2', 'edu_gov_2'],
-                'staff': ['hosp_gov_2', 'edu_gov_2'],
-                'team': ['hosp_gov_3', 'hosp_gov_1'],
-                'person': ['hosp_gov_3'],
-                'designated': ['hosp_gov_3'],
-                
-                # Health & Environment
-                'air quality': ['edu_health_1'],
-                'food policy': ['edu_health_2'],
-            }
-            
-            # Try to match task title to question patterns
-            for pattern, question_ids in question_patterns.items():
-                if pattern in task_title_lower:
-                    # Try each potential question ID
-                    for question_id in question_ids:
-                        if question_id in answers_dict:
-                            return answers_dict[question_id]
-            
-            # If no pattern match, try direct key matching with task keywords
-            task_words = task_title_lower.replace('?', '').split()
-            for question_id, answer in answers_dict.items():
-                # Simple heuristic: if question_id contains similar keywords
-                for word in task_words:
-                    if len(word) > 3 and word in question_id.lower():
-                        return answer
-            
-            return None
-            
-        except Exception as e:
-            return None
+    class Meta(TaskSerializer.Meta):
+        fields = [
+            'id', 'title', 'task_type', 'category', 'status', 'priority',
+            'assigned_to_name', 'due_date', 'progress_percentage',
+            'is_overdue', 'days_until_due', 'category_icon', 'priority_color',
+            'attachment_count', 'comment_count', 'expected_files',
+            'created_at', 'updated_at'
+        ]
 
 
 class TaskCreateSerializer(serializers.ModelSerializer):
@@ -1,42 +1,116 @@
 """
-Task signals for automatic company score updates
+Task signals for automatic company score and compliance updates
 """
-from django.db.models.signals import post_save, post_delete
+import threading
+from contextlib import contextmanager
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from .models import Task, TaskAttachment
+from .scoring import apply_task_score, remove_task_score
+from .compliance import remove_task_compliance, update_task_compliance
+
+_batch_state = threading.local()
+
+
+@contextmanager
+def batched_task_changes():
+    """
+    Suspend the per-task company recompute for bulk writes (e.g. clearing and
+    regenerating all tasks). The caller rebuilds the score ledger and
+    refreshes company metrics once afterwards.
+    """
+    previous = getattr(_batch_state, 'active', False)
+    _batch_state.active = True
+    try:
+        yield
+    finally:
+        _batch_state.active = previous
+
+
+def _in_batch():
+    return getattr(_batch_state, 'active', False)
+
+
+def _deleted_with_task(origin):
+    """True when a delete cascades from a Task (or its company) rather than the row itself"""
+    if isinstance(origin, QuerySet):
+        return origin.model is not TaskAttachment
+    return origin is not None and not isinstance(origin, TaskAttachment)
 
 
 @receiver(post_save, sender=Task)
 def update_company_scores_on_task_save(sender, instance, created, **kwargs):
     """Update company ESG scores when a task is saved"""
+    if _in_batch():
+        return
     if instance.company:
         from .utils import _update_company_completion_stats
+        instance.company.bump_data_version()
+        update_task_compliance(instance)
         _update_company_completion_stats(instance.company)
-        # Update ESG scores based on task progress and data entries
+        # Apply this task's score delta, then refresh scores from the ledger
+        apply_task_score(instance)
         instance.company.update_esg_scores()
 
 
-@receiver(post_delete, sender=Task)  
+@receiver(pre_delete, sender=Task)
+def capture_task_score_on_delete(sender, instance, **kwargs):
+    """Remember the task's booked ledger entry before the row disappears"""
+    if _in_batch():
+        return
+    instance._ledger_entry = Task.objects.filter(pk=instance.pk).values(
+        'score_contribution', 'score_category', 'has_meter_data'
+    ).first()
+
+
+@receiver(post_delete, sender=Task)
 def update_company_scores_on_task_delete(sender, instance, **kwargs):
     """Update company ESG scores when a task is deleted"""
+    if _in_batch():
+        return
+    from apps.companies.models import Company
+    if isinstance(kwargs.get('origin'), Company):
+        return
     if instance.company:
         from .utils import _update_company_completion_stats
+        entry = getattr(instance, '_ledger_entry', None)
+        if entry:
+            instance.score_contribution = entry['score_contribution']
+            instance.score_category = entry['score_category']
+            instance.has_meter_data = entry['has_meter_data']
+        instance.company.bump_data_version()
+        remove_task_compliance(instance)
         _update_company_completion_stats(instance.company)
         # Update ESG scores based on remaining tasks
+        remove_task_score(instance)
         instance.company.update_esg_scores()
 
 
 @receiver(post_save, sender=TaskAttachment)
 def update_company_scores_on_file_upload(sender, instance, created, **kwargs):
     """Update company ESG scores when a file is uploaded to a task"""
+    if _in_batch():
+        return
     if instance.task and instance.task.company:
+        instance.task.company.bump_data_version()
+        update_task_compliance(instance.task)
         # Update ESG scores based on new file upload
+        apply_task_score(instance.task)
         instance.task.company.update_esg_scores()
 
 
 @receiver(post_delete, sender=TaskAttachment)
 def update_company_scores_on_file_delete(sender, instance, **kwargs):
     """Update company ESG scores when a file is deleted from a task"""
+    if _in_batch():
+        return
+    # The task's own delete handler takes its whole contribution out
+    if _deleted_with_task(kwargs.get('origin')):
+        return
     if instance.task and instance.task.company:
+        instance.task.company.bump_data_version()
+        update_task_compliance(instance.task)
         # Update ESG scores based on file removal
-        instance.task.company.update_esg_scores()
\ No newline at end of file
+        apply_task_score(instance.task)
+        instance.task.company.update_esg_scores()
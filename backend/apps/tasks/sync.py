@@ -0,0 +1,193 @@
+"""
+Bulk sync of frontend (localStorage) tasks into the task table
+
+Existing tasks are matched by external_id, then by title, using one query
+per key. The payload is then split into creates and updates that are written
+with bulk_create/bulk_update in a single transaction, followed by the score
+ledger deltas of the synced tasks and one company-level stats recompute. Each item's values are checked
+against the model fields (length, choices, type, null) first, so a bad item
+is reported in ``errors`` instead of failing the whole batch.
+"""
+
+import logging
+from datetime import timedelta
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Task
+from .scoring import apply_task_scores
+from .utils import refresh_company_task_metrics
+
+logger = logging.getLogger(__name__)
+
+SYNC_UPDATE_FIELDS = [
+    'title', 'description', 'category', 'priority', 'status', 'due_date',
+    'compliance_context', 'action_required', 'framework_tags', 'sector',
+    'external_id', 'task_type', 'estimated_hours', 'expected_files', 'updated_at',
+]
+
+
+# Set by the sync itself rather than sent by the frontend; 'esg_assessment'
+# is not one of Task.TYPE_CHOICES but is what generated tasks are stored as
+SYNC_SERVER_VALUES = {'task_type'}
+
+
+def _parse_due_date(value):
+    if not value:
+        return None
+    try:
+        from dateutil.parser import parse
+        return parse(value)
+    except (ValueError, TypeError, OverflowError):
+        # Fallback to current date + 30 days
+        return timezone.now() + timedelta(days=30)
+
+
+def _task_values(task_data):
+    """Model field values for one frontend task (raises on malformed input)"""
+    return {
+        'title': task_data.get('title', 'Untitled Task')[:200],  # Limit title length
+        'description': task_data.get('description', '')[:500],  # Limit description length
+        'category': task_data.get('category', 'environmental'),
+        'priority': task_data.get('priority', 'medium'),
+        'status': task_data.get('status', 'todo'),
+        'due_date': _parse_due_date(task_data.get('due_date')),
+        'compliance_context': task_data.get('compliance_context', '')[:300],
+        'action_required': task_data.get('action_required', '')[:300],
+        'framework_tags': task_data.get('framework_tags', []),
+        'sector': task_data.get('sector', ''),
+        'external_id': task_data.get('id'),  # Store frontend task ID
+        'task_type': 'esg_assessment',  # Mark as generated from ESG assessment
+        'estimated_hours': task_data.get('estimated_hours', 4),
+    }
+
+
+def _clean_task_values(task_values, creating):
+    """
+    Values converted by their model fields, or a list of problems with the
+    values the frontend sent (length, choice, type, null). Updates skip None
+    values, so only creates need non-null fields.
+    """
+    cleaned = {}
+    problems = []
+    for name, value in task_values.items():
+        field = Task._meta.get_field(name)
+        if name in SYNC_SERVER_VALUES:
+            cleaned[name] = value
+            continue
+        if value is None:
+            if creating and not field.null:
+                problems.append(f"{name}: This field cannot be null.")
+            cleaned[name] = value
+            continue
+        if value in field.empty_values:
+            cleaned[name] = value
+            continue
+        try:
+            cleaned[name] = field.clean(value, None)
+        except ValidationError as e:
+            problems.append(f"{name}: {' '.join(e.messages)}")
+    return cleaned, problems
+
+
+def _first_by(tasks, key):
+    """Map key -> first task in queryset order (what .filter(...).first() returned)"""
+    mapping = {}
+    for task in tasks:
+        mapping.setdefault(getattr(task, key), task)
+    return mapping
+
+
+def _compact_result(task):
+    return {
+        'id': str(task.id),
+        'external_id': task.external_id,
+        'title': task.title,
+        'status': task.status,
+    }
+
+
+def sync_frontend_tasks_for_company(company, user, tasks_data):
+    """
+    Upsert a list of frontend task dicts for ``company``.
+    Returns (created, updated, errors) where created/updated are compact
+    per-task results and errors are {'task_title', 'error'} dicts.
+    """
+    external_ids = {item.get('id') for item in tasks_data if isinstance(item, dict) and item.get('id')}
+    titles = {item.get('title', '') for item in tasks_data if isinstance(item, dict)}
+
+    # Attachment counts come with the match queries; they feed the score deltas
+    company_tasks = Task.objects.filter(company=company).annotate(attachment_total=Count('attachments'))
+    by_external_id = _first_by(company_tasks.filter(external_id__in=external_ids), 'external_id')
+    by_title = _first_by(company_tasks.filter(title__in=titles), 'title')
+
+    to_create = {}
+    to_update = {}
+    errors = []
+    now = timezone.now()
+
+    for task_data in tasks_data:
+        if not isinstance(task_data, dict):
+            errors.append({'task_title': 'Unknown', 'error': 'Task must be an object'})
+            continue
+        try:
+            frontend_task_id = task_data.get('id')
+
+            # Check if task already exists by frontend task ID or title
+            # (earlier items in this payload count as existing)
+            task = by_external_id.get(frontend_task_id) if frontend_task_id else None
+            if task is None:
+                task = by_title.get(task_data.get('title', ''))
+
+            task_values, problems = _clean_task_values(_task_values(task_data), creating=task is None)
+            if problems:
+                errors.append({'task_title': task_data.get('title', 'Unknown'), 'error': '; '.join(problems)})
+                continue
+
+            if task is not None:
+                for key, value in task_values.items():
+                    if value is not None:  # Only update non-null values
+                        setattr(task, key, value)
+                if task.pk not in to_create:
+                    to_update[task.pk] = task
+            else:
+                task = Task(
+                    company=company,
+                    created_by=user,
+                    assigned_to=user,  # Default assign to creator
+                    **task_values
+                )
+                to_create[task.pk] = task
+
+            if task.external_id:
+                by_external_id.setdefault(task.external_id, task)
+            by_title.setdefault(task.title, task)
+
+        except Exception as e:
+            logger.error(f"Error syncing task {task_data.get('title', 'Unknown')}: {e}")
+            errors.append({
+                'task_title': task_data.get('title', 'Unknown'),
+                'error': str(e)
+            })
+
+    # bulk_create/bulk_update skip Task.save(), so fill what it would have
+    for task in list(to_create.values()) + list(to_update.values()):
+        task.refresh_expected_files()
+        task.updated_at = now
+
+    if to_create or to_update:
+        with transaction.atomic():
+            Task.objects.bulk_create(to_create.values(), batch_size=500)
+            Task.objects.bulk_update(to_update.values(), SYNC_UPDATE_FIELDS, batch_size=500)
+            # Writes bypassed the per-task signals: score deltas for the synced
+            # tasks only, then one company recompute for the whole batch
+            apply_task_scores(company, list(to_create.values()) + list(to_update.values()), {
+                task.pk: task.attachment_total for task in to_update.values()
+            })
+            transaction.on_commit(lambda: refresh_company_task_metrics(company))
+
+    created = [_compact_result(task) for task in to_create.values()]
+    updated = [_compact_result(task) for task in to_update.values()]
+    return created, updated, errors
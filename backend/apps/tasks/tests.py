@@ -0,0 +1,442 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.companies.models import Company
+from .classifier import classify_question
+from .markdown_parser import ESGQuestion
+from .models import Task, TaskAttachment, TaskComment
+from .scoring import check_company_score_ledger
+from .utils import estimate_expected_files
+
+
+class TaskCursorPaginationTests(APITestCase):
+    """Task list keyset pagination"""
+
+    TASK_COUNT = 1308
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Paging Hotel', business_sector='hospitality')
+        cls.user = get_user_model().objects.create_user(
+            username='pager', email='pager@example.com', password='pass', company=cls.company
+        )
+        # More same-priority tasks than DRF's offset_cutoff, half of them
+        # sharing one created_at so the id decides their order
+        Task.objects.bulk_create([
+            Task(company=cls.company, created_by=cls.user, title=f'Task {i}', description='', priority='high')
+            for i in range(cls.TASK_COUNT)
+        ])
+        tied = list(Task.objects.filter(company=cls.company).values_list('id', flat=True)[:cls.TASK_COUNT // 2])
+        Task.objects.filter(id__in=tied).update(created_at=timezone.now())
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_past_offset_cutoff_of_same_priority_tasks(self):
+        seen = []
+        url = '/api/tasks/?view=compact&page_size=200'
+        for _ in range(self.TASK_COUNT // 200 + 2):
+            page = self._page(url)
+            seen.extend(task['id'] for task in page['results'])
+            url = page['next']
+            if url is None:
+                break
+
+        self.assertIsNone(url)
+        self.assertEqual(len(seen), self.TASK_COUNT)
+        self.assertEqual(len(set(seen)), self.TASK_COUNT)
+        expected = Task.objects.filter(company=self.company).order_by('-priority', '-created_at', '-id')
+        self.assertEqual(seen, [str(task_id) for task_id in expected.values_list('id', flat=True)])
+
+    def test_previous_link_returns_the_preceding_page(self):
+        first = self._page('/api/tasks/?view=compact&page_size=200')
+        second = self._page(first['next'])
+        back = self._page(second['previous'])
+        self.assertEqual([task['id'] for task in back['results']], [task['id'] for task in first['results']])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/tasks/?cursor=cD0lNUIlMjJ4JTIyJTVE')
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskScoreLedgerTests(APITestCase):
+    """Incremental company score ledger"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Ledger Hotel', business_sector='hospitality')
+        cls.user = get_user_model().objects.create_user(
+            username='ledger', email='ledger@example.com', password='pass', company=cls.company
+        )
+
+    def test_stale_instance_save_keeps_ledger_consistent(self):
+        task = Task.objects.create(
+            company=self.company, created_by=self.user, title='Electricity meter',
+            description='', category='environmental'
+        )
+        stale = Task.objects.get(pk=task.pk)
+
+        task.data_entries = {'reading_1': '120', 'reading_2': '130'}
+        task.save()
+        # Saved from an instance loaded before the first save booked its score
+        stale.data_entries = {'reading_1': '120', 'reading_2': '130', 'reading_3': '140'}
+        stale.save()
+
+        self.assertEqual(check_company_score_ledger(self.company), [])
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.environmental_score_sum, 30.0)
+        self.assertEqual(self.company.environmental_task_count, 1)
+
+
+class TaskSyncTests(APITestCase):
+    """Frontend task sync"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Sync Hotel', business_sector='hospitality')
+        cls.user = get_user_model().objects.create_user(
+            username='syncer', email='syncer@example.com', password='pass', company=cls.company
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_sync_applies_score_deltas_for_synced_tasks_only(self):
+        existing = Task.objects.create(
+            company=self.company, created_by=self.user, title='Water meter', description='',
+            category='environmental', external_id='task_1'
+        )
+        untouched = Task.objects.create(
+            company=self.company, created_by=self.user, title='Board policy', description='',
+            category='governance', data_entries={'policy': 'yes'}
+        )
+        # A rebuild would re-score this booking; the sync must leave it alone
+        Task.objects.filter(pk=untouched.pk).update(score_contribution=99.0)
+
+        response = self.client.post('/api/tasks/sync-frontend/', {'tasks': [
+            {'id': 'task_1', 'title': 'Water meter', 'category': 'environmental'},
+            {'id': 'task_2', 'title': 'Staff training', 'category': 'social'},
+            {'id': 'task_3', 'title': 'Bad priority', 'priority': 'urgent'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data['created_count'], response.data['updated_count']), (1, 1))
+        self.assertEqual([error['task_title'] for error in response.data['errors']], ['Bad priority'])
+        self.assertEqual(Task.objects.get(pk=untouched.pk).score_contribution, 99.0)
+        self.company.refresh_from_db()
+        self.assertEqual(
+            (self.company.environmental_task_count, self.company.social_task_count,
+             self.company.governance_task_count),
+            (1, 1, 1)
+        )
+        # Only the hand-edited booking differs from a fresh computation
+        issues = check_company_score_ledger(self.company)
+        self.assertEqual(len(issues), 1, issues)
+        self.assertIn(str(untouched.id), issues[0])
+        self.assertTrue(Task.objects.filter(pk=existing.pk, score_category='environmental').exists())
+
+
+class TaskListQueryTests(APITestCase):
+    """Task list query budget: independent of the number of tasks and their relations"""
+
+    TASK_COUNT = 500
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Busy Hotel', business_sector='hospitality')
+        cls.user = get_user_model().objects.create_user(
+            username='busy', email='busy@example.com', password='pass', company=cls.company
+        )
+        tasks = Task.objects.bulk_create([
+            Task(company=cls.company, created_by=cls.user, assigned_to=cls.user, title=f'Task {i}',
+                 description='', category='environmental', priority='medium' if i == 0 else 'low')
+            for i in range(cls.TASK_COUNT)
+        ])
+        # Every task has an attachment and a comment; the first sorts first and has 3 x 4
+        TaskAttachment.objects.bulk_create([
+            TaskAttachment(task=task, uploaded_by=cls.user, file=f'task_attachments/{i}.pdf',
+                           original_filename=f'{i}.pdf', file_size=100, mime_type='application/pdf')
+            for task in tasks for i in range(3 if task.priority == 'medium' else 1)
+        ])
+        TaskComment.objects.bulk_create([
+            TaskComment(task=task, author=cls.user, content='Noted')
+            for task in tasks for _ in range(4 if task.priority == 'medium' else 1)
+        ])
+        cls.busy_task = tasks[0]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_list_query_count_is_constant(self):
+        # Tasks, attachments, comments and progress logs (+ their users), and the company's answers
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/tasks/?page_size=200')
+        self.assertEqual(len(response.data['results']), 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            next_page = self.client.get(response.data['next'])
+        self.assertEqual(len(queries), 5)
+        self.assertEqual(len(next_page.data['results']), 200)
+
+    def test_counts_are_not_multiplied_across_relations(self):
+        response = self.client.get('/api/tasks/?fields=id,attachment_count,comment_count&page_size=1')
+        task = response.data['results'][0]
+        self.assertEqual(task['id'], str(self.busy_task.id))
+        self.assertEqual((task['attachment_count'], task['comment_count']), (3, 4))
+
+
+class QuestionClassifierGoldenTests(SimpleTestCase):
+    """Rule tables in apps.tasks.classifier against what the per-question helpers they replaced returned"""
+
+    # (question category, question, frameworks, data source,
+    #  task category, priority, estimated hours, framework tags, expected files)
+    GOLDEN = [
+    ('Governance & Management', "Do you have a designated person or team responsible for your hotel's sustainability efforts?",
+     'Green Key: 1.1 Environmental Manager (I) DST: 1.3 Establish a committee', 'Job description, Committee meeting minutes',
+     'governance', 'medium', 12, ['Dubai Sustainable Tourism: Required'], 1),
+    ('Governance & Management', 'Do you provide regular training for all staff on your sustainability goals and their specific roles?',
+     'DST: 1.4 Train employees Green Key: 2.1 Staff training (I)', 'Training records, materials',
+     'social', 'medium', 8, ['Dubai Sustainable Tourism: Required'], 1),
+    ('Energy', 'Do you track your total monthly electricity consumption from the public grid (e.g., DEWA) in kilowatt-hours (kWh)?',
+     'DST Carbon Calculator: Mandatory Input Green Key: 7.1 Monthly energy registration (I)', 'Monthly utility bills',
+     'environmental', 'high', 8, ['Dubai Sustainable Tourism: Mandatory'], 3),
+    ('Energy', 'Do you use any fuel (like diesel or petrol) for on-site power generators?',
+     '\\1 Mandatory Input (Petrol, Diesel)', 'Fuel purchase receipts/logs',
+     'environmental', 'high', 4, ['Mandatory Input: Mandatory', 'Diesel): Required'], 1),
+    ('Water', 'Do the showers in your guest rooms have a flow rate of 9 litres per minute or less?',
+     'Green Key: 4.4 Shower water flow (I) DST: 3.1 Water conservation plan', 'Technical specifications for showerheads',
+     'social', 'medium', 4, ['Dubai Sustainable Tourism: Required'], 1),
+    ('Water', 'Do you have a program that encourages guests to reuse their towels and linens?',
+     'DST: 3.2 Reuse guest towels/linens Green Key: 5.1 & 5.2 Guest information (I)', 'Photos of in-room signage',
+     'social', 'medium', 4, ['Dubai Sustainable Tourism: Required'], 2),
+    ('Construction Phase', 'Do you segregate construction waste on-site for recycling (e.g., concrete, steel, wood)?',
+     "Al Sa'fat / Estidama: Credits for diverting waste from landfill. Dubai Municipality: Requires waste segregation.42", 'Waste transfer notes from recycling facilities',
+     'environmental', 'high', 4, ["Al Sa'fat Dubai: Required"], 2),
+    ('Construction Phase', 'Do you have measures to control dust and air pollution from the construction site?',
+     '\\1 Requires air quality monitoring and control.42', 'Air quality monitoring plan/reports',
+     'environmental', 'medium', 8, ['Requires air quality monitoring and control: Required'], 2),
+    ('Operational Phase (for Real Estate)', 'Does the building have separate meters to track electricity and water consumption for different areas (e.g., common areas, individual units)?',
+     '\\1 Credits for energy and water metering.', 'Building management system (BMS) specifications',
+     'environmental', 'low', 12, ['Credits for energy and water metering.: Required'], 1),
+    ('Governance & Systems', 'Do you have a certified Environmental Management System, such as ISO 14001?',
+     '\\1 A voluntary but widely recognized standard for EMS.45', 'ISO 14001 Certificate',
+     'environmental', 'medium', 4, ['A voluntary but widely recognized standard for EMS: Recommends'], 1),
+    ('Water', 'Do you treat your industrial wastewater before discharging it?',
+     '\\1 Prohibits water pollution.37', 'Water Security Strategy 2036: Aims to reduce pollution.35',
+     'environmental', 'low', 4, ['Prohibits water pollution: Required'], 2),
+    ('Fleet & Transportation', 'Does your fleet include any electric or hybrid vehicles?',
+     '\\1 Promotes green transport.54', 'Government Incentives: Encourage EV adoption.55',
+     'environmental', 'low', 4, ['Promotes green transport: Required'], 1),
+    ('Policy & Management', 'Does your school have a formal, written sustainability strategy or policy?',
+     '\\1 1.1 Sustainability Strategy (Mandatory).64', 'Signed policy document',
+     'governance', 'high', 16, ['1.1 Sustainability Strategy: Mandatory'], 1),
+    ('Resource Management', 'Does the school have a program for reusing or donating old uniforms and textbooks?',
+     '\\1 2.5 & 2.6 Reuse of Uniforms & Resources (Mandatory).64', 'Description of donation/resale program',
+     'environmental', 'high', 4, ['2.5 & 2.6 Reuse of Uniforms & Resources: Mandatory'], 1),
+    ('Health & Environment', 'Do you monitor the indoor air quality in your classrooms and facilities?',
+     '\\1 Recommends IAQ monitoring systems.63', 'IAQ monitoring plan or reports',
+     'social', 'medium', 8, ['Recommends IAQ monitoring systems: Recommends'], 2),
+    ('Waste Management', 'Do you segregate different types of medical waste at the point of generation (e.g., sharps, infectious, general)?',
+     '\\1 Requires proper handling of hazardous/medical waste.68', 'Dubai Municipality Guidelines: Mandate separation at source.72',
+     'social', 'low', 4, ['Requires proper handling of hazardous/medical waste: Required'], 1),
+    ('Waste Management', 'Do you have a contract with a licensed company for the safe treatment and disposal of biomedical waste?',
+     '\\1 Governs waste disposal.20', 'MOHAP/DHA Regulations: Require safe disposal.68',
+     'social', 'low', 4, ['Governs waste disposal: Required'], 2),
+    ('Resource Management', 'Do you have a program to reduce paper use by transitioning to electronic health records and digital communications?',
+     '\\1 A key sustainability initiative adopted by UAE hospitals.74', 'Policy on paperless operations, EMR system details',
+     'social', 'low', 16, ['A key sustainability initiative adopted by UAE hospitals: Required'], 1),
+    ]
+
+    def test_questions_classify_as_before(self):
+        for (category, text, frameworks, data_source,
+             task_category, priority, hours, framework_tags, expected_files) in self.GOLDEN:
+            with self.subTest(question=text):
+                question = ESGQuestion(
+                    id='golden', wizard_question=text, rationale='', frameworks=frameworks,
+                    data_source=data_source, sector='hospitality', category=category
+                )
+                result = classify_question(question)
+                self.assertEqual(
+                    (result.category, result.priority, result.estimated_hours, result.framework_tags),
+                    (task_category, priority, hours, framework_tags)
+                )
+                # Without meters a task keeps the question as title and the data source as action
+                self.assertEqual(estimate_expected_files(text, data_source), expected_files)
+
+
+class TaskExpectedFilesTests(APITestCase):
+    """Evidence expectation persisted on save"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Evidence Hotel', business_sector='hospitality')
+        cls.user = get_user_model().objects.create_user(
+            username='evidence', email='evidence@example.com', password='pass', company=cls.company
+        )
+
+    def _stored(self, task):
+        return Task.objects.values_list('expected_files', flat=True).get(pk=task.pk)
+
+    def test_text_changes_re_estimate_expected_files(self):
+        task = Task.objects.create(company=self.company, created_by=self.user, title='Staff handbook', description='')
+        self.assertEqual(self._stored(task), 1)
+
+        task = Task.objects.get(pk=task.pk)
+        task.title = 'Track monthly electricity consumption'
+        task.save()
+        self.assertEqual(self._stored(task), 3)
+
+        # Other edits keep the stored value; a description edit re-estimates it
+        Task.objects.filter(pk=task.pk).update(expected_files=5)
+        task = Task.objects.get(pk=task.pk)
+        task.status = 'in_progress'
+        task.save()
+        self.assertEqual(self._stored(task), 5)
+        task.description = 'Meter readings from the main building'
+        task.save(update_fields=['description'])
+        self.assertEqual(self._stored(task), 3)
+
+        task = Task.objects.get(pk=task.pk)
+        task.action_required = 'Upload the signed certificate'
+        task.title = 'Energy certificate'
+        task.save(update_fields=['title', 'action_required'])
+        self.assertEqual(self._stored(task), 1)
+
+
+class ProgressTrackerQueryTests(APITestCase):
+    """Progress tracker query budget on a company with 2,000 tasks and 10,000 attachments"""
+
+    TASK_COUNT = 2000
+    ATTACHMENTS_PER_TASK = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Tracker Hotel', business_sector='hospitality')
+        cls.user = get_user_model().objects.create_user(
+            username='tracker', email='tracker@example.com', password='pass', company=cls.company
+        )
+        titles = ['Track monthly electricity consumption', 'Air quality permit', 'Staff training records']
+        categories = ['environmental', 'governance', 'social']
+        # bulk_create skips Task.save(), so set the evidence expectation here
+        tasks = Task.objects.bulk_create([
+            Task(company=cls.company, created_by=cls.user, title=titles[i % 3], description='',
+                 category=categories[i % 3], expected_files=estimate_expected_files(titles[i % 3]))
+            for i in range(cls.TASK_COUNT)
+        ])
+        # Every task has its attachments except the last ten
+        TaskAttachment.objects.bulk_create([
+            TaskAttachment(task=task, uploaded_by=cls.user, file=f'task_attachments/{task.pk}_{i}.pdf',
+                           original_filename=f'{i}.pdf', file_size=100, mime_type='application/pdf')
+            for task in tasks[:-10] for i in range(cls.ATTACHMENTS_PER_TASK)
+        ], batch_size=1000)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_query_count_is_independent_of_task_count(self):
+        # Category totals, a preview per category and the tasks without evidence
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/companies/progress_tracker/')
+        self.assertEqual(response.status_code, 200)
+        expected = sum(Task.objects.filter(company=self.company).values_list('expected_files', flat=True))
+        self.assertEqual(response.data['total_evidence_files'], expected)
+        self.assertEqual(
+            response.data['uploaded_evidence_files'], (self.TASK_COUNT - 10) * self.ATTACHMENTS_PER_TASK
+        )
+        self.assertEqual(len(response.data['next_actions']), 3)
+
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/companies/progress_tracker/?details=true')
+        self.assertEqual(len(response.data['task_details']), self.TASK_COUNT)
+
+
+class TaskBulkTransitionTests(APITestCase):
+    """Bulk status transitions: one UPDATE, bulk audit comments, one recompute"""
+
+    TASK_COUNT = 500
+    STARTED_COUNT = 200
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='Bulk Hotel', business_sector='hospitality')
+        cls.user = get_user_model().objects.create_user(
+            username='bulk', email='bulk@example.com', password='pass', company=cls.company
+        )
+        cls.colleague = get_user_model().objects.create_user(
+            username='colleague', email='colleague@example.com', password='pass', company=cls.company
+        )
+        cls.started_at = timezone.now() - timedelta(days=3)
+        # The first tasks were already started by a colleague before being reset to todo
+        tasks = Task.objects.bulk_create([
+            Task(company=cls.company, created_by=cls.user, title=f'Task {i}', description='',
+                 category='environmental', status='todo',
+                 started_at=cls.started_at if i < cls.STARTED_COUNT else None,
+                 assigned_to=cls.colleague if i < cls.STARTED_COUNT else None)
+            for i in range(cls.TASK_COUNT)
+        ])
+        blocked = Task.objects.bulk_create([
+            Task(company=cls.company, created_by=cls.user, title=f'Blocked {i}', description='', status='blocked')
+            for i in range(5)
+        ])
+        cls.task_ids = [str(task.id) for task in tasks + blocked]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _bulk_action(self, action, **data):
+        return self.client.post('/api/tasks/bulk_action/', {'action': action, 'task_ids': self.task_ids, **data},
+                                format='json')
+
+    def test_mark_in_progress_transitions_todo_tasks_in_bulk(self):
+        # Including the company recompute that runs after commit
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self._bulk_action('mark_in_progress')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['affected_tasks'], self.TASK_COUNT)
+        # The comment INSERT is only split by SQLite's cap on parameters per statement
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "tasks_taskcomment"')]
+        self.assertLessEqual(len(inserts), self.TASK_COUNT // 100)
+        self.assertEqual(len(queries) - len(inserts), 18)
+
+        tasks = Task.objects.filter(company=self.company, title__startswith='Task ')
+        self.assertEqual(tasks.filter(status='in_progress').count(), self.TASK_COUNT)
+        self.assertEqual(Task.objects.filter(company=self.company, status='blocked').count(), 5)
+        # Existing start times and assignees are kept, missing ones filled in
+        started = tasks.filter(started_at=self.started_at, assigned_to=self.colleague)
+        self.assertEqual(started.count(), self.STARTED_COUNT)
+        filled = tasks.exclude(started_at=self.started_at)
+        self.assertEqual(filled.filter(started_at__isnull=False, assigned_to=self.user).count(),
+                         self.TASK_COUNT - self.STARTED_COUNT)
+
+        comments = TaskComment.objects.filter(task__company=self.company)
+        self.assertEqual(comments.count(), self.TASK_COUNT)
+        self.assertEqual(
+            comments.filter(is_status_update=True, old_status='todo', new_status='in_progress',
+                            author=self.user, content='Task started').count(),
+            self.TASK_COUNT
+        )
+
+    def test_mark_completed_records_each_previous_status(self):
+        self._bulk_action('mark_in_progress')
+        response = self._bulk_action('mark_completed', notes='Quarter close')
+        self.assertEqual(response.data['affected_tasks'], self.TASK_COUNT + 5)
+
+        completed = TaskComment.objects.filter(task__company=self.company, new_status='completed')
+        self.assertEqual(completed.filter(old_status='in_progress').count(), self.TASK_COUNT)
+        self.assertEqual(completed.filter(old_status='blocked').count(), 5)
+        self.assertFalse(Task.objects.filter(company=self.company).exclude(
+            status='completed', progress_percentage=100.0, completion_notes='Quarter close'
+        ).exists())
+        # Already completed tasks are not transitioned again
+        self.assertEqual(self._bulk_action('mark_completed').data['affected_tasks'], 0)
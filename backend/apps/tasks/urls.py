@@ -8,9 +8,6 @@ router = DefaultRouter()
 router.register('', views.TaskViewSet, basename='task')
 
 urlpatterns = [
-    # Task viewset routes (includes CRUD, my_tasks, stats, etc.)
-    path('', include(router.urls)),
-    
     # Task templates
     path('templates/', views.task_templates, name='task_templates'),
     path('templates/<uuid:template_id>/create/', views.create_from_template, name='create_from_template'),
@@ -20,4 +17,8 @@ urlpatterns = [
     
     # Regenerate tasks with meter information
     path('regenerate-with-meters/', views.regenerate_tasks_with_meters, name='regenerate_tasks_with_meters'),
+    
+    # Task viewset routes (includes CRUD, my_tasks, stats, etc.)
+    # Last, so the detail route doesn't swallow the paths above as a task pk
+    path('', include(router.urls)),
 ]
\ No newline at end of file
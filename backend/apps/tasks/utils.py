@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from django.utils import timezone
 from apps.tasks.models import Task
 from apps.companies.models import Company
+from .classifier import classify_question
 from .markdown_parser import ESGContentParser, parse_sector_questions
 import uuid
 import logging
@@ -32,45 +33,63 @@ def _format_user_answer(answer):
     return str(answer)
 
 
-def _find_user_answer_for_question(question, answers):
+def build_initial_tasks(company, created_by, esg_questions, meter_info):
     """
-    Find user's answer for a question by matching question content.
-    Frontend uses different IDs than backend, so we match by question text.
+    Unsaved Task instances for a company's sector questions (shared by
+    generate_initial_tasks_for_company and bulk onboarding)
     """
-    if not answers:
-        return None
-    
-    question_text = question.wizard_question.lower()
-    
-    # Create mappings based on question content for healthcare sector
-    question_mappings = {
-        # Governance questions (health_gov_1, health_gov_2)
-        'sustainability plan.*reduce energy.*water.*waste': ['health_gov_1'],
-        'reduce paper use.*electronic health records': ['health_gov_2'],
-        
-        # Resource Management questions (health_resource_1, health_resource_2, health_resource_3) 
-        'built.*retrofitted.*green building.*al sa.*estidama.*leed': ['health_resource_1'],
-        'track.*monthly electricity.*water consumption': ['health_resource_2'],
-        'energy-efficient equipment.*led lighting': ['health_resource_3'],
-        
-        # Waste Management questions (health_waste_1, health_waste_2, health_waste_3)
-        'segregate.*medical waste.*point of generation': ['health_waste_1'],
-        'contract.*licensed company.*biomedical waste': ['health_waste_2'], 
-        'reduce.*single-use plastics': ['health_waste_3'],
-    }
-    
-    # Try to match question text to frontend IDs
-    import re
-    for pattern, frontend_ids in question_mappings.items():
-        if re.search(pattern, question_text):
-            for frontend_id in frontend_ids:
-                if frontend_id in answers:
-                    return answers[frontend_id]
-    
-    return None
+    # User's onboarding answers (looked up per question below)
+    answers = {}
+    if company.scoping_data:
+        esg_assessment = company.scoping_data.get('esg_assessment', {})
+        answers = esg_assessment.get('answers', {})
+    
+    tasks = []
+    now = timezone.now()
+    for question in esg_questions:
+        try:
+            # Category, priority, due date, hours, framework tags and the
+            # user's onboarding answer in one pass over the question
+            classification = classify_question(question, answers)
+            
+            # Enhance task with specific meter information if relevant
+            enhanced_title, enhanced_description, enhanced_action = _enhance_task_with_meter_info(
+                question, meter_info
+            )
+            
+            # Add user's answer to the title if available
+            if classification.user_answer:
+                answer_text = _format_user_answer(classification.user_answer)
+                enhanced_title = f"{enhanced_title} - Your answer: {answer_text}"
+            
+            tasks.append(Task(
+                company=company,
+                title=enhanced_title,
+                description=enhanced_description,
+                compliance_context=question.frameworks,
+                action_required=enhanced_action,
+                category=classification.category,
+                priority=classification.priority,
+                status='todo',
+                due_date=now + timedelta(days=classification.due_days),
+                created_by=created_by,
+                assigned_to=created_by,  # Auto-assign to creator
+                external_id=question.id,  # Store question ID for reference
+                framework_tags=classification.framework_tags,
+                sector=company.business_sector,
+                task_type='esg_assessment',
+                estimated_hours=classification.estimated_hours,
+                # bulk_create skips Task.save(), which would fill this
+                expected_files=estimate_expected_files(enhanced_title, enhanced_action),
+            ))
+            
+        except Exception as e:
+            logger.warning(f"Error creating task from question '{question.wizard_question}': {e}")
+            continue
+    return tasks
 
 
-def generate_initial_tasks_for_company(company, created_by=None):
+def generate_initial_tasks_for_company(company, created_by=None, replace_existing=False):
     """
     Generate initial ESG tasks for a company based on their business sector
     using the v1-style markdown-driven approach.
@@ -78,6 +97,11 @@ def generate_initial_tasks_for_company(company, created_by=None):
     This reads ESG questions from the UAE SME markdown document and creates
     tasks directly from the structured questions, similar to v1 system.
     Includes specific meter information when available.
+    
+    Tasks are built in memory and inserted with one bulk_create, followed by
+    a single score ledger rebuild and company recompute. With
+    replace_existing, the company's current tasks are deleted in the same
+    transaction first.
     """
     print("\n" + "="*80)
     print("🚀 [TASK GENERATION] V1-Style Markdown-Driven Task Generation")
@@ -105,7 +129,7 @@ def generate_initial_tasks_for_company(company, created_by=None):
         
         # Check if tasks already exist
         existing_tasks = Task.objects.filter(company=company).count()
-        if existing_tasks > 0:
+        if existing_tasks > 0 and not replace_existing:
             print(f"⚠️  Company {company.name} already has {existing_tasks} tasks. Skipping generation.")
             return []
         
@@ -116,14 +140,12 @@ def generate_initial_tasks_for_company(company, created_by=None):
         # Get location and meter information
         from apps.companies.models import Location
         locations = Location.objects.filter(company=company)
-        print(f"   • Locations: {locations.count()}")
         
         # Collect meter information from all locations
         meter_info = _collect_meter_information(locations)
         print(f"   • Meters: {len(meter_info)} found")
         
         # Parse ESG questions for company's sector using markdown parser
-        print(f"\n📚 Loading ESG questions from UAE SME document...")
         esg_questions = parse_sector_questions(company.business_sector)
         
         if not esg_questions:
@@ -133,64 +155,27 @@ def generate_initial_tasks_for_company(company, created_by=None):
         
         print(f"✅ Found {len(esg_questions)} ESG questions for {company.business_sector}")
         
-        # Generate tasks from questions
-        print(f"\n🔧 Creating tasks from questions...")
-        tasks = []
+        # Build all tasks in memory
+        tasks = build_initial_tasks(company, created_by, esg_questions, meter_info)
+
+        # Keep the current tasks rather than replace them with nothing
+        if not tasks:
+            print(f"⚠️  No tasks could be built for {company.name}. Skipping generation.")
+            return []
+
+        from django.db import transaction
+        from .scoring import rebuild_company_score_ledger
+        from .signals import batched_task_changes
         
-        for i, question in enumerate(esg_questions, 1):
-            try:
-                print(f"   📝 Processing Question {i}/{len(esg_questions)}: {question.wizard_question[:60]}...")
-                
-                # Calculate due date based on priority
-                due_date = _calculate_due_date_for_question(question)
-                
-                # Map category to task category choices (analyze both category and question text)
-                task_category = _map_question_category(question.category, question.wizard_question)
-                
-                # Get user's answer for this question from scoping data
-                user_answer = None
-                if hasattr(company, 'scoping_data') and company.scoping_data:
-                    esg_assessment = company.scoping_data.get('esg_assessment', {})
-                    answers = esg_assessment.get('answers', {})
-                    user_answer = _find_user_answer_for_question(question, answers)
-                
-                # Enhance task with specific meter information if relevant
-                enhanced_title, enhanced_description, enhanced_action = _enhance_task_with_meter_info(
-                    question, meter_info
-                )
-                
-                # Add user's answer to the title if available
-                if user_answer:
-                    answer_text = _format_user_answer(user_answer)
-                    enhanced_title = f"{enhanced_title} - Your answer: {answer_text}"
-                
-                # Create task
-                task = Task.objects.create(
-                    company=company,
-                    title=enhanced_title,
-                    description=enhanced_description,
-                    compliance_context=question.frameworks,
-                    action_required=enhanced_action,
-                    category=task_category,
-                    priority=_determine_task_priority(question),
-                    status='todo',
-                    due_date=due_date,
-                    created_by=created_by,
-                    assigned_to=created_by,  # Auto-assign to creator
-                    external_id=question.id,  # Store question ID for reference
-                    framework_tags=_extract_framework_tags(question.frameworks),
-                    sector=company.business_sector,
-                    task_type='esg_assessment',
-                    estimated_hours=_estimate_task_hours(question)
-                )
-                
-                tasks.append(task)
-                print(f"      ✅ Created task: {task.id}")
-                
-            except Exception as e:
-                print(f"      ❌ Error creating task: {e}")
-                logger.warning(f"Error creating task from question '{question.wizard_question}': {e}")
-                continue
+        with transaction.atomic(), batched_task_changes():
+            if replace_existing and existing_tasks:
+                Task.objects.filter(company=company).delete()
+                print(f"   • Cleared {existing_tasks} existing tasks")
+            Task.objects.bulk_create(tasks, batch_size=500)
+            # bulk_create bypasses the per-task signals: one ledger rebuild
+            # and one company recompute for the whole batch
+            rebuild_company_score_ledger(company)
+            transaction.on_commit(lambda: refresh_company_task_metrics(company))
         
         print(f"\n🎉 TASK GENERATION COMPLETED")
         print(f"   • Total tasks generated: {len(tasks)}")
@@ -218,193 +203,36 @@ def generate_initial_tasks_for_company(company, created_by=None):
         return []
 
 
-def _calculate_due_date_for_question(question):
-    """Calculate due date based on question priority and frameworks."""
-    # Check if question is high priority (mandatory frameworks)
-    frameworks_text = question.frameworks.lower()
-    
-    if any(keyword in frameworks_text for keyword in ['mandatory', 'required', 'mandates']):
-        # High priority: 30 days
-        return timezone.now() + timedelta(days=30)
-    elif any(keyword in frameworks_text for keyword in ['voluntary', 'recommended']):
-        # Low priority: 90 days
-        return timezone.now() + timedelta(days=90)
+def estimate_expected_files(title, action_required=""):
+    """Number of evidence files a task is expected to collect"""
+    title_lower = (title or '').lower()
+    action_lower = (action_required or '').lower()
+    combined = f"{title_lower} {action_lower}"
+    
+    # Check for meter reading tasks (need 3 monthly bills)
+    if 'meter:' in title_lower and 'monthly consumption' in action_lower:
+        return 3  # 3 months of ADDC bills
+    # Check for monthly tracking tasks
+    elif ('track' in combined and 'monthly' in combined) or 'monthly consumption' in action_lower:
+        return 3  # 3 months of data
+    # Check for utility bills/tracking tasks
+    elif 'bill' in combined or 'invoice' in combined or 'utility' in combined:
+        return 3  # 3 months of bills
+    # Check for emissions monitoring (reports + permits)
+    elif 'emissions' in combined or 'air quality' in combined:
+        return 2  # Monitoring data + permits
+    # Check for waste management (tracking + disposal)
+    elif 'waste' in combined and ('disposal' in combined or 'track' in combined):
+        return 2  # Waste tracking + disposal records
+    # Check for recycling programs
+    elif 'recycling' in combined or 'reuse' in combined:
+        return 2  # Process diagrams + records
+    # Check for wastewater treatment
+    elif 'wastewater' in combined:
+        return 2  # Treatment reports + compliance
+    # Default to 1 file for certificates, assessments, etc.
     else:
-        # Medium priority: 60 days
-        return timezone.now() + timedelta(days=60)
-
-
-def _map_question_category(category, question_text=""):
-    """Map question category to Django model category choices based on ESG principles."""
-    if not category:
-        category = ""
-    
-    # Combine category and question text for analysis
-    combined_text = f"{category} {question_text}".lower()
-    
-    # Priority 1: Social keywords (food/health override environmental context)
-    if any(keyword in combined_text for keyword in [
-        'cafeteria', 'food service', 'healthy food', 'locally sourced', 'nutrition',
-        'health', 'safety', 'employee', 'staff', 'training', 'community', 'social', 
-        'welfare', 'student', 'curriculum', 'education', 'guest', 'customer',
-        'medical waste', 'hazardous', 'single-use plastics'
-    ]):
-        return 'social'
-    
-    # Priority 2: Environmental keywords
-    elif any(keyword in combined_text for keyword in [
-        'electricity', 'water consumption', 'track consumption', 'utility bills',
-        'recycling', 'waste', 'air quality', 'monitor', 'environmental',
-        'resource', 'energy', 'consumption', 'emission', 'carbon', 'reuse'
-    ]):
-        return 'environmental'
-    
-    # Priority 3: Governance keywords  
-    elif any(keyword in combined_text for keyword in [
-        'policy', 'strategy', 'sustainability plan', 'formal', 'written',
-        'governance', 'management', 'compliance', 'documentation', 'audit', 'reporting',
-        'designated person', 'team responsible', 'signed by senior', 'certification',
-        'assessment', 'impact assessment', 'contract', 'licensed company',
-        'paper use', 'digital', 'electronic records', 'paperless', 'digitization'
-    ]):
-        return 'governance'
-    
-    else:
-        return 'environmental'  # Default for ambiguous cases
-
-
-def _determine_task_priority(question):
-    """Determine task priority based on frameworks and question content."""
-    frameworks_text = question.frameworks.lower()
-    question_text = question.wizard_question.lower()
-    
-    # High priority: mandatory frameworks
-    high_priority_keywords = [
-        'mandatory', 'required', 'mandates', 'dst carbon calculator',
-        'al sa\'fat', 'estidama', 'federal law', 'climate law'
-    ]
-    
-    # Medium priority: training, monitoring, voluntary standards
-    medium_priority_keywords = [
-        'training', 'monitoring', 'tracking', 'reporting', 'voluntary',
-        'green key', 'leed', 'breeam'
-    ]
-    
-    if any(keyword in frameworks_text for keyword in high_priority_keywords):
-        return 'high'
-    elif any(keyword in frameworks_text for keyword in medium_priority_keywords):
-        return 'medium'
-    else:
-        return 'low'
-
-
-def _extract_framework_tags(frameworks_text):
-    """Extract simplified framework tags from frameworks text."""
-    if not frameworks_text:
-        return []
-    
-    tags = []
-    
-    # Split by comma or semicolon to handle multiple frameworks
-    framework_parts = frameworks_text.split(',') if ',' in frameworks_text else [frameworks_text]
-    
-    for part in framework_parts:
-        part = part.strip()
-        if not part:
-            continue
-            
-        # Extract framework name and status
-        framework_name = ""
-        status = ""
-        
-        # Common framework patterns
-        if 'ADEK' in part:
-            framework_name = 'ADEK Sustainability Policy'
-        elif 'Emirates Coalition' in part:
-            framework_name = 'Emirates Coalition for Green Schools'
-        elif 'DST' in part or 'Dubai Sustainable Tourism' in part:
-            framework_name = 'Dubai Sustainable Tourism'
-        elif 'Green Key' in part:
-            framework_name = 'Green Key Global'
-        elif 'Al Sa\'fat' in part:
-            framework_name = 'Al Sa\'fat Dubai'
-        elif 'Estidama' in part:
-            framework_name = 'Estidama Pearl'
-        elif 'LEED' in part:
-            framework_name = 'LEED'
-        elif 'BREEAM' in part:
-            framework_name = 'BREEAM'
-        elif 'Federal Law' in part or 'Climate Law' in part:
-            framework_name = 'UAE Federal Law'
-        elif 'MOHAP' in part:
-            framework_name = 'MOHAP Hospital Regulation'
-        else:
-            # Extract first part as framework name if pattern not recognized
-            # Clean up cryptic references and numbers - Enhanced cleaning
-            cleaned_part = part.replace('\\1', '').replace('\\2', '').replace('\\3', '')
-            # Remove numbers, dots, and policy references at the end
-            import re
-            cleaned_part = re.sub(r'\.\d+$', '', cleaned_part)  # Remove .63, .42, etc.
-            cleaned_part = re.sub(r'^\d+\.\d+\s*&?\s*\d*\.\d*\s*', '', cleaned_part)  # Remove 2.1 & 2.6, 1.1, etc.
-            # Remove criterion references per user request
-            cleaned_part = re.sub(r'imperative\s+criterion\s+\d+\.\d+', '', cleaned_part, flags=re.IGNORECASE)
-            cleaned_part = re.sub(r'criterion\s+\d+\.\d+', '', cleaned_part, flags=re.IGNORECASE)
-            cleaned_part = re.sub(r'\([IGC]\)', '', cleaned_part)  # Remove (I), (G), (C) markers
-            cleaned_part = cleaned_part.strip()
-            
-            if ':' in cleaned_part:
-                framework_name = cleaned_part.split(':')[0].strip()
-            else:
-                framework_name = cleaned_part.split('(')[0].strip()
-            
-            # If framework name is too generic or short, use a default
-            if not framework_name or len(framework_name) < 3:
-                if 'curriculum' in part.lower():
-                    framework_name = 'ADEK Sustainability Policy'
-                elif 'reuse' in part.lower():
-                    framework_name = 'ADEK Sustainability Policy'
-                elif 'sustainability strategy' in part.lower():
-                    framework_name = 'ADEK Sustainability Policy'
-                else:
-                    framework_name = 'Framework Requirement'
-        
-        # Determine status
-        part_lower = part.lower()
-        if 'mandatory' in part_lower or 'required' in part_lower or 'mandates' in part_lower:
-            status = 'Mandatory'
-        elif 'voluntary' in part_lower or 'recommends' in part_lower or 'optional' in part_lower:
-            status = 'Recommends'
-        else:
-            status = 'Required'  # Default
-        
-        # Create simplified tag
-        if framework_name:
-            tag = f"{framework_name}: {status}"
-            tags.append(tag)
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_tags = []
-    for tag in tags:
-        if tag not in seen:
-            seen.add(tag)
-            unique_tags.append(tag)
-    
-    return unique_tags
-
-
-def _estimate_task_hours(question):
-    """Estimate hours required based on question complexity."""
-    data_source = question.data_source.lower() if question.data_source else ""
-    
-    if any(keyword in data_source for keyword in ['bills', 'invoices', 'records', 'monitoring']):
-        return 8  # Data collection tasks
-    elif any(keyword in data_source for keyword in ['policy', 'plan', 'assessment']):
-        return 16  # Policy/planning tasks
-    elif any(keyword in data_source for keyword in ['training', 'committee', 'system']):
-        return 12  # Implementation tasks
-    else:
-        return 4  # Simple tasks
+        return 1
 
 
 def _collect_meter_information(locations):
@@ -415,7 +243,7 @@ def _collect_meter_information(locations):
     meters = []
     
     # If no locations exist, return empty array - don't generate fake meters
-    if not locations.exists():
+    if not locations:
         print(f"   📍 No locations found, no meters available")
         return meters
     
@@ -717,4 +545,20 @@ def _update_company_completion_stats(company):
         gov_score = company.governance_score or 0
         company.overall_esg_score = (env_score + social_score + gov_score) / 3
         
-        company.save()
\ No newline at end of file
+        # Only the stats fields: a full save would overwrite the score ledger
+        # sums, which are updated concurrently with F() expressions
+        company.save(update_fields=[
+            'data_completion_percentage', 'environmental_score', 'social_score',
+            'governance_score', 'overall_esg_score', 'updated_at'
+        ])
+
+
+def refresh_company_task_metrics(company):
+    """
+    Company-level recompute after a batch of task changes written with
+    queryset updates (which bypass the per-task save signals)
+    """
+    company.bump_data_version()
+    _update_company_completion_stats(company)
+    company.update_esg_scores()
+    company.update_progress_metrics()
\ No newline at end of file
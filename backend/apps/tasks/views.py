@@ -4,28 +4,131 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q, Count, Avg
+from django.db import transaction
+from django.db.models import Q, Count, Avg, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
 from datetime import timedelta
 import logging
 
-from .models import Task, TaskTemplate, TaskComment, TaskAttachment, TaskReminder
+from .models import Task, TaskTemplate, TaskComment, TaskAttachment, TaskReminder, TaskProgress
 from .serializers import (
-    TaskSerializer, TaskCreateSerializer, TaskUpdateSerializer,
+    TaskSerializer, TaskCompactSerializer, TaskCreateSerializer, TaskUpdateSerializer,
     TaskTemplateSerializer, TaskCommentSerializer, TaskAttachmentSerializer,
     TaskStatsSerializer, NextStepsSerializer, TaskBulkActionSerializer,
     TaskReminderSerializer
 )
+from .pagination import TaskCursorPagination
+from .sync import sync_frontend_tasks_for_company
 from apps.authentication.models import User
 
 logger = logging.getLogger(__name__)
 
 
+# Nested relations rendered by TaskSerializer, with their user lookups joined
+TASK_PREFETCHES = {
+    'attachments': Prefetch('attachments', queryset=TaskAttachment.objects.select_related('uploaded_by')),
+    'comments': Prefetch('comments', queryset=TaskComment.objects.select_related('author')),
+    'progress_logs': Prefetch('progress_logs', queryset=TaskProgress.objects.select_related('user')),
+}
+
+def _related_count(model):
+    """Correlated COUNT of a task's related rows"""
+    rows = model.objects.filter(task=OuterRef('pk')).order_by().values('task').annotate(total=Count('id'))
+    return Coalesce(Subquery(rows.values('total'), output_field=IntegerField()), 0)
+
+
+# Served to TaskSerializer instead of a COUNT query per task. Subqueries
+# rather than Count() over two joins, which would multiply a task's
+# attachments by its comments before counting
+TASK_COUNT_ANNOTATIONS = {
+    'attachment_total': _related_count(TaskAttachment),
+    'comment_total': _related_count(TaskComment),
+}
+
+# Serializer fields that are not plain model columns: the columns and
+# relations they read
+TASK_FIELD_COLUMNS = {
+    'assigned_to_name': ['assigned_to'],
+    'created_by_name': ['created_by'],
+    'is_overdue': ['due_date', 'status'],
+    'days_until_due': ['due_date'],
+    'category_icon': ['category'],
+    'priority_color': ['priority'],
+    'user_answer': ['title', 'company', 'related_question'],
+}
+TASK_COUNT_FIELDS = {'attachment_count': 'attachment_total', 'comment_count': 'comment_total'}
+TASK_SELECT_RELATED = {'assigned_to_name': 'assigned_to', 'created_by_name': 'created_by'}
+
+
+def _restrict_task_queryset(queryset, fields):
+    """Load only the columns, relations and counts the requested fields render"""
+    # Pagination keys are always needed to build the next cursor
+    columns = {'id', 'priority', 'created_at'}
+    select_related = []
+    prefetches = []
+    annotations = {}
+    for name in fields:
+        if name in TASK_PREFETCHES:
+            prefetches.append(TASK_PREFETCHES[name])
+        elif name in TASK_COUNT_FIELDS:
+            annotation = TASK_COUNT_FIELDS[name]
+            annotations[annotation] = TASK_COUNT_ANNOTATIONS[annotation]
+        elif name in TASK_FIELD_COLUMNS:
+            columns.update(TASK_FIELD_COLUMNS[name])
+            if name in TASK_SELECT_RELATED:
+                select_related.append(TASK_SELECT_RELATED[name])
+        else:
+            columns.add(name)
+    
+    queryset = queryset.only(*columns)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    return queryset
+
+
+def _bulk_transition(tasks, user, new_status, comment, **updates):
+    """
+    Move tasks to ``new_status`` with one UPDATE, record status comments in
+    bulk and run the company recompute once after commit. Queryset updates
+    skip the per-task save signals, which would otherwise recompute company
+    stats and scores for every task.
+    """
+    from .utils import refresh_company_task_metrics
+
+    with transaction.atomic():
+        old_statuses = list(tasks.select_for_update().values_list('id', 'status'))
+        if not old_statuses:
+            return 0
+        Task.objects.filter(id__in=[task_id for task_id, _ in old_statuses]).update(
+            status=new_status, updated_at=timezone.now(), **updates
+        )
+        TaskComment.objects.bulk_create([
+            TaskComment(
+                task_id=task_id,
+                author=user,
+                content=comment,
+                is_status_update=True,
+                old_status=old_status,
+                new_status=new_status,
+            )
+            for task_id, old_status in old_statuses
+        ], batch_size=500)
+        company = user.company
+        transaction.on_commit(lambda: refresh_company_task_metrics(company))
+    return len(old_statuses)
+
+
 class TaskViewSet(viewsets.ModelViewSet):
     """
     ViewSet for task management
     Handles all task CRUD operations and related actions
     """
     permission_classes = [IsAuthenticated]
+    pagination_class = TaskCursorPagination
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -33,8 +136,33 @@ class TaskViewSet(viewsets.ModelViewSet):
             return TaskCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return TaskUpdateSerializer
+        elif self.action == 'list' and self.request.query_params.get('view') == 'compact':
+            return TaskCompactSerializer
         return TaskSerializer
     
+    def get_serializer(self, *args, **kwargs):
+        """Pass the requested sparse fieldset (?fields=) to the read serializer"""
+        fields = self._get_requested_fields()
+        if fields and self.get_serializer_class() is TaskSerializer:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+    
+    def _get_requested_fields(self):
+        """
+        Serializer fields a read request asked for (?view=compact or
+        ?fields=a,b), or None for the full payload
+        """
+        if self.action not in ['list', 'retrieve']:
+            return None
+        if self.action == 'list' and self.request.query_params.get('view') == 'compact':
+            return list(TaskCompactSerializer.Meta.fields)
+        fields_param = self.request.query_params.get('fields')
+        if not fields_param:
+            return None
+        requested = {name.strip() for name in fields_param.split(',')}
+        fields = [name for name in TaskSerializer.Meta.fields if name in requested]
+        return fields or None
+    
     def get_queryset(self):
         """Return tasks for user's company with filtering"""
         try:
@@ -50,11 +178,15 @@ class TaskViewSet(viewsets.ModelViewSet):
             
             queryset = Task.objects.filter(
                 company=self.request.user.company
-            ).select_related(
-                'assigned_to', 'created_by', 'related_question', 'related_assessment'
-            ).prefetch_related(
-                'attachments', 'comments', 'progress_logs'
-            ).order_by('-priority', '-created_at')
+            )
+            fields = self._get_requested_fields()
+            if fields:
+                queryset = _restrict_task_queryset(queryset, fields)
+            else:
+                queryset = queryset.select_related(
+                    'assigned_to', 'created_by', 'related_question', 'related_assessment'
+                ).prefetch_related(*TASK_PREFETCHES.values()).annotate(**TASK_COUNT_ANNOTATIONS)
+            queryset = queryset.order_by('-priority', '-created_at', '-id')
             
         except Exception as e:
             logger.error(f"Error in get_queryset: {e}")
@@ -471,16 +603,21 @@ class TaskViewSet(viewsets.ModelViewSet):
         try:
             if action == 'mark_completed':
                 notes = data.get('notes', 'Bulk completion')
-                for task in tasks:
-                    if task.status != 'completed':
-                        task.mark_completed(request.user, notes)
-                        affected_count += 1
+                affected_count = _bulk_transition(
+                    tasks.exclude(status='completed'), request.user, 'completed',
+                    f"Task marked as completed. {notes}".strip(),
+                    progress_percentage=100.0,
+                    completed_at=timezone.now(),
+                    completion_notes=notes,
+                )
             
             elif action == 'mark_in_progress':
-                for task in tasks:
-                    if task.status == 'todo':
-                        task.mark_in_progress(request.user)
-                        affected_count += 1
+                affected_count = _bulk_transition(
+                    tasks.filter(status='todo'), request.user, 'in_progress',
+                    "Task started",
+                    started_at=Coalesce('started_at', Value(timezone.now())),
+                    assigned_to=Coalesce('assigned_to', Value(request.user.pk)),
+                )
             
             elif action == 'assign_to':
                 assignee = User.objects.get(
@@ -587,24 +724,29 @@ def regenerate_tasks_with_meters(request):
     try:
         from .utils import generate_initial_tasks_for_company
         
-        # Clear existing tasks (optional - user can choose)
+        # Clear existing tasks (optional - user can choose); the clear and
+        # the regeneration run in one transaction with a single recompute
         clear_existing = request.data.get('clear_existing', False)
         deleted_count = 0
         if clear_existing:
             deleted_count = Task.objects.filter(company=request.user.company).count()
-            Task.objects.filter(company=request.user.company).delete()
-            logger.info(f"Cleared {deleted_count} existing tasks for company {request.user.company.name}")
         
         # Regenerate tasks with meter enhancement
         new_tasks = generate_initial_tasks_for_company(
             company=request.user.company,
-            created_by=request.user
+            created_by=request.user,
+            replace_existing=bool(clear_existing)
         )
+        # Generation returns no tasks when it stopped before replacing any
+        if not new_tasks:
+            deleted_count = 0
+        if deleted_count:
+            logger.info(f"Cleared {deleted_count} existing tasks for company {request.user.company.name}")
         
         return Response({
             'message': f'Successfully regenerated {len(new_tasks)} tasks with meter information',
             'tasks_created': len(new_tasks),
-            'tasks_cleared': deleted_count if clear_existing else 0,
+            'tasks_cleared': deleted_count,
             'company': request.user.company.name,
             'business_sector': request.user.company.business_sector,
             'tasks': [TaskSerializer(task).data for task in new_tasks[:5]]  # Return first 5 as sample
@@ -636,80 +778,15 @@ def sync_frontend_tasks(request):
             'error': 'Tasks data is required and must be an array'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    created_tasks = []
-    updated_tasks = []
-    errors = []
-    
-    for task_data in tasks_data:
-        try:
-            # Check if task already exists by frontend task ID or title
-            frontend_task_id = task_data.get('id')
-            existing_task = None
-            
-            if frontend_task_id:
-                existing_task = Task.objects.filter(
-                    company=request.user.company,
-                    external_id=frontend_task_id
-                ).first()
-            
-            if not existing_task:
-                # Check by title to avoid duplicates
-                existing_task = Task.objects.filter(
-                    company=request.user.company,
-                    title=task_data.get('title', '')
-                ).first()
-            
-            # Parse due date
-            due_date = None
-            if task_data.get('due_date'):
-                try:
-                    from dateutil.parser import parse
-                    due_date = parse(task_data['due_date'])
-                except:
-                    # Fallback to current date + 30 days
-                    from datetime import datetime, timedelta
-                    due_date = timezone.now() + timedelta(days=30)
-            
-            # Prepare task data
-            task_values = {
-                'title': task_data.get('title', 'Untitled Task')[:200],  # Limit title length
-                'description': task_data.get('description', '')[:500],  # Limit description length
-                'category': task_data.get('category', 'environmental'),
-                'priority': task_data.get('priority', 'medium'),
-                'status': task_data.get('status', 'todo'),
-                'due_date': due_date,
-                'compliance_context': task_data.get('compliance_context', '')[:300],
-                'action_required': task_data.get('action_required', '')[:300],
-                'framework_tags': task_data.get('framework_tags', []),
-                'sector': task_data.get('sector', ''),
-                'external_id': frontend_task_id,  # Store frontend task ID
-                'task_type': 'esg_assessment',  # Mark as generated from ESG assessment
-                'estimated_hours': task_data.get('estimated_hours', 4)
-            }
-            
-            if existing_task:
-                # Update existing task
-                for key, value in task_values.items():
-                    if value is not None:  # Only update non-null values
-                        setattr(existing_task, key, value)
-                existing_task.save()
-                updated_tasks.append(existing_task)
-            else:
-                # Create new task
-                new_task = Task.objects.create(
-                    company=request.user.company,
-                    created_by=request.user,
-                    assigned_to=request.user,  # Default assign to creator
-                    **task_values
-                )
-                created_tasks.append(new_task)
-                
-        except Exception as e:
-            logger.error(f"Error syncing task {task_data.get('title', 'Unknown')}: {e}")
-            errors.append({
-                'task_title': task_data.get('title', 'Unknown'),
-                'error': str(e)
-            })
+    try:
+        created_tasks, updated_tasks, errors = sync_frontend_tasks_for_company(
+            request.user.company, request.user, tasks_data
+        )
+    except Exception as e:
+        logger.error(f"Task sync failed for company {request.user.company.name}: {e}")
+        return Response({
+            'error': 'Failed to sync tasks'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     # Prepare response
     response_data = {
@@ -717,8 +794,8 @@ def sync_frontend_tasks(request):
         'created_count': len(created_tasks),
         'updated_count': len(updated_tasks),
         'error_count': len(errors),
-        'created_tasks': [TaskSerializer(task).data for task in created_tasks],
-        'updated_tasks': [TaskSerializer(task).data for task in updated_tasks],
+        'created_tasks': created_tasks,
+        'updated_tasks': updated_tasks,
         'errors': errors
     }
     
@@ -277,3 +277,30 @@ ESG_SECTORS = {
     'education': 'Education',
     'other': 'Other',
 }
+
+# Report generation runs on an in-process worker pool; set
+# REPORT_GENERATION_ASYNC=False to render inline (tests, offline scripts)
+REPORT_GENERATION_ASYNC = os.environ.get('REPORT_GENERATION_ASYNC', 'True').lower() == 'true'
+REPORT_GENERATION_WORKERS = int(os.environ.get('REPORT_GENERATION_WORKERS', '2'))
+
+# Report downloads can be handed to the web server: None (stream from Django),
+# 'x-sendfile' (Apache/lighttpd) or 'x-accel-redirect' (nginx internal location)
+REPORT_DOWNLOAD_OFFLOAD = os.environ.get('REPORT_DOWNLOAD_OFFLOAD') or None
+REPORT_DOWNLOAD_ACCEL_PREFIX = os.environ.get('REPORT_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+
+# Outgoing email (scheduled report delivery)
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False').lower() == 'true'
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'reports@esg-compass.local')
+
+# PDF sections built concurrently on a cache miss. Section builders are pure
+# Python, so threads only pay off for heavy sections; 1 builds inline.
+REPORT_SECTION_WORKERS = int(os.environ.get('REPORT_SECTION_WORKERS', '1'))
+
+# Live sector benchmarks (apps.dashboard.benchmarks) skip sector/region
+# groups with fewer onboarded companies than this
+BENCHMARK_MIN_SAMPLE_SIZE = int(os.environ.get('BENCHMARK_MIN_SAMPLE_SIZE', '5'))
@@ -50,7 +50,12 @@ const Reports = () => {
     () => esgAPI.getReports(),
     {
       select: (data) => Array.isArray(data) ? data : data.results || [],
-      enabled: !!user?.id // Only run query when user is loaded
+      enabled: !!user?.id, // Only run query when user is loaded
+      // Reports generate in the background; poll while any is still queued
+      refetchInterval: (data) => {
+        const list = Array.isArray(data) ? data : data?.results || [];
+        return list.some((report) => ['pending', 'generating'].includes(report.status)) ? 3000 : false;
+      }
     }
   );
 
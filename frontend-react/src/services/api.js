@@ -536,6 +536,11 @@ class ESGPlatformAPI {
     return response.data;
   }
 
+  async getReportStatus(reportId) {
+    const response = await api.get(`/reports/generated/${reportId}/status/`);
+    return response.data;
+  }
+
   async getGeneratedReports() {
     const response = await api.get('/reports/');
     return response.data;